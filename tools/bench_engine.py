@@ -0,0 +1,254 @@
+"""
+Micro-benchmarks for VCC's own Python hot paths.
+
+Measures argument building, output naming, directory scanning, file-list
+insertion, log ingestion and the probe cache against a fake ffmpeg
+(tools/fake_ffmpeg.py), so it runs anywhere without FFmpeg installed.
+Each benchmark has a per-operation time limit; the script exits non-zero
+when any limit is exceeded.
+
+Run: python tools/bench_engine.py [--scale 0.1] [--json results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fake_ffmpeg  # noqa: E402  (same directory)
+
+# Upper limits in microseconds per operation.  Generous enough for slow CI
+# machines; a regression that makes a hot path O(n) per item blows past them.
+THRESHOLDS_US = {
+    "build_ffmpeg_args": 60.0,
+    "make_output_name": 60.0,
+    "scan_directory": 60.0,
+    "append_files_bulk": 20.0,
+    "append_files_batched": 20.0,
+    "log_reader": 80.0,
+    "log_terminal": 1200.0,
+    "probe_miss": 250_000.0,
+    "probe_hit": 25.0,
+}
+
+JOBS = 100_000
+LOG_LINES = 100_000
+TERMINAL_LINES = 20_000
+PROBE_MISSES = 20
+
+
+def _worker(jobs: list, **kwargs):
+    from vcc.core.encoder import EncoderWorker
+    params = dict(
+        jobs=jobs, output_dir=os.path.join(tempfile.gettempdir(), "vcc_bench_out"),
+        width=1920, height=1080, codec="libx264",
+        codec_params={"preset": "medium", "crf": "23"}, pix_fmt="yuv420p",
+    )
+    params.update(kwargs)
+    return EncoderWorker(**params)
+
+
+def _synthetic_jobs(n: int) -> list:
+    """Jobs with a trim on every 7th, a crop on every 11th and an override on every 13th."""
+    from vcc.core.jobs import Job
+    jobs = []
+    for i in range(n):
+        job = Job(f"/media/library/show_{i // 1000:03d}/episode_{i:06d}.mkv")
+        if i % 7 == 0:
+            job.trim_start, job.trim_end = "00:00:10", "00:20:00"
+        if i % 11 == 0:
+            job.crop = "crop=1920:800:0:140"
+        if i % 13 == 0:
+            job.overrides = {"crf": "20"}
+        jobs.append(job)
+    return jobs
+
+
+def bench_build_args(n: int) -> dict:
+    jobs = _synthetic_jobs(n)
+    worker = _worker(jobs, fps="30", film_grain=8)
+    start = time.perf_counter()
+    for job in jobs:
+        worker.build_ffmpeg_args(job, job.source + ".out.mkv")
+    return _result("build_ffmpeg_args", time.perf_counter() - start, n)
+
+
+def bench_output_name(n: int) -> dict:
+    jobs = _synthetic_jobs(n)
+    worker = _worker(jobs, bitrate="4M", two_pass=True)
+    start = time.perf_counter()
+    for job in jobs:
+        worker.make_output_name(job)
+    return _result("make_output_name", time.perf_counter() - start, n)
+
+
+def _make_tree(root: str, n: int) -> None:
+    """Create *n* empty files (one in eight not a video) spread over nested dirs."""
+    exts = (".mkv", ".mp4", ".mov", ".webm", ".ts", ".avi", ".mpg", ".txt")
+    for i in range(n):
+        d = os.path.join(root, f"season_{i // 5000:02d}", f"disc_{i // 500 % 10}")
+        if i % 500 == 0:
+            os.makedirs(d, exist_ok=True)
+        open(os.path.join(d, f"clip_{i:06d}{exts[i % len(exts)]}"), "wb").close()
+
+
+def bench_scan_and_append(n: int, tmp: str) -> list[dict]:
+    from PyQt6.QtWidgets import QApplication
+    from vcc.core.scanner import iter_video_files
+    from vcc.ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = MainWindow()
+    results = []
+
+    tree = os.path.join(tmp, "tree")
+    _make_tree(tree, n)
+    start = time.perf_counter()
+    found = list(iter_video_files(tree))
+    results.append(_result("scan_directory", time.perf_counter() - start, n))
+
+    paths = [f"/media/library/clip_{i:06d}.mkv" for i in range(n)]
+    window._clear_files()
+    start = time.perf_counter()
+    window._append_files(paths)
+    results.append(_result("append_files_bulk", time.perf_counter() - start, n))
+
+    # Adding in ten batches exercises duplicate detection against a growing list
+    window._clear_files()
+    step = max(1, n // 10)
+    start = time.perf_counter()
+    for i in range(0, n, step):
+        window._append_files(paths[i:i + step])
+    results.append(_result("append_files_batched", time.perf_counter() - start, n))
+
+    window._clear_files()
+    window.close()
+    app.processEvents()
+    results[0]["found"] = len(found)
+    return results
+
+
+def bench_log_ingestion(lines: int, terminal_lines: int) -> list[dict]:
+    from PyQt6.QtWidgets import QApplication
+    from vcc.core.metrics import EncodeStats
+    from vcc.ui.terminal_widget import TerminalWidget
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    worker = _worker([])
+    received = []
+    worker.log_output.connect(received.append)
+
+    env = dict(os.environ, FAKE_FFMPEG_STATS_LINES=str(lines), FAKE_FFMPEG_SPEED="0")
+    process = subprocess.Popen(
+        [sys.executable, fake_ffmpeg.__file__, "--as", "ffmpeg",
+         "-f", "lavfi", "-i", "testsrc2", "-f", "null", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, env=env,
+    )
+    start = time.perf_counter()
+    worker._read_output_with_progress(process, 60.0, "[1] ", EncodeStats())
+    process.wait()
+    reader = _result("log_reader", time.perf_counter() - start, max(1, len(received)))
+
+    terminal = TerminalWidget()
+    sample = received[-terminal_lines:] or ["frame=1\n"]
+    start = time.perf_counter()
+    for line in sample:
+        terminal.append_text(line)
+    app.processEvents()
+    painted = _result("log_terminal", time.perf_counter() - start, len(sample))
+    terminal.deleteLater()
+    return [reader, painted]
+
+
+def bench_probe_cache(misses: int, tmp: str) -> list[dict]:
+    from vcc.core import encoder
+
+    ffmpeg_path = encoder.find_ffmpeg()
+    files = []
+    for i in range(misses):
+        path = os.path.join(tmp, f"probe_{i:03d}.mkv")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 4096)
+        files.append(path)
+
+    with encoder._probe_cache_lock:
+        encoder._probe_cache.clear()
+    start = time.perf_counter()
+    for path in files:
+        if encoder.probe_media(ffmpeg_path, path) is None:
+            raise RuntimeError(f"fake ffprobe returned nothing for {path}")
+    miss = _result("probe_miss", time.perf_counter() - start, misses)
+
+    hits = misses * 5000
+    start = time.perf_counter()
+    for i in range(hits):
+        encoder.probe_media(ffmpeg_path, files[i % misses])
+    hit = _result("probe_hit", time.perf_counter() - start, hits)
+    return [miss, hit]
+
+
+def _result(name: str, seconds: float, ops: int) -> dict:
+    per_op = seconds / ops * 1e6
+    limit = THRESHOLDS_US[name]
+    return {
+        "name": name, "ops": ops, "seconds": round(seconds, 4),
+        "us_per_op": round(per_op, 3), "limit_us": limit, "ok": per_op <= limit,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark VCC's Python hot paths")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply job/file/line counts (default 1.0 = 100k jobs)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--no-check", action="store_true",
+                        help="Report only; always exit 0")
+    args = parser.parse_args(argv)
+
+    def scaled(n: int) -> int:
+        return max(1, int(n * args.scale))
+
+    tmp = tempfile.mkdtemp(prefix="vcc_bench_engine_")
+    old_path = os.environ.get("PATH", "")
+    try:
+        fake_ffmpeg.install(os.path.join(tmp, "bin"))
+        os.environ["PATH"] = os.path.join(tmp, "bin") + os.pathsep + old_path
+
+        results = [
+            bench_build_args(scaled(JOBS)),
+            bench_output_name(scaled(JOBS)),
+            *bench_scan_and_append(scaled(JOBS), tmp),
+            *bench_log_ingestion(scaled(LOG_LINES), scaled(TERMINAL_LINES)),
+            *bench_probe_cache(max(2, scaled(PROBE_MISSES)), tmp),
+        ]
+    finally:
+        os.environ["PATH"] = old_path
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{'benchmark':<22} {'ops':>8} {'total s':>9} {'us/op':>10} {'limit':>10}")
+    for r in results:
+        flag = "" if r["ok"] else "  REGRESSION"
+        print(f"{r['name']:<22} {r['ops']:>8} {r['seconds']:>9.3f} "
+              f"{r['us_per_op']:>10.2f} {r['limit_us']:>10.0f}{flag}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "results": results}, f, indent=2)
+
+    failed = [r["name"] for r in results if not r["ok"]]
+    if failed and not args.no_check:
+        print(f"\nOver threshold: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
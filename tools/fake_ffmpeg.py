@@ -0,0 +1,349 @@
+"""
+Scriptable fake ffmpeg / ffprobe for load-testing VCC's worker pipeline.
+
+Instead of encoding, the fake prints an FFmpeg-like banner, stream info,
+stats lines and (with ``-progress``) key=value progress blocks at a
+configurable speed, then writes a sparse output file sized from the
+requested bitrate.  It can also fail, fail part-way or hang, so parallel
+scheduling, progress parsing and cancel latency can be tested quickly
+and deterministically.
+
+Install launchers and point VCC at them:
+    python tools/fake_ffmpeg.py install /tmp/fakebin [--scenario scenario.json]
+    VCC_FFMPEG=/tmp/fakebin/ffmpeg python run.py
+
+Behaviour comes from DEFAULTS, overridden by the JSON scenario file named
+in FAKE_FFMPEG_SCENARIO, overridden by FAKE_FFMPEG_<KEY> environment
+variables.  A scenario may carry per-input rules matched by substring,
+optionally only for one video encoder (``-c:v``):
+
+    {"speed": 50, "files": [{"match": "broken", "exit_code": 1, "fail_at": 0.3},
+                            {"match": "stuck", "hang_at": 0.5},
+                            {"encoder": "h264_nvenc", "exit_code": 1,
+                             "error": "OpenEncodeSessionEx failed: out of memory (10)"}]}
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import signal
+
+DEFAULTS = {
+    "duration": 60.0,          # media duration reported by ffprobe (s)
+    "fps": 25.0,               # source frame rate
+    "width": 1920,
+    "height": 1080,
+    "vcodec": "h264",
+    "bit_rate": 5_000_000,     # source bitrate reported by ffprobe (bps)
+    "speed": 20.0,             # encode speed as a multiple of realtime; 0 = instant
+    "stats_lines": 100,        # stats updates over the whole encode
+    "output_bitrate": 2_000_000,  # video bps used for the output size without -b:v
+    "audio_bitrate": 128_000,
+    "exit_code": 0,
+    "fail_at": 1.0,            # fraction of the encode at which a non-zero exit happens
+    "error": "Error while processing the decoded data for stream #0:0",
+    "hang_at": -1.0,           # fraction at which output stops forever (-1 = never)
+    "ignore_sigterm": False,   # keep running after terminate() (cancel escalation tests)
+    "encoders": ["libx264", "libx265", "libsvtav1", "libvpx-vp9", "libaom-av1"],
+    "pix_fmts": ["yuv420p", "yuv420p10le"],
+}
+
+
+def _coerce(value: str, like):
+    if isinstance(like, bool):
+        return value.lower() in ("1", "true", "yes", "on")
+    if isinstance(like, list):
+        return [v for v in value.split(",") if v]
+    return type(like)(value)
+
+
+def load_config(inputs: list[str], encoder: str = "") -> dict:
+    """Merge DEFAULTS, the scenario file, per-input/encoder rules and env overrides."""
+    cfg = dict(DEFAULTS)
+    scenario = {}
+    path = os.environ.get("FAKE_FFMPEG_SCENARIO", "")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            scenario = json.load(f)
+    cfg.update({k: v for k, v in scenario.items() if k != "files"})
+    for rule in scenario.get("files", []):
+        if "encoder" in rule and rule["encoder"] != encoder:
+            continue
+        if any(rule.get("match", "") in src for src in inputs):
+            cfg.update({k: v for k, v in rule.items() if k not in ("match", "encoder")})
+    for key, like in DEFAULTS.items():
+        env = os.environ.get(f"FAKE_FFMPEG_{key.upper()}")
+        if env is not None:
+            cfg[key] = _coerce(env, like)
+    return cfg
+
+
+def _parse_time(value: str) -> float:
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _parse_bitrate(value: str) -> int:
+    mult = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}.get(value[-1:].lower(), 1)
+    return int(float(value[:-1] if mult > 1 else value) * mult)
+
+
+def _opt(args: list[str], name: str, default: str = "") -> str:
+    """Return the value following the last occurrence of *name* in *args*."""
+    value = default
+    for i, a in enumerate(args[:-1]):
+        if a == name:
+            value = args[i + 1]
+    return value
+
+
+def _clock(t: float) -> str:
+    return f"{int(t // 3600):02d}:{int(t % 3600 // 60):02d}:{t % 60:05.2f}"
+
+
+def _hang(out) -> None:
+    out.flush()
+    while True:
+        time.sleep(3600)
+
+
+# ----------------------------------------------------------------------
+# ffprobe
+# ----------------------------------------------------------------------
+def run_ffprobe(args: list[str]) -> int:
+    path = args[-1] if args else ""
+    cfg = load_config([path])
+    if not os.path.exists(path):
+        print(f"{path}: No such file or directory", file=sys.stderr)
+        return 1
+    if cfg["hang_at"] == 0:
+        _hang(sys.stdout)
+    print(json.dumps({
+        "format": {
+            "filename": path,
+            "duration": f"{cfg['duration']:.6f}",
+            "size": str(os.path.getsize(path)),
+            "bit_rate": str(cfg["bit_rate"]),
+        },
+        "streams": [
+            {"index": 0, "codec_type": "video", "codec_name": cfg["vcodec"],
+             "width": cfg["width"], "height": cfg["height"],
+             "r_frame_rate": f"{int(cfg['fps'])}/1"},
+            {"index": 1, "codec_type": "audio", "codec_name": "aac",
+             "bit_rate": str(cfg["audio_bitrate"]), "sample_rate": "48000", "channels": 2},
+        ],
+    }, indent=4))
+    return 0
+
+
+# ----------------------------------------------------------------------
+# ffmpeg
+# ----------------------------------------------------------------------
+_BANNER = (
+    "ffmpeg version 7.0-fake Copyright (c) 2000-2024 the FFmpeg developers\n"
+    "  built with fake_ffmpeg.py (VCC development stand-in)\n"
+    "  configuration: --enable-fake\n"
+)
+
+
+def _open_progress(target: str):
+    if target in ("pipe:1", "-"):
+        return sys.stdout
+    if target == "pipe:2":
+        return sys.stderr
+    return open(target, "w", encoding="utf-8")
+
+
+def run_ffmpeg(args: list[str]) -> int:
+    inputs = [args[i + 1] for i, a in enumerate(args[:-1]) if a == "-i"]
+    vcodec = _opt(args, "-c:v", "libx264")
+    cfg = load_config(inputs, vcodec)
+
+    if "-version" in args:
+        print(_BANNER.splitlines()[0])
+        return 0
+    if "-encoders" in args:
+        print("Encoders:\n V..... = Video\n A..... = Audio\n ------")
+        for name in cfg["encoders"]:
+            print(f" V....D {name:<20} {name} (fake)")
+        print(" A....D aac                  AAC (Advanced Audio Coding)")
+        return 0
+    if "-h" in args:
+        encoder = _opt(args, "-h").split("=", 1)[-1]
+        print(f"Encoder {encoder} [fake]:\n    General capabilities: threads\n"
+              f"    Threading capabilities: frame\n"
+              f"    Supported pixel formats: {' '.join(cfg['pix_fmts'])}")
+        return 0
+
+    err = sys.stderr
+    if cfg["ignore_sigterm"]:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    else:
+        def _on_term(signum, _frame):
+            err.write(f"Exiting normally, received signal {signum}.\n")
+            err.flush()
+            os._exit(255)
+        signal.signal(signal.SIGTERM, _on_term)
+
+    src = inputs[0] if inputs else "input"
+    demuxer_given = inputs and "-f" in args[:args.index("-i")]  # lavfi, concat, ...
+    if inputs and not demuxer_given and not os.path.exists(src):
+        err.write(f"{src}: No such file or directory\n")
+        return 1
+
+    # Encoded span honours -ss / -to / -t like the real thing
+    start = _parse_time(_opt(args, "-ss", "0"))
+    end = _parse_time(_opt(args, "-to")) if _opt(args, "-to") else cfg["duration"]
+    span = max(0.0, min(end, cfg["duration"]) - start)
+    if _opt(args, "-t"):
+        span = min(span, _parse_time(_opt(args, "-t")))
+
+    dst = args[-1] if args else "-"
+    to_null = dst == "-" or _opt(args, "-f") == "null"
+    vbps = _parse_bitrate(_opt(args, "-b:v")) if _opt(args, "-b:v") not in ("", "0") \
+        else cfg["output_bitrate"]
+    abps = 0 if "-an" in args else cfg["audio_bitrate"]
+
+    if "-hide_banner" not in args:
+        err.write(_BANNER)
+    err.write(
+        f"Input #0, matroska,webm, from '{src}':\n"
+        f"  Duration: {_clock(cfg['duration'])}, start: 0.000000, "
+        f"bitrate: {cfg['bit_rate'] // 1000} kb/s\n"
+        f"  Stream #0:0: Video: {cfg['vcodec']}, yuv420p, {cfg['width']}x{cfg['height']}, "
+        f"{cfg['fps']:g} fps\n"
+        f"  Stream #0:1: Audio: aac, 48000 Hz, stereo, fltp\n"
+        f"Stream mapping:\n"
+        f"  Stream #0:0 -> #0:0 ({cfg['vcodec']} (native) -> {vcodec} (native))\n"
+        f"Press [q] to stop, [?] for help\n"
+        f"Output #0, {'null' if to_null else os.path.splitext(dst)[1].lstrip('.')}, "
+        f"to '{dst}':\n"
+    )
+    err.flush()
+
+    progress = _open_progress(_opt(args, "-progress")) if _opt(args, "-progress") else None
+    show_stats = "-nostats" not in args
+    bench_all = "-benchmark_all" in args
+    last_frame = 0
+    lines = max(1, int(cfg["stats_lines"]))
+    wall = span / cfg["speed"] if cfg["speed"] > 0 else 0.0
+    fail = cfg["exit_code"] != 0
+    t0 = time.monotonic()
+
+    for i in range(1, lines + 1):
+        frac = i / lines
+        if 0 <= cfg["hang_at"] <= frac:
+            _hang(err)
+        if fail and frac > cfg["fail_at"]:
+            err.write(f"{cfg['error']}\nConversion failed!\n")
+            return cfg["exit_code"]
+        delay = t0 + wall * frac - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        out_t = span * frac
+        frame = int(out_t * cfg["fps"])
+        size_kib = int((vbps + abps) * out_t / 8 / 1024)
+        elapsed = max(time.monotonic() - t0, 1e-6)
+        fps = frame / elapsed
+        speed = out_t / elapsed
+        if bench_all:
+            # One decode and one encode record per frame, like FFmpeg
+            per_frame = int(wall / lines / max(1, frame - last_frame) * 1e6) if wall else 0
+            for _ in range(frame - last_frame):
+                err.write(f"bench: {per_frame // 4:8d} user {0:8d} sys {per_frame // 4:8d} real decode_video 0.0 \n"
+                          f"bench: {per_frame // 2:8d} user {0:8d} sys {per_frame // 2:8d} real encode_video 0.0 \n")
+            last_frame = frame
+        if show_stats:
+            err.write(
+                f"frame={frame:5d} fps={fps:4.0f} q=28.0 size={size_kib:8d}KiB "
+                f"time={_clock(out_t)} bitrate={(vbps + abps) / 1000:6.1f}kbits/s "
+                f"speed={speed:.3g}x\r"
+            )
+            err.flush()
+        if progress is not None:
+            progress.write(
+                f"frame={frame}\nfps={fps:.2f}\nstream_0_0_q=28.0\n"
+                f"bitrate={(vbps + abps) / 1000:.1f}kbits/s\ntotal_size={size_kib * 1024}\n"
+                f"out_time_us={int(out_t * 1e6)}\nout_time_ms={int(out_t * 1e6)}\n"
+                f"out_time={_clock(out_t)}0000\ndup_frames=0\ndrop_frames=0\n"
+                f"speed={speed:.3g}x\nprogress={'end' if i == lines else 'continue'}\n"
+            )
+            progress.flush()
+
+    if fail:
+        err.write(f"{cfg['error']}\nConversion failed!\n")
+        return cfg["exit_code"]
+
+    size = int((vbps + abps) * span / 8)
+    if not to_null and _opt(args, "-pass") != "1":
+        if os.path.exists(dst) and "-y" not in args:
+            err.write(f"File '{dst}' already exists. Exiting.\n")
+            return 1
+        with open(dst, "wb") as f:
+            f.truncate(size)  # sparse: sized like a real encode without the I/O
+    err.write(
+        f"\n[out#0] video:{vbps * span / 8 / 1024:.0f}KiB audio:{abps * span / 8 / 1024:.0f}KiB "
+        f"subtitle:0KiB other streams:0KiB global headers:0KiB muxing overhead: 0.1%\n"
+    )
+    if "-benchmark" in args:
+        rtime = time.monotonic() - t0
+        err.write(f"bench: utime={rtime * 0.75:.3f}s stime=0.001s rtime={rtime:.3f}s\n"
+                  f"bench: maxrss={os.getpid() % 1000 + 50000}KiB\n")
+    return 0
+
+
+# ----------------------------------------------------------------------
+# Launchers
+# ----------------------------------------------------------------------
+def install(directory: str, scenario: str = "") -> tuple[str, str]:
+    """Create ``ffmpeg`` and ``ffprobe`` launchers in *directory*; return their paths.
+
+    *scenario* is baked into the launchers as FAKE_FFMPEG_SCENARIO.
+    """
+    os.makedirs(directory, exist_ok=True)
+    script = os.path.abspath(__file__)
+    scenario = os.path.abspath(scenario) if scenario else ""
+    paths = []
+    for name in ("ffmpeg", "ffprobe"):
+        if os.name == "nt":
+            path = os.path.join(directory, name + ".cmd")
+            body = "@echo off\n"
+            if scenario:
+                body += f'set "FAKE_FFMPEG_SCENARIO={scenario}"\n'
+            body += f'"{sys.executable}" "{script}" --as {name} %*\n'
+        else:
+            path = os.path.join(directory, name)
+            body = "#!/bin/sh\n"
+            if scenario:
+                body += f'FAKE_FFMPEG_SCENARIO="{scenario}"; export FAKE_FFMPEG_SCENARIO\n'
+            body += f'exec "{sys.executable}" "{script}" --as {name} "$@"\n'
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        paths.append(path)
+    return paths[0], paths[1]
+
+
+def main(argv: list[str]) -> int:
+    if argv[:1] == ["install"]:
+        rest = argv[1:]
+        scenario = _opt(rest + [""], "--scenario")
+        dirs = [a for a in rest if a != "--scenario" and a != scenario]
+        ffmpeg, ffprobe = install(dirs[0] if dirs else ".", scenario)
+        print(ffmpeg)
+        print(ffprobe)
+        return 0
+    if argv[:1] == ["--as"] and len(argv) > 1:
+        name, args = argv[1], argv[2:]
+    else:
+        name, args = os.path.basename(sys.argv[0]), argv
+    return run_ffprobe(args) if "ffprobe" in name else run_ffmpeg(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,289 @@
+"""
+Headless batch runner for VCC.
+
+Encodes the jobs of one or more manifests (see vcc.core.manifest) with the
+same engine as the GUI::
+
+    python -m vcc.cli jobs.jsonl -o out/ --codec libx265 -p crf=22 -p preset=slow
+
+Batch-wide settings come from the command line; per-file trims, crops,
+output paths and codec parameter overrides come from the manifest.
+Exit status is 0 if every job succeeded or was skipped, 1 if any failed
+and 2 for unusable arguments or manifests.  Ctrl+C cancels the batch;
+Ctrl+Z pauses the running encodes along with the runner, and ``fg`` or
+``bg`` resumes them.  With ``--preflight`` every file is test-encoded
+first (see vcc.core.preflight); if any fail, the runner asks whether to
+encode the rest, or exits with 1 when not run from a terminal unless
+``--skip-failed`` is given.
+"""
+
+import os
+import sys
+import signal
+import argparse
+
+from vcc.core.codecs import CODECS
+from vcc.core.gpu_detect import get_gpu_encoder
+from vcc.core.jobs import Job, JobState
+from vcc.core.manifest import ManifestError, iter_manifest
+from vcc.core.metrics import default_metrics_dir
+from vcc.core.priority import CGROUP_ENV, DEFAULT_PROFILE, PROFILES
+from vcc.core.prometheus import DEFAULT_INTERVAL, PrometheusExporter
+
+
+def default_codec_params(codec: str) -> dict[str, str]:
+    """The parameter defaults the GUI shows for *codec*."""
+    gpu = get_gpu_encoder(codec)
+    if gpu:
+        return {gpu.preset_key: str(gpu.preset_default), gpu.quality_param: str(gpu.quality_default)}
+    params = {
+        key: str(pdef.get("default", ""))
+        for key, pdef in CODECS.get(codec, {}).get("params", {}).items()
+    }
+    if codec == "libvpx-vp9" and "crf" in params:
+        params["b:v"] = "0"  # CRF mode, as in the GUI
+    return params
+
+
+def _parse_size(text: str) -> tuple[int, int]:
+    try:
+        w, h = text.lower().split("x")
+        return int(w), int(h)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{text}'") from None
+
+
+def _parse_param(text: str) -> tuple[str, str]:
+    key, sep, value = text.partition("=")
+    if not sep or not key.strip():
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got '{text}'")
+    return key.strip().lstrip("-"), value.strip()
+
+
+def _parse_jobs(text: str) -> int:
+    if text.strip().lower() == "auto":
+        return 0  # EncoderWorker looks up ~/.vcc_tuning.json
+    try:
+        jobs = int(text)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number or 'auto', got '{text}'")
+    return jobs
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m vcc.cli", description="Encode the jobs of VCC job manifests"
+    )
+    parser.add_argument("manifests", nargs="+", help="job manifests (.jsonl, .ndjson or .csv)")
+    parser.add_argument("-o", "--output-dir", required=True, help="output directory")
+    parser.add_argument("--codec", default="libsvtav1", help="video encoder (%(default)s)")
+    parser.add_argument("-p", "--param", type=_parse_param, action="append", default=[],
+                        metavar="KEY=VALUE", help="codec parameter, e.g. crf=28 (repeatable)")
+    parser.add_argument("--size", type=_parse_size, default=(1280, 720), metavar="WxH",
+                        help="output resolution (1280x720)")
+    parser.add_argument("--pix-fmt", default="", help="output pixel format (encoder default)")
+    parser.add_argument("--audio", default="copy", help="audio codec (%(default)s)")
+    parser.add_argument("--subtitle", default="copy", help="subtitle codec (%(default)s)")
+    parser.add_argument("--fps", default="", help="output frame rate (source)")
+    parser.add_argument("--bitrate", default="", help="target video bitrate, e.g. 5M")
+    parser.add_argument("--two-pass", action="store_true", help="two-pass encode in bitrate mode")
+    parser.add_argument("--target-size", type=float, default=0.0, metavar="MB",
+                        help="fit every output into MB megabytes")
+    parser.add_argument("--size-tolerance", type=float, default=5.0, metavar="PCT",
+                        help="allowed target-size miss in percent (%(default)s)")
+    parser.add_argument("--format", default="", help="output container (auto)")
+    parser.add_argument("--film-grain", type=int, default=0, help="SVT-AV1 film grain (0-50)")
+    parser.add_argument("--sharpness", type=int, default=0, help="SVT-AV1 / VP9 sharpness")
+    parser.add_argument("-j", "--jobs", type=_parse_jobs, default=1,
+                        help="parallel FFmpeg processes, or 'auto' for the tuned split")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="vary parallel jobs between --min-jobs and -j with the measured load")
+    parser.add_argument("--min-jobs", type=int, default=1, help="lower bound for --adaptive")
+    parser.add_argument("--cores", type=int, default=0,
+                        help="cores shared by the parallel jobs (all usable)")
+    parser.add_argument("--pin-cpus", action="store_true",
+                        help="pin each job to its own cores, spread across NUMA nodes (Linux)")
+    parser.add_argument("--priority", choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help="priority profile: nice level, I/O class and cgroup limits (%(default)s)")
+    parser.add_argument("--cgroup", default="", metavar="DIR",
+                        help=f"delegated cgroup v2 directory for CPU weight/cpu.max (${CGROUP_ENV})")
+    parser.add_argument("--no-admission", dest="admission", action="store_false",
+                        help="start jobs without checking free memory and disk space")
+    parser.add_argument("--preempt", action="store_true",
+                        help="let urgent jobs suspend running lower-priority jobs (POSIX)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="retries after hardware, transient or crash failures (%(default)s)")
+    parser.add_argument("--no-cpu-fallback", dest="cpu_fallback", action="store_false",
+                        help="do not re-run jobs whose GPU encoder keeps failing on a CPU encoder")
+    parser.add_argument("--preflight", action="store_true",
+                        help="test-encode every file before the batch and report the failures")
+    parser.add_argument("--skip-failed", action="store_true",
+                        help="with --preflight, encode the files that passed without asking")
+    parser.add_argument("--overwrite", action="store_true", help="overwrite existing outputs")
+    parser.add_argument("--metrics-dir", default=default_metrics_dir(),
+                        help="per-job metrics log directory, '' to disable (%(default)s)")
+    parser.add_argument("--stage-timings", action="store_true",
+                        help="run FFmpeg with -benchmark_all and log decode/encode/mux times")
+    parser.add_argument("--prom-file", default="",
+                        help="write Prometheus textfile metrics to this .prom file")
+    parser.add_argument("--prom-interval", type=float, default=DEFAULT_INTERVAL, metavar="S",
+                        help="seconds between .prom updates (%(default)s)")
+    parser.add_argument("--trace", default="", metavar="FILE",
+                        help="save the batch timeline as a Chrome trace (.json)")
+    return parser
+
+
+def load_jobs(paths: list[str]) -> tuple[list[Job], list[ManifestError]]:
+    """Read every manifest in *paths*, dropping duplicate sources."""
+    errors: list[ManifestError] = []
+    jobs: list[Job] = []
+    seen: set[str] = set()
+    for path in paths:
+        for job in iter_manifest(path, errors):
+            if job.source not in seen:
+                seen.add(job.source)
+                jobs.append(job)
+    return jobs, errors
+
+
+def _preflight(checker, worker, skip_failed: bool) -> bool:
+    """Run the preflight check; False if the batch should not start.
+
+    Failed jobs are marked FAILED and dropped from the worker's jobs.
+    """
+    checker.log_output.connect(lambda text: print(text, end="", flush=True))
+    previous = signal.signal(signal.SIGINT, lambda *_: checker.cancel())
+    try:
+        result = checker.check()  # synchronous: signals are delivered directly
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    if result["cancelled"]:
+        return False
+    for job, error in result["failed"]:
+        job.state = JobState.FAILED
+        job.error = f"Preflight: {error}"
+    if result["failed"] and not skip_failed:
+        if not result["passed"] or not sys.stdin.isatty():
+            print(f"[ERROR] {len(result['failed'])} file(s) failed the preflight check", file=sys.stderr)
+            return False
+        try:
+            answer = input(f"Encode the {len(result['passed'])} file(s) that passed? [y/N] ")
+        except EOFError:
+            answer = ""
+        if answer.strip().lower() not in ("y", "yes"):
+            return False
+    worker.jobs = result["passed"]
+    return bool(worker.jobs)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    from vcc.core.encoder import EncoderWorker
+    from vcc.core.preflight import PreflightChecker
+
+    opts = build_parser().parse_args(argv)
+    try:
+        jobs, errors = load_jobs(opts.manifests)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+    for err in errors:
+        print(f"[WARNING] skipped {err}", file=sys.stderr)
+    if not jobs:
+        print("[ERROR] no jobs to encode", file=sys.stderr)
+        return 2
+
+    codec_params = default_codec_params(opts.codec)
+    codec_params.update(opts.param)
+    width, height = opts.size
+
+    exporter = None
+    if opts.prom_file:
+        exporter = PrometheusExporter(opts.prom_file, opts.prom_interval)
+        exporter.start()
+
+    app = QCoreApplication(sys.argv[:1])
+    worker = EncoderWorker(
+        jobs=jobs,
+        output_dir=os.path.abspath(opts.output_dir),
+        width=width,
+        height=height,
+        codec=opts.codec,
+        codec_params=codec_params,
+        pix_fmt=opts.pix_fmt,
+        audio_codec=opts.audio,
+        subtitle_codec=opts.subtitle,
+        fps=opts.fps,
+        bitrate=opts.bitrate,
+        overwrite=opts.overwrite,
+        output_format=opts.format,
+        film_grain=opts.film_grain,
+        sharpness=opts.sharpness,
+        two_pass=opts.two_pass,
+        max_jobs=opts.jobs,
+        target_size_mb=opts.target_size,
+        size_tolerance=opts.size_tolerance / 100.0,
+        metrics_dir=opts.metrics_dir,
+        exporter=exporter,
+        stage_timings=opts.stage_timings,
+        thread_budget=opts.cores,
+        pin_cpus=opts.pin_cpus,
+        priority=opts.priority,
+        cgroup=opts.cgroup,
+        adaptive=opts.adaptive,
+        min_jobs=opts.min_jobs,
+        admission=opts.admission,
+        preempt=opts.preempt,
+        retries=opts.retries,
+        cpu_fallback=opts.cpu_fallback,
+    )
+    status = {"code": 0}
+    worker.log_output.connect(lambda text: print(text, end="", flush=True))
+
+    def _on_error(msg):
+        print(f"[ERROR] {msg}", file=sys.stderr)
+        status["code"] = 2
+
+    worker.encoding_error.connect(_on_error)
+    worker.finished.connect(app.quit)
+    if not opts.preflight or _preflight(PreflightChecker(worker), worker, opts.skip_failed):
+        # Ctrl+C stops the running encodes
+        signal.signal(signal.SIGINT, lambda *_: worker.cancel())
+        if hasattr(signal, "SIGTSTP"):
+            # FFmpeg runs in its own process group, out of reach of the terminal's
+            # Ctrl+Z: stop it explicitly, then this process; SIGCONT resumes both
+            def _suspend(*_):
+                worker.pause()
+                os.kill(os.getpid(), signal.SIGSTOP)
+
+            signal.signal(signal.SIGTSTP, _suspend)
+            signal.signal(signal.SIGCONT, lambda *_: worker.resume())
+        # Python signal handlers run only when Python code does; wake up regularly
+        # so they are not held up while the encodes are stopped and silent
+        ticker = QTimer()
+        ticker.timeout.connect(lambda: None)
+        ticker.start(500)
+        worker.start()
+        app.exec()
+        worker.wait()
+    if exporter is not None:
+        exporter.stop()
+    if opts.trace:
+        try:
+            worker.trace.write(opts.trace)
+        except OSError as e:
+            print(f"[WARNING] could not write trace: {e}", file=sys.stderr)
+
+    counts: dict[str, int] = {}
+    for job in jobs:
+        counts[job.state] = counts.get(job.state, 0) + 1
+    print("Summary: " + ", ".join(f"{n} {state}" for state, n in sorted(counts.items())))
+    if status["code"] == 0 and any(j.state not in (JobState.DONE, JobState.SKIPPED) for j in jobs):
+        status["code"] = 1
+    return status["code"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,280 @@
+"""
+Memory- and disk-aware admission control for VCC batches.
+
+Slow AV1 presets at 4K/8K need gigabytes of RAM per encode, and parallel
+jobs can OOM-kill each other or fill the output disk mid-batch.  Before a
+job starts the encoder worker asks AdmissionControl whether
+
+* its estimated peak memory fits into ``MemAvailable`` (``/proc/meminfo``)
+  minus what the running jobs are still expected to grow by, and
+* its estimated output size fits into the free space of the output
+  directory minus what the running jobs are still expected to write.
+
+Otherwise the job waits (the queue shows why) until running jobs finish
+or memory is freed.  Estimates come from JobEstimator: a per-codec model
+of bytes per output pixel, scaled by preset speed and bit depth, replaced
+by the peak RSS and output bytes per content-second that earlier jobs of
+the same codec, resolution band and preset recorded in the metrics log
+(vcc.core.metrics) when such history exists.
+"""
+
+import os
+import json
+import shutil
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from vcc.core.codecs import CODECS
+from vcc.core.metrics import METRICS_FILE
+from vcc.core.tuning import resolution_band
+
+_MEMINFO = "/proc/meminfo"
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Peak RSS model: FFmpeg + decoder base plus encoder bytes per output pixel
+# at a medium preset, 8-bit
+_BASE_MEMORY = 150 * 1024 * 1024
+_BYTES_PER_PIXEL = {
+    "libsvtav1": 450,
+    "libaom-av1": 350,
+    "librav1e": 250,
+    "libvvenc": 400,
+    "libx265": 200,
+    "libvpx-vp9": 120,
+    "libx264": 100,
+    "mpeg4": 30,
+}
+_GPU_BYTES_PER_PIXEL = 40   # frames live in GPU memory; host side is mostly decode
+_DEFAULT_BYTES_PER_PIXEL = 150
+
+# History beats the model; these margins cover run-to-run variation
+_HISTORY_RECORDS = 20       # most recent matching records considered
+_MEMORY_MARGIN = 1.15
+_OUTPUT_MARGIN = 1.25
+_HISTORY_LINES = 5000       # tail of the metrics log that is read
+
+
+def mem_available(path: str = _MEMINFO) -> int | None:
+    """``MemAvailable`` in bytes, or None where /proc/meminfo is missing."""
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def disk_free(path: str) -> int | None:
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def process_rss(pid: int) -> int:
+    """Resident set size of *pid* in bytes, 0 if unknown."""
+    try:
+        with open(f"/proc/{pid}/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def format_bytes(n: float) -> str:
+    return f"{n / 1e9:.1f} GB" if n >= 1e9 else f"{n / 1e6:.0f} MB"
+
+
+def load_history(metrics_dir: str, codec: str, limit: int = _HISTORY_LINES) -> list[dict]:
+    """Finished records of *codec* among the last *limit* lines of the metrics log."""
+    lines: deque[str] = deque(maxlen=limit)
+    try:
+        with open(os.path.join(metrics_dir, METRICS_FILE), "r", encoding="utf-8") as f:
+            lines.extend(f)
+    except OSError:
+        return []
+    records = []
+    for line in lines:
+        if f'"{codec}"' not in line:
+            continue  # cheap pre-filter before parsing
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(rec, dict) and rec.get("codec") == codec and rec.get("state") == "done":
+            records.append(rec)
+    return records
+
+
+def _record_pixels(rec: dict) -> int:
+    try:
+        w, h = (int(v) for v in str(rec.get("size", "")).split("x"))
+    except ValueError:
+        return 0
+    return w * h
+
+
+def _slowness(codec: str, params: dict[str, str]) -> float:
+    """0.0 for the codec's fastest preset .. 1.0 for its slowest; 0.5 if unknown."""
+    defs = CODECS.get(codec, {}).get("params", {})
+    for key in ("preset", "cpu-used", "speed"):
+        spec = defs.get(key)
+        if spec is None:
+            continue
+        value = params.get(key, spec.get("default"))
+        try:
+            if spec["type"] == "choice":
+                choices = [c for c in spec["choices"] if c]
+                return choices.index(str(value)) / max(1, len(choices) - 1)  # fast -> slow
+            lo, hi = spec["min"], spec["max"]
+            return 1.0 - (int(value) - lo) / max(1, hi - lo)  # 0 = slowest
+        except (KeyError, ValueError, TypeError):
+            return 0.5
+    return 0.5
+
+
+class JobEstimator:
+    """Peak memory and output size estimates for the jobs of one batch."""
+
+    def __init__(self, codec: str, width: int, height: int, pix_fmt: str = "",
+                 gpu: bool = False, history: list[dict] | None = None):
+        self.codec = codec
+        self.pixels = width * height
+        self.band = resolution_band(width, height)
+        self.deep = any(d in pix_fmt for d in ("10", "12", "16"))
+        self.gpu = gpu
+        self._history = [r for r in history or ()
+                         if _record_pixels(r) and resolution_band(
+                             *(int(v) for v in r["size"].split("x"))) == self.band]
+
+    def _matching(self, params: dict[str, str], key: str) -> list[dict]:
+        """Recent history records with *params*' value of *key* (all if none match)."""
+        records = [r for r in self._history
+                   if str((r.get("params") or {}).get(key, "")) == str(params.get(key, ""))]
+        return (records or self._history)[-_HISTORY_RECORDS:]
+
+    def memory(self, params: dict[str, str]) -> tuple[int, str]:
+        """(estimated peak RSS in bytes, "history" or "model") for a job with *params*."""
+        per_pixel = [r["peak_rss_bytes"] / _record_pixels(r)
+                     for r in self._matching(params, "preset") if r.get("peak_rss_bytes")]
+        if per_pixel:
+            return int(max(per_pixel) * self.pixels * _MEMORY_MARGIN), "history"
+        if self.gpu:
+            rate = _GPU_BYTES_PER_PIXEL
+        else:
+            rate = _BYTES_PER_PIXEL.get(self.codec, _DEFAULT_BYTES_PER_PIXEL)
+            rate *= 0.6 + 0.8 * _slowness(self.codec, params)
+        if self.deep:
+            rate *= 1.5
+        return int(_BASE_MEMORY + rate * self.pixels), "model"
+
+    def output(self, params: dict[str, str], duration: float, input_bytes: int,
+               input_pixels: int, video_bps: int = 0, audio_bps: int = 0,
+               target_bytes: int = 0) -> int:
+        """Estimated output size in bytes (0 if nothing is known)."""
+        if target_bytes:
+            return target_bytes
+        if video_bps and duration:
+            return int(duration * (video_bps + audio_bps) / 8 * 1.02)
+        if duration:
+            rates = [r["output_bytes"] / r["content_s"] for r in self._matching(params, "crf")
+                     if r.get("output_bytes") and r.get("content_s")]
+            if rates:
+                return int(max(rates) * duration * _OUTPUT_MARGIN)
+        # No history: assume no compression gain over the source, scaled to the new size
+        if input_pixels:
+            return int(input_bytes * min(1.0, self.pixels / input_pixels))
+        return input_bytes
+
+
+@dataclass
+class _Reservation:
+    pid: int        # FFmpeg process once running, 0 before
+    memory: int
+    output: int
+    dst: str
+    device: int
+
+
+class AdmissionControl:
+    """
+    Decides whether the next job fits into free memory and disk space.
+
+    Running jobs hold a reservation of their estimates; only the part they
+    have not used yet (RSS so far, bytes written so far) is subtracted
+    from what the system reports as free.  Called from the worker's
+    scheduler thread; pids are attached from the pool threads.
+    """
+
+    MEMORY_RESERVE = 0.05           # fraction of MemTotal left to everything else
+    DISK_RESERVE = 512 * 1024 ** 2  # bytes kept free on the output filesystem
+
+    def __init__(self, meminfo: str = _MEMINFO):
+        self.meminfo = meminfo
+        self.mem_total = self._mem_total()
+        self._held: dict[int, _Reservation] = {}
+        self._lock = threading.Lock()
+
+    def _mem_total(self) -> int:
+        try:
+            with open(self.meminfo, "r", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0
+
+    @staticmethod
+    def _device(path: str) -> int:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            return -1
+
+    def check(self, memory: int, output: int, dst: str) -> tuple[str, str]:
+        """("", "") if a job with these estimates fits now, else (resource, reason)."""
+        with self._lock:
+            held = list(self._held.values())
+        available = mem_available(self.meminfo)
+        if available is not None and memory:
+            growing = sum(max(0, r.memory - process_rss(r.pid)) if r.pid else r.memory
+                          for r in held)
+            headroom = available - growing - int(self.mem_total * self.MEMORY_RESERVE)
+            if memory > headroom:
+                return "memory", (f"needs ~{format_bytes(memory)} RAM, "
+                                  f"{format_bytes(max(0, headroom))} available")
+        out_dir = os.path.dirname(dst) or "."
+        free = disk_free(out_dir)
+        if free is not None and output:
+            device = self._device(out_dir)
+            pending = sum(max(0, r.output - _file_size(r.dst)) for r in held if r.device == device)
+            headroom = free - pending - self.DISK_RESERVE
+            if output > headroom:
+                return "disk", (f"needs ~{format_bytes(output)} disk, "
+                                f"{format_bytes(max(0, headroom))} free in {out_dir}")
+        return "", ""
+
+    def admit(self, idx: int, memory: int, output: int, dst: str) -> None:
+        with self._lock:
+            self._held[idx] = _Reservation(0, memory, output, dst,
+                                           self._device(os.path.dirname(dst) or "."))
+
+    def attach(self, idx: int, pid: int) -> None:
+        """Record the FFmpeg process of admitted job *idx* so its RSS can be tracked."""
+        with self._lock:
+            if idx in self._held:
+                self._held[idx].pid = pid
+
+    def release(self, idx: int) -> None:
+        with self._lock:
+            self._held.pop(idx, None)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
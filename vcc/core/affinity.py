@@ -0,0 +1,129 @@
+"""
+CPU affinity and NUMA-aware pinning for VCC.
+
+On multi-socket machines parallel encodes migrate between sockets and
+pay for remote memory traffic.  With pinning enabled every FFmpeg child
+is started on a fixed core set (``os.sched_setaffinity`` in the child,
+before exec, so every thread FFmpeg creates inherits it).  Core sets are
+taken from the NUMA topology in ``/sys/devices/system/node``: each job
+goes to the node with the most free cores, so jobs spread evenly across
+nodes, and no two running jobs share a core unless there are more jobs
+than cores.  The set's size is the job's share of the thread budget
+(see vcc.core.threads).
+
+Pinning is only available where ``os.sched_setaffinity`` exists (Linux).
+"""
+
+import os
+import glob
+import threading
+from functools import partial
+
+_NODE_DIR = "/sys/devices/system/node"
+
+PINNING_SUPPORTED = hasattr(os, "sched_setaffinity")
+
+
+def parse_cpulist(text: str) -> list[int]:
+    """Expand a kernel CPU list such as ``0-3,8-11`` into CPU numbers."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        cpus.extend(range(int(lo), int(hi) + 1) if sep else [int(lo)])
+    return cpus
+
+
+def format_cpulist(cpus: list[int]) -> str:
+    """Compact form of *cpus*, the inverse of parse_cpulist()."""
+    parts = []
+    cpus = sorted(cpus)
+    i = 0
+    while i < len(cpus):
+        j = i
+        while j + 1 < len(cpus) and cpus[j + 1] == cpus[j] + 1:
+            j += 1
+        parts.append(str(cpus[i]) if i == j else f"{cpus[i]}-{cpus[j]}")
+        i = j + 1
+    return ",".join(parts)
+
+
+def numa_nodes() -> list[list[int]]:
+    """CPUs this process may use, grouped by NUMA node (one group without NUMA)."""
+    allowed = set(os.sched_getaffinity(0)) if PINNING_SUPPORTED else set(range(os.cpu_count() or 1))
+    nodes = []
+    for path in sorted(glob.glob(os.path.join(_NODE_DIR, "node[0-9]*", "cpulist")),
+                       key=lambda p: int(os.path.basename(os.path.dirname(p))[4:])):
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                cpus = [c for c in parse_cpulist(f.read()) if c in allowed]
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(allowed)]
+
+
+def affinity_preexec(cpus: list[int]):
+    """A ``preexec_fn`` that pins the child process to *cpus*."""
+    return partial(os.sched_setaffinity, 0, cpus)
+
+
+class CorePlanner:
+    """
+    Assigns disjoint core sets to running jobs, spread across NUMA nodes.
+
+    Called from the worker's scheduler thread when a job starts and when
+    it finishes.
+    """
+
+    def __init__(self, nodes: list[list[int]] | None = None):
+        self.nodes = nodes if nodes is not None else numa_nodes()
+        self.total = sum(len(cpus) for cpus in self.nodes)
+        self._free = [list(cpus) for cpus in self.nodes]
+        # job -> ([(node, cpus taken from the pool)], nodes it runs on)
+        self._held: dict[int, tuple[list[tuple[int, list[int]]], list[int]]] = {}
+        self._jobs_on = [0] * len(self.nodes)
+        self._lock = threading.Lock()
+
+    def acquire(self, idx: int, count: int) -> tuple[list[int], list[int]]:
+        """Reserve about *count* cores for job *idx*; return (cpus, nodes used).
+
+        Takes cores from the node with the most free cores first and only
+        spills onto further nodes when one node cannot hold the job.  If
+        every core is taken, the job shares the node running fewest jobs.
+        """
+        with self._lock:
+            taken: list[tuple[int, list[int]]] = []
+            want = max(1, count)
+            order = sorted(range(len(self.nodes)), key=lambda n: (-len(self._free[n]), n))
+            for node in order:
+                if want <= 0 or not self._free[node]:
+                    break
+                cpus, self._free[node] = self._free[node][:want], self._free[node][want:]
+                taken.append((node, cpus))
+                want -= len(cpus)
+            if taken:
+                used = [node for node, _ in taken]
+                cpus = sorted(c for _, group in taken for c in group)
+            else:
+                # Shared cores are not taken from (or returned to) the pool
+                node = min(range(len(self.nodes)), key=lambda n: (self._jobs_on[n], n))
+                used = [node]
+                cpus = list(self.nodes[node])
+            for node in used:
+                self._jobs_on[node] += 1
+            self._held[idx] = (taken, used)
+            return cpus, used
+
+    def release(self, idx: int) -> None:
+        with self._lock:
+            held = self._held.pop(idx, None)
+            if held is None:
+                return
+            taken, used = held
+            for node, cpus in taken:
+                self._free[node] = sorted(self._free[node] + cpus)
+            for node in used:
+                self._jobs_on[node] -= 1
@@ -0,0 +1,184 @@
+"""
+Bottleneck analyzer for VCC.
+
+Runs a short segment of one queued file three ways with the current batch
+settings - decode only, decode plus the ``-vf`` chain that
+``build_ffmpeg_args`` would use, and the full encode - all into the null
+muxer, and compares the frame rates.  Whichever stage brings the rate
+down the most is the bottleneck: a slow 10-bit HEVC decode, a ``crop`` +
+``scale`` chain at 8K, or the encoder itself.  The report ends with
+suggestions for that stage.
+
+Run from the GUI: Tools → Analyze Bottleneck.
+"""
+
+import os
+import re
+import time
+import subprocess
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from vcc.core.encoder import EncoderWorker, probe_media
+from vcc.core.gpu_detect import probe_available_gpu_encoders
+from vcc.core.jobs import Job
+
+STAGES = ("decode", "filter", "encode")
+_STAGE_LABELS = {"decode": "Decode only", "filter": "Decode + filters", "encode": "Full encode"}
+
+# A stage "explains" the final rate when the full encode gets within this
+# fraction of its rate
+_BOUND_RATIO = 0.8
+
+_FRAME_RE = re.compile(r"frame=\s*(\d+)")
+
+
+def _run_stage(args: list[str]) -> dict:
+    """Run one FFmpeg test command and return frames, wall/CPU time and errors."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+    )
+    stderr = process.stderr.read()
+    process.stderr.close()
+    cpu = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        cpu = usage.ru_utime + usage.ru_stime
+    else:
+        process.wait()
+    wall = time.perf_counter() - start
+    frames = _FRAME_RE.findall(stderr)
+    n = int(frames[-1]) if frames else 0
+    tail = stderr.strip().splitlines()
+    return {
+        "ok": process.returncode == 0,
+        "frames": n,
+        "wall_s": wall,
+        "fps": n / wall if wall > 0 else 0.0,
+        "cpu_s": cpu,
+        "error": "" if process.returncode == 0 else (tail[-1] if tail else f"exit {process.returncode}"),
+    }
+
+
+def classify(results: dict[str, dict]) -> str:
+    """Name the limiting stage from the three runs' fps: decode, filter or encode."""
+    dec, filt, enc = (results[s]["fps"] for s in STAGES)
+    if dec > 0 and enc >= dec * _BOUND_RATIO:
+        return "decode"
+    if filt > 0 and enc >= filt * _BOUND_RATIO:
+        return "filter"
+    return "encode"
+
+
+def suggestions(bottleneck: str, worker: EncoderWorker, info: dict | None,
+                results: dict[str, dict]) -> list[str]:
+    """Concrete things to try for *bottleneck* with this batch's settings."""
+    info = info or {}
+    cores = os.cpu_count() or 1
+    tips = []
+    if bottleneck == "decode":
+        gpu_hwaccel = worker.gpu_encoder.hwaccel_flag if worker.gpu_encoder else ""
+        if gpu_hwaccel:
+            tips.append(f"Decoding already uses -hwaccel {gpu_hwaccel}; the source "
+                        f"({info.get('vcodec') or 'unknown codec'}) may not be supported by it.")
+        else:
+            flags = sorted({g.hwaccel_flag for g in probe_available_gpu_encoders() if g.hwaccel_flag})
+            if flags:
+                tips.append(f"Use hardware decoding (-hwaccel {flags[0]}), e.g. by picking a GPU encoder.")
+            else:
+                tips.append("Hardware decoding (-hwaccel cuda/qsv/vaapi) would offload the "
+                            f"{info.get('vcodec') or 'source'} decode; none was detected here.")
+        tips.append("Run more files in parallel (Parallel jobs): a single decoder thread "
+                    "is often the limit for 10-bit HEVC / AV1 sources.")
+    elif bottleneck == "filter":
+        tips.append(f"Add -filter_threads {min(cores, 16)} so the crop/scale chain uses more cores.")
+        tips.append("Use a cheaper scaler, e.g. scale=W:H:flags=bilinear (or fast_bilinear) "
+                    "instead of the default bicubic.")
+        if (info.get("width") or 0) >= 3840:
+            tips.append("For 4K/8K sources scale on the GPU (scale_cuda / scale_qsv / scale_vaapi) "
+                        "or with zscale.")
+        if not worker.pix_fmt:
+            tips.append("Set the output pixel format explicitly to avoid an extra conversion.")
+    else:
+        cpu = results["encode"]["cpu_s"]
+        wall = results["encode"]["wall_s"]
+        if cpu is not None and wall > 0 and cpu / wall < cores * 0.6:
+            tips.append(f"The encoder used {cpu / wall:.1f} of {cores} cores: raise Parallel jobs "
+                        "to fill the machine.")
+        tips.append("Choose a faster preset (higher SVT-AV1 preset / faster x264/x265 preset).")
+        if worker.gpu_encoder is None:
+            gpus = [g.name for g in probe_available_gpu_encoders()]
+            if gpus:
+                tips.append(f"A GPU encoder is available: {', '.join(gpus)}.")
+    return tips
+
+
+class BottleneckAnalyzer(QThread):
+    """
+    Runs the three-stage analysis for one job in the background.
+    Emits log lines while running and a result dict when done.
+    """
+
+    log_output = pyqtSignal(str)
+    analysis_done = pyqtSignal(dict)    # {"stages": {...}, "bottleneck": str, "suggestions": [...]}
+    analysis_error = pyqtSignal(str)
+
+    def __init__(self, worker: EncoderWorker, job: Job, seconds: float = 10.0, parent=None):
+        super().__init__(parent)
+        self.worker = worker      # configured with the batch settings; never started
+        self.job = job
+        self.seconds = seconds
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        worker = self.worker
+        info = probe_media(worker.ffmpeg_path, self.job.source)
+        duration = (info or {}).get("duration", 0.0)
+        # Skip intros: start a quarter in (at most a minute), like cropdetect
+        start = min(60.0, duration / 4) if duration > self.seconds * 2 else 0.0
+        job = Job(self.job.source, crop=self.job.crop, overrides=self.job.overrides,
+                  trim_start=f"{start:.3f}" if start else "")
+        name = os.path.basename(job.source)
+        self.log_output.emit(f"Analyzing {name}: {self.seconds:g} s from {start:.0f} s\n\n")
+
+        results = {}
+        for stage in STAGES:
+            if self._cancelled:
+                return
+            args = worker.build_test_args(job, self.seconds, stage)
+            cmd_display = " ".join(f'"{a}"' if " " in a else a for a in args)
+            self.log_output.emit(f"[{stage}] > {cmd_display}\n")
+            try:
+                r = _run_stage(args)
+            except FileNotFoundError:
+                self.analysis_error.emit("ffmpeg not found!")
+                return
+            results[stage] = r
+            if not r["ok"]:
+                self.analysis_error.emit(f"{_STAGE_LABELS[stage]} failed: {r['error']}")
+                return
+            cpu = f", {r['cpu_s'] / r['wall_s']:.1f} cores" if r["cpu_s"] is not None and r["wall_s"] else ""
+            self.log_output.emit(f"[{stage}] {r['frames']} frames in {r['wall_s']:.2f} s "
+                                 f"= {r['fps']:.1f} fps{cpu}\n\n")
+
+        bottleneck = classify(results)
+        tips = suggestions(bottleneck, worker, info, results)
+        lines = ["Stage                 fps    share of encode time"]
+        total = 1.0 / results["encode"]["fps"] if results["encode"]["fps"] else 0.0
+        prev = 0.0
+        for stage in STAGES:
+            fps = results[stage]["fps"]
+            per_frame = 1.0 / fps if fps else 0.0
+            cost = max(0.0, per_frame - prev)
+            prev = max(prev, per_frame)
+            share = f"{cost / total:6.0%}" if total else "     -"
+            lines.append(f"{_STAGE_LABELS[stage]:<18} {fps:8.1f}   {share}")
+        lines.append(f"\nBottleneck: {bottleneck}")
+        lines.extend(f"  - {tip}" for tip in tips)
+        self.log_output.emit("\n".join(lines) + "\n")
+        self.analysis_done.emit({"stages": results, "bottleneck": bottleneck, "suggestions": tips})
@@ -0,0 +1,230 @@
+"""
+Parallelism auto-tuner for VCC.
+
+Whether a machine encodes fastest with many jobs of few threads or a few
+jobs with many threads depends on the codec, preset and resolution.  The
+tuner runs a short segment of a local sample with the current batch
+settings at each split from ``candidate_splits()`` - N identical encodes
+at once into the null muxer, each limited to its share of the cores like
+the scheduler does - and measures aggregate content-seconds per
+wall-second.  The winner is stored per codec and resolution band (see
+vcc.core.tuning) and used when Parallel jobs is set to Auto.
+
+Run from the GUI (Tools → Auto-Tune Parallel Jobs) or headless with
+``python -m vcc.core.autotune``.
+"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import subprocess
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from vcc.core.benchmark import render_source
+from vcc.core.encoder import EncoderWorker, probe_media
+from vcc.core.jobs import Job
+from vcc.core.metrics import ffmpeg_version
+from vcc.core.threads import default_cores
+from vcc.core.tuning import candidate_splits, resolution_band, save_tuning, tuning_key
+
+# Prefer fewer parallel jobs (less memory, fewer open files) unless more
+# jobs beat them by more than this fraction
+_TIE_MARGIN = 0.02
+
+# Synthetic sample rendered at the band's resolution when no file is given
+_SYNTHETIC_SOURCE = "testsrc2"
+_SYNTHETIC_RESOLUTIONS = (("720p", 720), ("1080p", 1080), ("4K", 2160))
+
+
+def pick_best(results: list[dict]) -> dict:
+    """The fastest split, or one with fewer jobs within the tie margin."""
+    top = max(r["throughput"] for r in results)
+    return min((r for r in results if r["throughput"] >= top * (1 - _TIE_MARGIN)),
+               key=lambda r: r["jobs"])
+
+
+class AutoTuner(QThread):
+    """
+    Calibrates the jobs x threads split for the batch settings of *worker*.
+    Emits log lines while running and the stored entry when done.
+    """
+
+    log_output = pyqtSignal(str)
+    tuning_done = pyqtSignal(dict)      # the entry saved to the tuning file
+    tuning_error = pyqtSignal(str)
+
+    def __init__(self, worker: EncoderWorker, sample: str = "", seconds: float = 10.0,
+                 cores: int = 0, path: str = "", parent=None):
+        super().__init__(parent)
+        self.worker = worker      # configured with the batch settings; never started
+        self.sample = sample      # "" = render a synthetic clip
+        self.seconds = seconds
+        self.cores = cores if cores > 0 else default_cores()
+        self.path = path          # tuning file, "" = ~/.vcc_tuning.json
+        self._cancelled = False
+        self._processes: list[subprocess.Popen] = []
+        self._proc_lock = threading.Lock()
+
+    def cancel(self):
+        self._cancelled = True
+        with self._proc_lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+    def _synthetic_sample(self) -> str:
+        short = min(self.worker.width, self.worker.height)
+        resolution = next((r for r, h in _SYNTHETIC_RESOLUTIONS if short <= h),
+                          _SYNTHETIC_RESOLUTIONS[-1][0])
+        cache_dir = os.path.join(tempfile.gettempdir(), "vcc_bench_sources")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.log_output.emit(f"Rendering {_SYNTHETIC_SOURCE} {resolution} sample...\n")
+        return render_source(self.worker.ffmpeg_path, _SYNTHETIC_SOURCE, resolution,
+                             int(self.seconds), cache_dir)
+
+    def _run_split(self, args: list[str], jobs: int) -> tuple[float, str]:
+        """Run *jobs* copies of *args* at once; return (wall seconds, first error)."""
+        start = time.perf_counter()
+        processes = []
+        with self._proc_lock:
+            for _ in range(jobs):
+                process = subprocess.Popen(
+                    args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE, text=True,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+                )
+                processes.append(process)
+            self._processes = processes
+        error = ""
+        for process in processes:
+            _, stderr = process.communicate()
+            if process.returncode != 0 and not error:
+                tail = stderr.strip().splitlines()
+                error = tail[-1] if tail else f"exit {process.returncode}"
+        wall = time.perf_counter() - start
+        with self._proc_lock:
+            self._processes = []
+        return wall, error
+
+    def run(self):
+        worker = self.worker
+        try:
+            sample = self.sample or self._synthetic_sample()
+        except (OSError, RuntimeError) as e:
+            self.tuning_error.emit(str(e))
+            return
+        info = probe_media(worker.ffmpeg_path, sample)
+        if info is None:
+            self.tuning_error.emit(f"Could not probe {sample}.")
+            return
+        duration = info.get("duration", 0.0)
+        start = min(60.0, duration / 4) if duration > self.seconds * 2 else 0.0
+        segment = min(self.seconds, duration - start) if duration > 0 else self.seconds
+        job = Job(sample, trim_start=f"{start:.3f}" if start else "")
+        band = resolution_band(worker.width, worker.height)
+        self.log_output.emit(
+            f"Auto-tuning {worker.codec} at {worker.width}x{worker.height} ({band}) on "
+            f"{self.cores} cores: {segment:g} s of {os.path.basename(sample)}\n\n"
+        )
+
+        results = []
+        for jobs, threads in candidate_splits(self.cores):
+            if self._cancelled:
+                return
+            # A job that gets the whole machine keeps FFmpeg's defaults, as in the scheduler
+            args = worker.build_test_args(job, self.seconds, "encode",
+                                          threads if threads < default_cores() else 0)
+            args[1:1] = ["-nostats", "-loglevel", "error"]
+            try:
+                wall, error = self._run_split(args, jobs)
+            except FileNotFoundError:
+                self.tuning_error.emit("ffmpeg not found!")
+                return
+            if self._cancelled:
+                return
+            if error:
+                self.tuning_error.emit(f"{jobs} jobs x {threads} threads failed: {error}")
+                return
+            throughput = jobs * segment / wall if wall > 0 else 0.0
+            results.append({"jobs": jobs, "threads": threads,
+                            "wall_s": round(wall, 3), "throughput": round(throughput, 3)})
+            self.log_output.emit(f"  {jobs:2d} jobs x {threads:2d} threads: "
+                                 f"{throughput:6.2f}x realtime ({wall:.1f} s)\n")
+
+        best = pick_best(results)
+        entry = {
+            "codec": worker.codec,
+            "band": band,
+            "params": dict(worker.codec_params),
+            "jobs": best["jobs"],
+            "threads": best["threads"],
+            "cores": self.cores,
+            "throughput": best["throughput"],
+            "results": results,
+            "sample": os.path.basename(sample),
+            "seconds": segment,
+            "host": socket.gethostname(),
+            "ffmpeg": ffmpeg_version(worker.ffmpeg_path),
+            "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        try:
+            path = save_tuning(tuning_key(worker.codec, worker.width, worker.height), entry, self.path)
+        except OSError as e:
+            self.tuning_error.emit(f"Could not save tuning: {e}")
+            return
+        self.log_output.emit(
+            f"\nBest: {best['jobs']} jobs x {best['threads']} threads = "
+            f"{best['throughput']:.2f}x realtime\nSaved: {path}\n"
+        )
+        self.tuning_done.emit(entry)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Headless entry point: ``python -m vcc.core.autotune``."""
+    import argparse
+    import sys
+    from PyQt6.QtCore import QCoreApplication
+    from vcc.cli import _parse_param, _parse_size, default_codec_params
+
+    parser = argparse.ArgumentParser(description="Calibrate VCC's parallel jobs x threads split")
+    parser.add_argument("--codec", default="libsvtav1", help="video encoder (%(default)s)")
+    parser.add_argument("-p", "--param", type=_parse_param, action="append", default=[],
+                        metavar="KEY=VALUE", help="codec parameter, e.g. preset=6 (repeatable)")
+    parser.add_argument("--size", type=_parse_size, default=(1280, 720), metavar="WxH",
+                        help="output resolution (1280x720)")
+    parser.add_argument("--pix-fmt", default="", help="output pixel format (encoder default)")
+    parser.add_argument("--sample", default="", help="video to encode (default: synthetic clip)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="segment length (%(default)s)")
+    parser.add_argument("--cores", type=int, default=0, help="cores to divide (all usable)")
+    opts = parser.parse_args(argv)
+
+    codec_params = default_codec_params(opts.codec)
+    codec_params.update(opts.param)
+    width, height = opts.size
+    app = QCoreApplication(sys.argv[:1])
+    worker = EncoderWorker(
+        jobs=[], output_dir=tempfile.gettempdir(), width=width, height=height,
+        codec=opts.codec, codec_params=codec_params, pix_fmt=opts.pix_fmt,
+        audio_codec="copy", subtitle_codec="copy",
+    )
+    tuner = AutoTuner(worker, opts.sample, opts.seconds, opts.cores)
+    status = {"code": 0}
+    tuner.log_output.connect(lambda text: print(text, end="", flush=True))
+
+    def _on_error(msg):
+        print(f"[ERROR] {msg}", file=sys.stderr)
+        status["code"] = 1
+
+    tuner.tuning_error.connect(_on_error)
+    tuner.finished.connect(app.quit)
+    tuner.start()
+    app.exec()
+    tuner.wait()
+    return status["code"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,408 @@
+"""
+Encoder throughput benchmark for VCC.
+
+Renders deterministic synthetic sources with FFmpeg's lavfi generators
+(testsrc2, mandelbrot, seeded noise) at 720p / 1080p / 4K, then times
+every available encoder from CODECS plus the detected GPU encoders across
+their preset range.  Each run records fps, CPU time and output bitrate;
+results are written as JSON and CSV together with a comparison table so
+machines and FFmpeg builds can be compared reproducibly.
+
+Run from the GUI (Tools → Encoder Benchmark) or headless with
+``python -m vcc.core.benchmark``.
+"""
+
+import os
+import csv
+import json
+import time
+import shutil
+import socket
+import platform
+import subprocess
+import tempfile
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from vcc.core.codecs import CODECS
+from vcc.core.encoder import find_ffmpeg
+from vcc.core.gpu_detect import probe_available_gpu_encoders
+from vcc.core.pixel_formats import query_encoder_pix_fmts
+
+
+# lavfi source graphs; every generator is deterministic (noise is seeded)
+BENCH_SOURCES = {
+    "testsrc2": "testsrc2=size={w}x{h}:rate={fps}",
+    "mandelbrot": "mandelbrot=size={w}x{h}:rate={fps}",
+    "noise": "color=c=gray:size={w}x{h}:rate={fps},noise=alls=60:allf=t+u:all_seed=1234",
+}
+
+BENCH_RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+BENCH_FPS = 30
+
+# Codec parameter that selects the speed/efficiency preset
+_PRESET_KEYS = ("preset", "cpu-used", "speed")
+
+_CSV_FIELDS = [
+    "source", "resolution", "codec", "gpu", "preset", "frames", "wall_s",
+    "fps", "cpu_s", "cpu_util", "bitrate_kbps", "size_bytes", "ok", "error",
+]
+
+_NO_WINDOW = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+
+
+def _run_timed(args: list[str]) -> tuple[int, float, float | None, str]:
+    """Run *args* and return (exit code, wall seconds, child CPU seconds, stderr tail).
+
+    CPU time comes from ``os.wait4`` rusage on POSIX; it is *None* elsewhere.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        creationflags=_NO_WINDOW,
+    )
+    cpu = None
+    if hasattr(os, "wait4"):
+        # Drain stderr ourselves so wait4 can reap the child and report rusage
+        stderr = process.stderr.read()
+        process.stderr.close()
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        cpu = usage.ru_utime + usage.ru_stime
+    else:
+        _, stderr = process.communicate()
+    wall = time.perf_counter() - start
+    return process.returncode, wall, cpu, stderr[-500:]
+
+
+def list_cpu_encoders(ffmpeg: str) -> list[str]:
+    """Return the CODECS entries that this FFmpeg build was compiled with."""
+    try:
+        out = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10, creationflags=_NO_WINDOW,
+        ).stdout
+    except Exception:
+        return []
+    return [name for name in CODECS if f" {name} " in out or f" {name}\n" in out]
+
+
+def preset_range(codec: str, quick: bool = False) -> tuple[str, list[str]]:
+    """Return (preset flag, values) covering *codec*'s preset range.
+
+    *quick* keeps only the fastest, middle and slowest values.
+    """
+    key, values = "", []
+    gpu = next((g for g in probe_available_gpu_encoders() if g.name == codec), None)
+    if gpu:
+        key, values = gpu.preset_key, [str(v) for v in gpu.preset_values]
+    else:
+        params = CODECS.get(codec, {}).get("params", {})
+        for candidate in _PRESET_KEYS:
+            pdef = params.get(candidate)
+            if not pdef:
+                continue
+            key = candidate
+            if pdef["type"] == "int":
+                values = [str(v) for v in range(pdef["min"], pdef["max"] + 1)]
+            else:
+                values = [v for v in pdef["choices"] if v]
+            break
+    if quick and len(values) > 3:
+        values = [values[0], values[len(values) // 2], values[-1]]
+    return key, values
+
+
+def _quality_args(codec: str) -> list[str]:
+    """Default quality arguments so every preset is measured at the same quality target."""
+    gpu = next((g for g in probe_available_gpu_encoders() if g.name == codec), None)
+    if gpu:
+        return [f"-{gpu.quality_param}", str(gpu.quality_default)]
+    args = []
+    for key, pdef in CODECS.get(codec, {}).get("params", {}).items():
+        if key in _PRESET_KEYS or key == "tune":
+            continue
+        args.extend([f"-{key}", str(pdef.get("default", ""))])
+    if codec == "libvpx-vp9":
+        args.extend(["-b:v", "0"])  # CRF mode
+    return args
+
+
+def _bench_pix_fmt(codec: str) -> str:
+    supported = query_encoder_pix_fmts(codec)
+    if not supported or "yuv420p" in supported:
+        return "yuv420p"
+    return supported[0]
+
+
+def render_source(ffmpeg: str, source: str, resolution: str, seconds: int,
+                  cache_dir: str) -> str:
+    """Render a lavfi source once to a lossless FFV1 file and return its path.
+
+    Pre-rendering keeps expensive generators (mandelbrot) out of the encode
+    timings; the file is reused while it exists.
+    """
+    w, h = BENCH_RESOLUTIONS[resolution]
+    path = os.path.join(cache_dir, f"{source}_{resolution}_{seconds}s.mkv")
+    if os.path.isfile(path):
+        return path
+    graph = BENCH_SOURCES[source].format(w=w, h=h, fps=BENCH_FPS)
+    tmp = path + ".part.mkv"
+    args = [
+        ffmpeg, "-hide_banner", "-nostdin", "-y",
+        "-f", "lavfi", "-i", graph,
+        "-t", str(seconds), "-pix_fmt", "yuv420p",
+        "-c:v", "ffv1", "-level", "3", "-slices", "16",
+        tmp,
+    ]
+    code, _, _, err = _run_timed(args)
+    if code != 0:
+        raise RuntimeError(f"could not render {source} {resolution}: {err.strip()}")
+    os.replace(tmp, path)
+    return path
+
+
+def bench_encode(ffmpeg: str, sample: str, codec: str, preset_key: str, preset: str,
+                 seconds: int, work_dir: str) -> dict:
+    """Encode *sample* once and return a result row."""
+    out = os.path.join(work_dir, f"bench_{codec}_{preset}.mkv")
+    args = [ffmpeg, "-hide_banner", "-nostdin", "-y", "-i", sample, "-an", "-c:v", codec]
+    if preset_key:
+        args.extend([f"-{preset_key}", preset])
+    args.extend(_quality_args(codec))
+    args.extend(["-pix_fmt", _bench_pix_fmt(codec), out])
+
+    code, wall, cpu, err = _run_timed(args)
+    frames = seconds * BENCH_FPS
+    size = os.path.getsize(out) if os.path.isfile(out) else 0
+    try:
+        os.unlink(out)
+    except OSError:
+        pass
+    ok = code == 0
+    error = ""
+    if not ok:
+        tail = err.strip().splitlines()
+        error = tail[-1] if tail else f"exit {code}"
+    return {
+        "codec": codec,
+        "preset": preset,
+        "frames": frames,
+        "wall_s": round(wall, 3),
+        "fps": round(frames / wall, 2) if ok and wall > 0 else 0.0,
+        "cpu_s": round(cpu, 3) if cpu is not None else None,
+        "cpu_util": round(cpu / wall, 2) if cpu is not None and wall > 0 else None,
+        "bitrate_kbps": round(size * 8 / seconds / 1000, 1) if ok else 0.0,
+        "size_bytes": size,
+        "ok": ok,
+        "error": error,
+    }
+
+
+def machine_info(ffmpeg: str) -> dict:
+    """Describe the machine and FFmpeg build so result files are comparable."""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    try:
+        version = subprocess.run(
+            [ffmpeg, "-hide_banner", "-version"],
+            capture_output=True, text=True, timeout=10, creationflags=_NO_WINDOW,
+        ).stdout.splitlines()[0]
+    except Exception:
+        version = "unknown"
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "cpu": cpu_model,
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": version,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def format_comparison_table(results: list[dict]) -> str:
+    """Render fps per codec/preset (rows) and source/resolution (columns) as text."""
+    columns = sorted({(r["source"], r["resolution"]) for r in results},
+                     key=lambda c: (c[0], list(BENCH_RESOLUTIONS).index(c[1])))
+    rows: dict[tuple[str, str], dict] = {}
+    for r in results:
+        rows.setdefault((r["codec"], r["preset"]), {})[(r["source"], r["resolution"])] = r
+    headers = ["codec", "preset"] + [f"{s} {res}" for s, res in columns]
+    lines = []
+    for (codec, preset), cells in rows.items():
+        line = [codec, preset]
+        for col in columns:
+            r = cells.get(col)
+            if r is None:
+                line.append("")
+            elif not r["ok"]:
+                line.append("FAIL")
+            else:
+                line.append(f"{r['fps']:.1f}fps {r['bitrate_kbps']:.0f}k")
+        lines.append(line)
+    widths = [max(len(str(x)) for x in col) for col in zip(headers, *lines)] if lines else []
+    fmt = "  ".join(f"{{:<{w}}}" for w in widths)
+    out = [fmt.format(*headers), fmt.format(*("-" * w for w in widths))]
+    out.extend(fmt.format(*line) for line in lines)
+    return "\n".join(line.rstrip() for line in out)
+
+
+def write_results(results: list[dict], info: dict, out_dir: str) -> tuple[str, str]:
+    """Write JSON (with machine info) and CSV result files; return their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(out_dir, f"bench-{info['host']}-{stamp}")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({"machine": info, "results": results}, f, indent=2)
+    with open(base + ".csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=_CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    return base + ".json", base + ".csv"
+
+
+def default_results_dir() -> str:
+    return os.path.join(os.path.expanduser("~"), ".vcc_benchmarks")
+
+
+class BenchmarkWorker(QThread):
+    """
+    Runs the encoder benchmark in the background.
+    Emits log lines while running and the JSON result path when done.
+    """
+
+    log_output = pyqtSignal(str)
+    benchmark_done = pyqtSignal(str)    # path of the JSON results file
+    benchmark_error = pyqtSignal(str)
+
+    def __init__(
+        self,
+        sources: list[str],
+        resolutions: list[str],
+        seconds: int = 5,
+        quick: bool = False,
+        codecs: list[str] | None = None,
+        out_dir: str = "",
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.sources = sources
+        self.resolutions = resolutions
+        self.seconds = seconds
+        self.quick = quick              # fastest / middle / slowest preset only
+        self.codecs = codecs            # None = every available encoder
+        self.out_dir = out_dir or default_results_dir()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        ffmpeg = find_ffmpeg()
+        if not shutil.which(ffmpeg) and not os.path.isfile(ffmpeg):
+            self.benchmark_error.emit("ffmpeg not found! Please install FFmpeg.")
+            return
+
+        codecs = self.codecs
+        if codecs is None:
+            codecs = list_cpu_encoders(ffmpeg) + [g.name for g in probe_available_gpu_encoders()]
+        info = machine_info(ffmpeg)
+        self.log_output.emit(f"Benchmark on {info['host']} ({info['cpu']})\n{info['ffmpeg']}\n")
+        self.log_output.emit(f"Encoders: {', '.join(codecs)}\n\n")
+
+        cache_dir = os.path.join(tempfile.gettempdir(), "vcc_bench_sources")
+        os.makedirs(cache_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="vcc_bench_")
+        results: list[dict] = []
+        try:
+            for source in self.sources:
+                for resolution in self.resolutions:
+                    if self._cancelled:
+                        break
+                    self.log_output.emit(f"Rendering {source} {resolution}...\n")
+                    try:
+                        sample = render_source(ffmpeg, source, resolution, self.seconds, cache_dir)
+                    except RuntimeError as e:
+                        self.log_output.emit(f"[ERROR] {e}\n")
+                        continue
+                    for codec in codecs:
+                        preset_key, presets = preset_range(codec, self.quick)
+                        for preset in presets or [""]:
+                            if self._cancelled:
+                                break
+                            row = bench_encode(ffmpeg, sample, codec, preset_key, preset,
+                                               self.seconds, work_dir)
+                            row.update(source=source, resolution=resolution,
+                                       gpu=codec not in CODECS)
+                            results.append(row)
+                            status = (f"{row['fps']:.1f} fps, {row['bitrate_kbps']:.0f} kb/s"
+                                      if row["ok"] else f"FAILED: {row['error']}")
+                            self.log_output.emit(
+                                f"  {codec} {preset_key} {preset} @ {source} {resolution}: {status}\n"
+                            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if not results:
+            self.benchmark_error.emit("Benchmark produced no results.")
+            return
+        json_path, csv_path = write_results(results, info, self.out_dir)
+        self.log_output.emit("\n" + format_comparison_table(results) + "\n\n")
+        self.log_output.emit(f"Results: {json_path}\n         {csv_path}\n")
+        self.benchmark_done.emit(json_path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Headless entry point: ``python -m vcc.core.benchmark``."""
+    import argparse
+    import sys
+    from PyQt6.QtCore import QCoreApplication
+
+    parser = argparse.ArgumentParser(description="VCC encoder throughput benchmark")
+    parser.add_argument("--sources", default=",".join(BENCH_SOURCES),
+                        help="comma-separated lavfi sources (%(default)s)")
+    parser.add_argument("--resolutions", default="720p,1080p",
+                        help="comma-separated resolutions: 720p,1080p,4K (%(default)s)")
+    parser.add_argument("--seconds", type=int, default=5, help="sample length (%(default)s)")
+    parser.add_argument("--codecs", default="", help="comma-separated encoders (default: all available)")
+    parser.add_argument("--quick", action="store_true", help="fastest/middle/slowest preset only")
+    parser.add_argument("--out", default=default_results_dir(), help="results directory")
+    opts = parser.parse_args(argv)
+
+    app = QCoreApplication(sys.argv[:1])
+    worker = BenchmarkWorker(
+        sources=[s for s in opts.sources.split(",") if s],
+        resolutions=[r for r in opts.resolutions.split(",") if r],
+        seconds=opts.seconds,
+        quick=opts.quick,
+        codecs=[c for c in opts.codecs.split(",") if c] or None,
+        out_dir=opts.out,
+    )
+    status = {"code": 0}
+    worker.log_output.connect(lambda text: print(text, end="", flush=True))
+
+    def _on_error(msg):
+        print(f"[ERROR] {msg}", file=sys.stderr)
+        status["code"] = 1
+
+    worker.benchmark_error.connect(_on_error)
+    worker.finished.connect(app.quit)
+    worker.start()
+    app.exec()
+    worker.wait()
+    return status["code"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 """
 Codec definitions, parameters, and help text for VCC.
 Each codec has: ffmpeg name, display name, default params with tooltips, and description.
+Codecs with ``"two_pass": True`` support two-pass encoding in target bitrate mode.
 """
 
 CODECS = {
@@ -40,6 +41,7 @@ CODECS = {
     "libx264": {
         "display": "H.264 (x264)",
         "container": "mkv",
+        "two_pass": True,
         "params": {
             "preset": {
                 "label": "Preset",
@@ -95,6 +97,7 @@ CODECS = {
     "libx265": {
         "display": "H.265 / HEVC (x265)",
         "container": "mkv",
+        "two_pass": True,
         "params": {
             "preset": {
                 "label": "Preset",
@@ -144,6 +147,7 @@ CODECS = {
     "libvpx-vp9": {
         "display": "VP9",
         "container": "webm",
+        "two_pass": True,
         "params": {
             "cpu-used": {
                 "label": "CPU Used (Speed)",
@@ -177,6 +181,7 @@ CODECS = {
     "libaom-av1": {
         "display": "AV1 (libaom - reference)",
         "container": "mkv",
+        "two_pass": True,
         "params": {
             "cpu-used": {
                 "label": "CPU Used (Speed)",
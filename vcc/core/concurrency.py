@@ -0,0 +1,144 @@
+"""
+Adaptive concurrency for VCC batches.
+
+A fixed number of parallel jobs is wrong half the time: remuxes and fast
+presets are I/O-bound and want few jobs, slow AV1 presets leave cores
+idle unless several run at once.  With adaptive parallelism the encoder
+worker asks a ConcurrencyController how many jobs to run, between a
+minimum and the Parallel jobs setting.  Every few seconds the controller
+compares
+
+* the aggregate progress rate (content-seconds encoded per second),
+* the CPU idle share and the I/O wait share from ``/proc/stat``,
+
+and steps the target by one job: up while cores sit idle and storage
+keeps up, down while the machine waits on I/O.  A change needs the same
+signal in consecutive windows, is judged after a settling period and is
+reverted if throughput did not follow; a reverted step blocks that
+direction for a while, twice as long after each further revert.
+Running jobs are never stopped - a lower target only delays the next
+start.
+"""
+
+import time
+
+# Fields of the aggregate "cpu" line in /proc/stat, in order
+_USER, _NICE, _SYSTEM, _IDLE, _IOWAIT, _IRQ, _SOFTIRQ, _STEAL = range(8)
+
+
+def read_cpu_times(path: str = "/proc/stat") -> tuple[int, int, int] | None:
+    """(idle, iowait, total) jiffies since boot, or None where /proc/stat is missing."""
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    if not fields or fields[0] != "cpu":
+        return None
+    values = [int(v) for v in fields[1:9]]  # guest time is already part of user
+    return values[_IDLE], values[_IOWAIT], sum(values)
+
+
+class ConcurrencyController:
+    """Decides the number of parallel jobs from throughput, CPU idle and I/O wait."""
+
+    INTERVAL = 5.0       # seconds per measurement window
+    STREAK = 2           # consecutive windows with the same signal before a step
+    SETTLE = 2           # windows after a step before it is judged
+    HOLD = 12            # windows a reverted direction stays blocked, doubled per repeat
+    IDLE_HIGH = 0.20     # CPU idle share above which another job may help
+    IOWAIT_HIGH = 0.15   # I/O wait share above which storage is the bottleneck
+    GAIN = 0.05          # a step must move throughput by this fraction to stay
+
+    def __init__(self, min_jobs: int, max_jobs: int, start: int = 0, proc_stat: str = "/proc/stat"):
+        self.min_jobs = max(1, min_jobs)
+        self.max_jobs = max(self.min_jobs, max_jobs)
+        self.target = min(self.max_jobs, max(self.min_jobs, start or (self.min_jobs + self.max_jobs) // 2))
+        self.proc_stat = proc_stat
+        self.available = read_cpu_times(proc_stat) is not None
+        self.reason = ""     # why the target last changed, for the log
+        self.rate = 0.0      # content-seconds per second of the last window
+        self.idle = 0.0
+        self.iowait = 0.0
+        self._window: tuple[float, float, tuple[int, int, int]] | None = None
+        self._up = self._down = 0          # streaks
+        self._settle = 0
+        self._judge: tuple[int, float] | None = None  # (target before the step, rate before)
+        self._blocked = {1: 0, -1: 0}      # direction -> windows left blocked
+        self._hold = {1: self.HOLD, -1: self.HOLD}
+
+    def restart(self) -> None:
+        """Drop the current measurement window, e.g. while jobs are paused."""
+        self._window = None
+        self._up = self._down = 0
+
+    def tick(self, content_s: float, can_grow: bool, now: float | None = None) -> bool:
+        """Feed the batch's encoded content so far; return True if the target changed.
+
+        *can_grow* is False while the batch could not use another job
+        anyway (nothing queued, or fewer jobs running than the target).
+        """
+        if not self.available:
+            return False
+        now = time.monotonic() if now is None else now
+        cpu = read_cpu_times(self.proc_stat)
+        if cpu is None:
+            return False
+        if self._window is None:
+            self._window = (now, content_s, cpu)
+            return False
+        t0, c0, cpu0 = self._window
+        if now - t0 < self.INTERVAL:
+            return False
+        self._window = (now, content_s, cpu)
+        total = max(1, cpu[2] - cpu0[2])
+        self.idle = (cpu[0] - cpu0[0]) / total
+        self.iowait = (cpu[1] - cpu0[1]) / total
+        self.rate = (content_s - c0) / (now - t0)
+        for direction in self._blocked:
+            self._blocked[direction] = max(0, self._blocked[direction] - 1)
+
+        if self._settle:
+            self._settle -= 1
+            if self._settle == 0 and self._judge is not None:
+                return self._judge_step(can_grow)
+            return False
+
+        io_bound = self.iowait > self.IOWAIT_HIGH
+        room = self.idle > self.IDLE_HIGH and not io_bound and can_grow
+        self._up = self._up + 1 if room else 0
+        self._down = self._down + 1 if io_bound else 0
+        if self._up >= self.STREAK and self.target < self.max_jobs and not self._blocked[1]:
+            return self._step(1, f"CPU {self.idle:.0%} idle")
+        if self._down >= self.STREAK and self.target > self.min_jobs and not self._blocked[-1]:
+            return self._step(-1, f"I/O wait {self.iowait:.0%}")
+        return False
+
+    def _step(self, direction: int, reason: str) -> bool:
+        self._judge = (self.target, self.rate)
+        self.target += direction
+        self.reason = reason
+        self._up = self._down = 0
+        self._settle = self.SETTLE
+        return True
+
+    def _judge_step(self, can_grow: bool) -> bool:
+        """Keep the last step if throughput followed it, otherwise undo it."""
+        before, rate = self._judge
+        self._judge = None
+        direction = 1 if self.target > before else -1
+        if direction > 0 and not can_grow:
+            return False  # the queue ran dry: throughput falls regardless
+        if direction > 0:
+            kept = self.rate >= rate * (1 + self.GAIN)
+        else:
+            kept = self.rate >= rate * (1 - self.GAIN)  # fewer jobs, same throughput
+        if kept:
+            self._hold[direction] = self.HOLD
+            return False
+        self.target = before
+        self._blocked[direction] = self._hold[direction]
+        self._hold[direction] *= 2
+        self.reason = f"throughput {rate:.2f}x -> {self.rate:.2f}x did not follow, reverted"
+        self._settle = self.SETTLE
+        return True
@@ -4,23 +4,50 @@ FFmpeg encoder worker - runs encoding in a background thread, emitting signals f
 
 import os
 import re
+import json
 import glob
 import shutil
+import signal
 import subprocess
+import heapq
+import threading
 import time
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
 from PyQt6.QtCore import QThread, pyqtSignal
-from vcc.core.gpu_detect import get_gpu_encoder, is_gpu_encoder
+from vcc.core.codecs import CODECS
+from vcc.core.jobs import Job, JobPriority, JobState
+from vcc.core.metrics import (
+    EncodeStats, JobMetrics, MetricsLog, StageTimes, default_metrics_dir, ffmpeg_version,
+)
+from vcc.core.admission import AdmissionControl, JobEstimator, format_bytes, load_history
+from vcc.core.taskqueue import TaskQueue
+from vcc.core.retry import FAILURE_HARDWARE, RetryPolicy, classify_failure, cpu_equivalent, cpu_pix_fmt
+from vcc.core.trace import TraceRecorder
+from vcc.core.concurrency import ConcurrencyController
+from vcc.core.affinity import PINNING_SUPPORTED, CorePlanner, affinity_preexec, format_cpulist
+from vcc.core.priority import DEFAULT_PROFILE, PriorityController
+from vcc.core.threads import ThreadBudget, encoder_thread_options, param_string_item
+from vcc.core.tuning import lookup_tuning, resolution_band
+from vcc.core.gpu_detect import GpuEncoder, get_gpu_encoder, is_gpu_encoder
 
 
 def find_ffmpeg() -> str:
     """
     Locate ffmpeg executable. Checks:
+    0. VCC_FFMPEG environment variable (e.g. tools/fake_ffmpeg.py launchers)
     1. System PATH (shutil.which)
     2. Winget install locations
     3. Common manual install folders
     Returns the full path to ffmpeg.exe, or 'ffmpeg' as fallback.
     """
+    # 0. Explicit override
+    override = os.environ.get("VCC_FFMPEG", "")
+    if override and os.path.isfile(override):
+        return override
+
     # 1. Check PATH
     path = shutil.which("ffmpeg")
     if path:
@@ -57,20 +84,147 @@ def find_ffmpeg() -> str:
     return "ffmpeg"  # fallback — let subprocess raise FileNotFoundError
 
 
-def probe_duration(ffmpeg_path: str, filepath: str) -> float | None:
-    """Use ffprobe (same dir as ffmpeg) to get video duration in seconds."""
-    ffprobe = ffmpeg_path.replace("ffmpeg", "ffprobe") if "ffmpeg" in ffmpeg_path else "ffprobe"
+# Probe results keyed by (path, size, mtime) so an unchanged file is probed once
+_probe_cache: dict[tuple[str, int, int], dict] = {}
+_probe_cache_lock = threading.Lock()
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def probe_media(ffmpeg_path: str, filepath: str) -> dict | None:
+    """Use ffprobe (same dir as ffmpeg) to read basic media info for *filepath*.
+
+    Returns a dict with ``duration`` (s), ``size`` (bytes), ``bit_rate``
+    (bps), ``vcodec``, ``width``, ``height``, ``audio`` (a list of
+    ``{"codec", "bit_rate", "sample_rate", "channels"}`` per audio
+    stream) and ``probe_time`` (s spent in ffprobe), or *None* if
+    probing fails.  Results are cached until the
+    file's size or modification time changes.
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    key = (filepath, st.st_size, st.st_mtime_ns)
+    with _probe_cache_lock:
+        cached = _probe_cache.get(key)
+    if cached is not None:
+        return cached
+
+    head, name = os.path.split(ffmpeg_path)
+    ffprobe = os.path.join(head, name.replace("ffmpeg", "ffprobe")) if "ffmpeg" in name else "ffprobe"
+    start = time.perf_counter()
     try:
         r = subprocess.run(
-            [ffprobe, "-v", "error", "-show_entries", "format=duration",
-             "-of", "default=noprint_wrappers=1:nokey=1", filepath],
+            [ffprobe, "-v", "error", "-print_format", "json",
+             "-show_format", "-show_streams", filepath],
             capture_output=True, text=True, timeout=10,
             creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
         )
-        return float(r.stdout.strip())
+        data = json.loads(r.stdout)
     except Exception:
         return None
 
+    fmt = data.get("format", {})
+    info = {
+        "duration": _to_float(fmt.get("duration")),
+        "size": int(_to_float(fmt.get("size"))) or st.st_size,
+        "bit_rate": int(_to_float(fmt.get("bit_rate"))),
+        "vcodec": "",
+        "width": 0,
+        "height": 0,
+        "audio": [],
+        "probe_time": time.perf_counter() - start,
+    }
+    for stream in data.get("streams", []):
+        kind = stream.get("codec_type")
+        if kind == "video" and not info["vcodec"]:
+            info["vcodec"] = stream.get("codec_name", "")
+            info["width"] = int(stream.get("width") or 0)
+            info["height"] = int(stream.get("height") or 0)
+            if not info["duration"]:
+                info["duration"] = _to_float(stream.get("duration"))
+        elif kind == "audio":
+            info["audio"].append({
+                "codec": stream.get("codec_name", ""),
+                "bit_rate": int(_to_float(stream.get("bit_rate"))),
+                "sample_rate": int(_to_float(stream.get("sample_rate"))),
+                "channels": int(stream.get("channels") or 0),
+            })
+
+    with _probe_cache_lock:
+        _probe_cache[key] = info
+    return info
+
+
+def probe_duration(ffmpeg_path: str, filepath: str) -> float | None:
+    """Use ffprobe (same dir as ffmpeg) to get video duration in seconds."""
+    info = probe_media(ffmpeg_path, filepath)
+    if info and info["duration"] > 0:
+        return info["duration"]
+    return None
+
+
+# Typical FFmpeg default bitrates (bps per stream) for re-encoded audio
+AUDIO_BITRATE_DEFAULTS = {
+    "aac": 128_000,
+    "libopus": 96_000,
+    "libvorbis": 112_000,
+    "ac3": 192_000,
+    "libmp3lame": 128_000,
+}
+
+# Container/muxing overhead reserved when sizing the video stream
+_CONTAINER_OVERHEAD = 0.02
+
+
+def estimate_audio_bitrate(info: dict | None, audio_codec: str) -> int:
+    """Estimate the total audio bitrate (bps) of the output for all mapped audio streams."""
+    streams = (info or {}).get("audio", [])
+    if audio_codec in ("none", "") or not streams:
+        return 0
+    total = 0
+    for stream in streams:
+        if audio_codec == "copy":
+            total += stream["bit_rate"] or AUDIO_BITRATE_DEFAULTS["aac"]
+        elif audio_codec == "pcm_s16le":
+            total += (stream["sample_rate"] or 48000) * (stream["channels"] or 2) * 16
+        elif audio_codec == "flac":
+            # Lossless: roughly 60% of the equivalent 16-bit PCM
+            total += int((stream["sample_rate"] or 48000) * (stream["channels"] or 2) * 16 * 0.6)
+        else:
+            total += AUDIO_BITRATE_DEFAULTS.get(audio_codec, 128_000)
+    return total
+
+
+def compute_target_bitrate(target_bytes: int, duration: float, audio_bps: int) -> int:
+    """Return the video bitrate (bps) that fits *duration* seconds into *target_bytes*.
+
+    The audio bitrate and a small container overhead are subtracted from
+    the budget first.  Returns 0 if the budget is too small.
+    """
+    if duration <= 0:
+        return 0
+    total_bps = target_bytes * 8 / duration * (1.0 - _CONTAINER_OVERHEAD)
+    return max(0, int(total_bps - audio_bps))
+
+
+def _bitrate_to_bps(text: str) -> int:
+    """FFmpeg bitrate string ("5M", "1234k", "800000") in bits per second; 0 if invalid."""
+    text = text.strip()
+    scale = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}.get(text[-1:].lower(), 1)
+    return int(_to_float(text[:-1] if scale > 1 else text) * scale)
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds + 0.5)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
 
 def _parse_time_to_seconds(time_str: str) -> float:
     """Parse HH:MM:SS.xx or seconds string to float seconds."""
@@ -118,23 +272,120 @@ def detect_crop(ffmpeg_path: str, filepath: str, skip_seconds: int = 60,
         return None
 
 
+def _wait_process(process: subprocess.Popen):
+    """Wait for *process* and return its rusage (POSIX) or None.
+
+    The caller must have drained the process's output pipes.
+    """
+    if not hasattr(os, "wait4"):
+        process.wait()
+        return None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:  # already reaped by poll()
+        process.wait()
+        return None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return usage
+
+
+def _merge_param_string(args: list[str], option: str, items: str) -> None:
+    """Append ``key=value`` *items* to *option* (e.g. -x265-params) in *args*, adding it if absent."""
+    try:
+        idx = args.index(option)
+        args[idx + 1] += ":" + items
+    except ValueError:
+        args.extend([option, items])
+
+
+# Seconds between adaptive concurrency checks while jobs run
+_CONTROL_TICK = 1.0
+
+# Seconds between memory/disk re-checks while the next job waits for room
+_ADMISSION_TICK = 2.0
+
+# Minimum seconds between file_progress updates of one job
+_PROGRESS_INTERVAL = 1.0
+
+# FFmpeg output lines kept per run to classify a failure
+_LOG_TAIL = 30
+
+# Pausing stops FFmpeg's process group with SIGSTOP (POSIX only)
+PAUSE_SUPPORTED = hasattr(signal, "SIGSTOP") and hasattr(os, "killpg")
+
+
+@dataclass(eq=False)
+class _EncodeTask:
+    """One FFmpeg invocation scheduled on the worker pool.
+
+    A single-pass job is one task (``pass_num == 0``); a two-pass job is
+    scheduled as pass 1 and, once that succeeds, pass 2.
+    """
+    idx: int
+    job: Job
+    dst: str
+    pass_num: int = 0
+    attempt: int = 1   # >1 when re-encoding to correct a target-size miss
+    lane: int = 0      # worker slot running it, for the batch timeline
+    threads: int = 0   # thread budget share, 0 = FFmpeg defaults
+    cpus: tuple[int, ...] = ()  # CPUs the process is pinned to, () = not pinned
+    retry: int = 0     # runs repeated after a failure so far
+    log: tuple[str, ...] = ()  # last non-stats FFmpeg lines of the finished run
+
+    @property
+    def src(self) -> str:
+        return self.job.source
+
+    @property
+    def continuation(self) -> bool:
+        """True for the later runs of a started job (second pass, re-encode)."""
+        return self.pass_num == 2 or self.attempt > 1 or self.retry > 0
+
+
 class EncoderWorker(QThread):
     """
     Runs FFmpeg encoding for a list of files.
     Emits signals for log output, progress, and completion.
+
+    Up to *max_jobs* FFmpeg processes run at once.  In two-pass mode each
+    pass is a separate task: second passes are queued ahead of new first
+    passes so finished analysis is consumed quickly, while free slots keep
+    picking up the next files' first passes.
+
+    In target-size mode (*target_size_mb* > 0) each file's video bitrate is
+    computed from its probed duration and the audio bitrate, and the output
+    size is checked afterwards.  A miss larger than *size_tolerance* re-runs
+    the final pass with a corrected bitrate (pass-1 stats are reused).
+
+    Jobs start in order of ``Job.priority``, then queue order.  With
+    *preempt*, an urgent job (JobPriority.URGENT) that finds every slot
+    busy stops the lowest-priority running job with SIGSTOP and continues
+    it once the urgent job has finished.  Jobs can be added, reprioritized
+    and reordered while the batch runs (add_jobs(), set_job_priority(),
+    reorder()).
+
+    Failed runs are classified (vcc.core.retry) and hardware, transient
+    and crash failures are retried up to *retries* times with backoff.
+    With *cpu_fallback*, a job whose GPU encoder keeps failing is re-run
+    on the closest CPU encoder.
     """
 
+    # Encodes per file in target-size mode, including corrective re-encodes
+    TARGET_SIZE_MAX_ATTEMPTS = 3
+
     log_output = pyqtSignal(str)        # raw line from ffmpeg
     file_started = pyqtSignal(int, int, str)  # index, total, filename
     file_finished = pyqtSignal(int, int, str, bool)  # index, total, filename, success
+    file_waiting = pyqtSignal(int, str)  # index, why it cannot start yet ("" = no longer)
+    file_paused = pyqtSignal(int, bool)  # index, paused (by pause_job() or pause())
     encoding_done = pyqtSignal()        # all files done
     encoding_error = pyqtSignal(str)    # fatal error message
-    # Per-file progress: percent (0-100), speed_str, eta_str
-    file_progress = pyqtSignal(int, str, str)
+    # Per-file progress: index, percent (0-100), speed_str, eta_str (paused time excluded)
+    file_progress = pyqtSignal(int, int, str, str)
 
     def __init__(
         self,
-        files: list[str],
+        jobs: list[Job],
         output_dir: str,
         width: int,
         height: int,
@@ -147,15 +398,30 @@ class EncoderWorker(QThread):
         bitrate: str = "",
         overwrite: bool = False,
         output_format: str = "",
-        file_trims: dict[str, tuple[str, str]] | None = None,
-        file_crops: dict[str, str] | None = None,
         concatenate: bool = False,
         film_grain: int = 0,
         sharpness: int = 0,
+        two_pass: bool = False,
+        max_jobs: int = 1,
+        target_size_mb: float = 0.0,
+        size_tolerance: float = 0.05,
+        metrics_dir: str = "",
+        exporter=None,
+        stage_timings: bool = False,
+        thread_budget: int = 0,
+        pin_cpus: bool = False,
+        priority: str = DEFAULT_PROFILE,
+        cgroup: str = "",
+        adaptive: bool = False,
+        min_jobs: int = 1,
+        admission: bool = True,
+        preempt: bool = False,
+        retries: int = 2,
+        cpu_fallback: bool = True,
         parent=None,
     ):
         super().__init__(parent)
-        self.files = files
+        self.jobs = jobs  # per-file trim / crop / overrides live on each Job
         self.output_dir = output_dir
         self.width = width
         self.height = height
@@ -168,42 +434,410 @@ class EncoderWorker(QThread):
         self.bitrate = bitrate  # e.g. "1M", "5M", or "" for default
         self.overwrite = overwrite
         self.output_format = output_format  # e.g. "mp4", "mkv", "" = auto
-        self.file_trims = file_trims or {}  # {filepath: (start, end)}
-        self.file_crops = file_crops or {}  # {filepath: "crop=W:H:X:Y"}
         self.concatenate = concatenate
         self.film_grain = film_grain     # 0 = off, 1-50 for SVT-AV1
         self.sharpness = sharpness       # 0 = off, 0-7 for SVT-AV1 / libvpx-vp9
+        self.two_pass = two_pass         # only honoured in bitrate mode, see _uses_two_pass()
+        # Parallel jobs = 0 (Auto) uses the auto-tuner's result for this codec and size
+        self.tuning = lookup_tuning(codec, width, height) if max_jobs <= 0 else None
+        self.auto_parallel = max_jobs <= 0
+        if self.tuning:
+            max_jobs = int(self.tuning["jobs"])
+            thread_budget = thread_budget or max_jobs * int(self.tuning["threads"])
+        self.max_jobs = max(1, max_jobs) # concurrent FFmpeg processes
+        self.target_size_mb = target_size_mb  # 0 = off; otherwise MB (10^6 bytes) per output
+        self.size_tolerance = size_tolerance  # allowed relative miss, e.g. 0.05 = ±5%
+        self.metrics_dir = metrics_dir   # per-job metrics log directory, "" = off
+        self._metrics: dict[int, JobMetrics] = {}  # job index -> measurements
+        self._metrics_log: MetricsLog | None = None
+        self._batch_id = ""
+        self.exporter = exporter         # PrometheusExporter or None
+        self.stage_timings = stage_timings  # run FFmpeg with -benchmark_all, see StageTimes
+        self.thread_budget = thread_budget  # cores shared by parallel jobs, 0 = all usable
+        self.pin_cpus = pin_cpus and PINNING_SUPPORTED  # NUMA-aware pinning, see vcc.core.affinity
+        self.priority = PriorityController(priority, cgroup)  # nice/ionice/cgroup profile
+        self.adaptive = adaptive  # vary parallel jobs between min_jobs and max_jobs
+        self.min_jobs = max(1, min(min_jobs, self.max_jobs))
+        self.admission = admission  # start jobs only when memory and disk allow, see vcc.core.admission
+        self._admission: AdmissionControl | None = None
+        self._estimates: dict[int, tuple[int, int]] = {}  # job index -> (peak memory, output bytes)
+        # Stats of running FFmpeg processes, for live throughput:
+        # idx -> (stats, counts content, encoder actually used)
+        self._live: dict[int, tuple[EncodeStats, bool, str]] = {}
+        self._live_lock = threading.Lock()
+        self._content_done: dict[str, float] = {}  # encoder -> content seconds of finished final-pass runs
+        self.trace = TraceRecorder()  # timeline of the last run(), see vcc.core.trace
+        self._file_bitrates: dict[str, str] = {}  # {filepath: "1234k"} in target-size mode
         self._cancelled = False
         self._ffmpeg_path = find_ffmpeg()
         self._gpu_enc = get_gpu_encoder(self.codec) if is_gpu_encoder(self.codec) else None
+        self.retry_policy = RetryPolicy(retries=max(0, retries))
+        self.cpu_fallback = cpu_fallback and self._gpu_enc is not None
+        self._processes: dict[int, subprocess.Popen] = {}  # job index -> running process
+        self._proc_lock = threading.Lock()
+        self._paused = False                 # whole batch paused: running jobs stopped, none start
+        self._paused_jobs: set[int] = set()  # job indexes paused individually
+        self._stopped_since: dict[int, float] = {}  # job index -> when its FFmpeg was stopped
+        self._paused_time: dict[int, float] = {}    # job index -> seconds stopped in its current run
+        self._pause_lock = threading.Lock()
+        self._wake = threading.Event()       # set by resume() / cancel() for an idle scheduler
+        self.preempt = preempt and PAUSE_SUPPORTED  # urgent jobs may suspend running ones
+        # Suspended job index -> urgent job index; changed under _pause_lock
+        self._preempted: dict[int, int] = {}
+        self._pending: TaskQueue | None = None  # while run() schedules, for mid-batch changes
+        self._inbox: deque[int] = deque()    # indexes of jobs added by add_jobs()
+        self._accepting = False              # add_jobs() still reaches this batch
+        self._accept_lock = threading.Lock()
+        self._passlog_dir = ""
+
+    @property
+    def ffmpeg_path(self) -> str:
+        """The FFmpeg executable this worker runs."""
+        return self._ffmpeg_path
+
+    @property
+    def gpu_encoder(self) -> GpuEncoder | None:
+        """GPU encoder details of the batch codec, or None for a CPU encoder."""
+        return self._gpu_enc
 
     def cancel(self):
         self._cancelled = True
-        if hasattr(self, "_process") and self._process and self._process.poll() is None:
-            self._process.terminate()
+        with self._proc_lock:
+            processes = list(self._processes.items())
+        for _, process in processes:
+            if process.poll() is None:
+                process.terminate()
+        # A stopped process only acts on SIGTERM once it is continued
+        with self._pause_lock:
+            held = set(self._paused_jobs) | set(self._preempted)
+            self._preempted.clear()
+        self._paused = False
+        self._paused_jobs.clear()
+        for idx in held.union(idx for idx, _ in processes):
+            self._apply_pause(idx)
+        self._wake.set()
+
+    def pause(self):
+        """Stop every running FFmpeg process and start no new jobs until resume()."""
+        if not PAUSE_SUPPORTED or self._paused:
+            return
+        self._paused = True
+        with self._proc_lock:
+            running = list(self._processes)
+        for idx in running:
+            self._apply_pause(idx)
+        self.log_output.emit(f"\n=== Paused ({len(running)} running job(s) stopped) ===\n")
+
+    def resume(self):
+        """Continue the batch after pause(); jobs paused individually stay paused."""
+        if not self._paused:
+            return
+        self._paused = False
+        with self._proc_lock:
+            running = list(self._processes)
+        for idx in running:
+            self._apply_pause(idx)
+        self._wake.set()
+        self.log_output.emit("\n=== Resumed ===\n")
+
+    def is_paused(self) -> bool:
+        return self._paused
+
+    def pause_job(self, idx: int):
+        """Pause job *idx* (1-based): stop it if running, otherwise keep it queued."""
+        if not PAUSE_SUPPORTED or idx in self._paused_jobs or not 0 < idx <= len(self.jobs):
+            return
+        job = self.jobs[idx - 1]
+        if job.state not in (JobState.PENDING, JobState.RUNNING):
+            return
+        self._paused_jobs.add(idx)
+        self._apply_pause(idx)
+        self.log_output.emit(f"[{idx}/{len(self.jobs)}] PAUSED: {os.path.basename(job.source)}\n")
 
-    def build_ffmpeg_args(self, src: str, dst: str) -> list[str]:
-        """Build the ffmpeg argument list for a single file."""
+    def resume_job(self, idx: int):
+        if idx not in self._paused_jobs:
+            return
+        self._paused_jobs.discard(idx)
+        self._apply_pause(idx)
+        self._wake.set()
+        self.log_output.emit(
+            f"[{idx}/{len(self.jobs)}] RESUMED: {os.path.basename(self.jobs[idx - 1].source)}\n"
+        )
+
+    def _apply_pause(self, idx: int) -> None:
+        """Stop or continue job *idx*'s FFmpeg to match the batch and per-job pause state."""
+        with self._proc_lock:
+            process = self._processes.get(idx)
+        running = process is not None and process.poll() is None
+        stop = running and (self._paused or idx in self._paused_jobs or idx in self._preempted)
+        with self._pause_lock:
+            since = self._stopped_since.get(idx)
+            if stop != (since is not None):
+                now = time.perf_counter()
+                if stop:
+                    self._stopped_since[idx] = now
+                else:
+                    del self._stopped_since[idx]
+                    self._paused_time[idx] = self._paused_time.get(idx, 0.0) + now - since
+                if running:
+                    try:
+                        # The whole group, so helpers FFmpeg started stop too
+                        os.killpg(process.pid, signal.SIGSTOP if stop else signal.SIGCONT)
+                    except OSError:
+                        pass
+        if 0 < idx <= len(self.jobs):
+            job = self.jobs[idx - 1]
+            paused = stop or idx in self._paused_jobs
+            if job.paused != paused:
+                job.paused = paused
+                self.file_paused.emit(idx, paused)
+
+    def _take_paused_seconds(self, idx: int) -> float:
+        """Seconds job *idx*'s finished run was stopped; resets the count for its next run."""
+        paused = self._paused_seconds(idx)
+        with self._pause_lock:
+            self._stopped_since.pop(idx, None)
+            self._paused_time.pop(idx, None)
+        return paused
+
+    def _paused_seconds(self, idx: int) -> float:
+        """Seconds job *idx*'s current run has been stopped, including an ongoing stop."""
+        with self._pause_lock:
+            paused = self._paused_time.get(idx, 0.0)
+            since = self._stopped_since.get(idx)
+        return paused + (time.perf_counter() - since if since is not None else 0.0)
+
+    def add_jobs(self, jobs: list[Job]) -> list[int]:
+        """Append *jobs* to the running batch; return their indexes ([] if it is finishing)."""
+        with self._accept_lock:
+            if not self._accepting or self._cancelled:
+                return []
+            first = len(self.jobs) + 1
+            self.jobs.extend(jobs)
+            added = list(range(first, first + len(jobs)))
+            self._inbox.extend(added)
+        self._wake.set()
+        return added
+
+    def set_job_priority(self, idx: int, priority: int) -> None:
+        """Change job *idx*'s priority; a queued job moves to its new place."""
+        if not 0 < idx <= len(self.jobs):
+            return
+        self.jobs[idx - 1].priority = priority
+        pending = self._pending
+        if pending is not None and pending.reprioritize(idx, priority):
+            self._wake.set()
+
+    def reorder(self, order: list[int]) -> None:
+        """Start queued jobs of equal priority in the order of the job indexes in *order*."""
+        pending = self._pending
+        if pending is not None:
+            pending.reorder(order)
+
+    def _preempt_for(self, task: _EncodeTask, running: dict, total: int) -> bool:
+        """Suspend the lowest-priority running job so urgent *task* can start."""
+        if not self.preempt or task.job.priority < JobPriority.URGENT:
+            return False
+        victims = [t for t in running.values()
+                   if t.job.priority < JobPriority.URGENT and t.idx not in self._preempted
+                   and t.idx != task.idx]
+        if not victims:
+            return False
+        victim = min(victims, key=lambda t: (t.job.priority, -t.job.started_at))
+        with self._pause_lock:
+            self._preempted[victim.idx] = task.idx
+        self._apply_pause(victim.idx)
+        self.log_output.emit(
+            f"[{victim.idx}/{total}] SUSPENDED for urgent [{task.idx}/{total}] "
+            f"{os.path.basename(task.src)}\n"
+        )
+        return True
+
+    def _end_preemption(self, idx: int, total: int) -> None:
+        """Continue the jobs suspended for urgent job *idx*."""
+        with self._pause_lock:
+            victims = [v for v, urgent in list(self._preempted.items()) if urgent == idx]
+            for victim in victims:
+                del self._preempted[victim]
+        for victim in victims:
+            self._apply_pause(victim)
+            self.log_output.emit(f"[{victim}/{total}] CONTINUED\n")
+
+    def _queue_job(self, idx: int, job: Job, pending: TaskQueue, two_pass: bool, total: int) -> None:
+        """Queue job *idx*'s first task, or skip it if its output exists."""
+        filename = os.path.basename(job.source)
+        dst = self.make_output_name(job)
+        if os.path.exists(dst) and not self.overwrite:
+            job.state = JobState.SKIPPED
+            job.finished_at = time.time()
+            self._record_job(idx, job, dst)
+            self.log_output.emit(f"[{idx}/{total}] SKIP (exists): {filename}\n")
+            self.file_finished.emit(idx, total, filename, True)
+            return
+        self._metrics[idx] = JobMetrics()
+        pending.push(_EncodeTask(idx, job, dst, 1 if two_pass else 0))
+
+    def _lanes(self) -> int:
+        """Worker slots: preempted jobs keep theirs while urgent jobs run beside them."""
+        return self.max_jobs * 2 if self.preempt else self.max_jobs
+
+    def _uses_two_pass(self) -> bool:
+        """Two-pass applies only to target bitrate mode on CPU encoders that support it.
+
+        Target-size mode always uses two passes where the codec allows it.
+        """
+        if self.target_size_mb > 0:
+            wanted = True
+        else:
+            wanted = self.two_pass and bool(self.bitrate and self.bitrate.strip())
+        return (
+            wanted
+            and self._gpu_enc is None
+            and CODECS.get(self.codec, {}).get("two_pass", False)
+        )
+
+    def _params_for(self, job: Job) -> dict[str, str]:
+        """Batch codec params with *job*'s per-file overrides applied.
+
+        For a job that fell back to a CPU encoder they are mapped onto it.
+        """
+        params = {**self.codec_params, **job.overrides} if job.overrides else self.codec_params
+        if job.fallback:
+            return cpu_equivalent(self._gpu_enc, params)[1]
+        return params
+
+    def _encoder_for(self, job: Job):
+        """(FFmpeg encoder, GpuEncoder or None) that encodes *job*."""
+        if job.fallback:
+            return job.fallback, None
+        return self.codec, self._gpu_enc
+
+    def _bitrate_for(self, src: str) -> str:
+        """Video bitrate for *src*: the per-file target-size bitrate or the batch bitrate."""
+        if src in self._file_bitrates:
+            return self._file_bitrates[src]
+        return self.bitrate.strip() if self.bitrate else ""
+
+    def _target_bytes(self) -> int:
+        return int(self.target_size_mb * 1_000_000)
+
+    def _target_bitrate(self, job: Job) -> tuple[int, float, int]:
+        """(video bps, duration, audio bps) that make *job*'s output fit the target size.
+
+        Raises ValueError if *job* cannot be sized.
+        """
+        src = job.source
+        duration = self._job_duration(job)
+        if duration <= 0:
+            raise ValueError(f"cannot size {os.path.basename(src)}: duration unknown")
+        audio_bps = estimate_audio_bitrate(probe_media(self._ffmpeg_path, src), self.audio_codec)
+        video_bps = compute_target_bitrate(self._target_bytes(), duration, audio_bps)
+        if video_bps < 1000:
+            raise ValueError(
+                f"target size {self.target_size_mb:g} MB is too small for "
+                f"{duration:.1f} s with {audio_bps // 1000}k audio"
+            )
+        return video_bps, duration, audio_bps
+
+    def _plan_target_bitrate(self, job: Job, total: int, idx: int) -> None:
+        """Compute the video bitrate that makes *job*'s output fit the target size."""
+        video_bps, duration, audio_bps = self._target_bitrate(job)
+        self._file_bitrates[job.source] = f"{video_bps // 1000}k"
+        self.log_output.emit(
+            f"[{idx}/{total}] Target {self.target_size_mb:g} MB over {duration:.1f} s "
+            f"(audio ~{audio_bps // 1000}k) -> video {video_bps // 1000}k\n"
+        )
+
+    def _correct_target_bitrate(self, task: _EncodeTask, total: int) -> bool:
+        """Check the output of *task* against the target size.
+
+        Returns True (after lowering/raising the file's bitrate) if it
+        missed by more than the tolerance and should be re-encoded.
+        """
+        try:
+            actual = os.path.getsize(task.dst)
+        except OSError:
+            return False
+        target = self._target_bytes()
+        miss = (actual - target) / target
+        label = f"[{task.idx}/{total}] Output {actual / 1_000_000:.2f} MB ({miss:+.1%} vs target)"
+        if abs(miss) <= self.size_tolerance:
+            self.log_output.emit(f"{label} - within ±{self.size_tolerance:.0%}\n")
+            return False
+        if task.attempt >= self.TARGET_SIZE_MAX_ATTEMPTS:
+            self.log_output.emit(f"{label} - keeping it after {task.attempt} attempts\n")
+            return False
+
+        # Scale only the video share; audio and overhead do not follow the bitrate
+        duration = self._job_duration(task.job)
+        audio_bytes = estimate_audio_bitrate(
+            probe_media(self._ffmpeg_path, task.src), self.audio_codec
+        ) * duration / 8
+        old_bps = _to_float(self._file_bitrates.get(task.src, "0k")[:-1]) * 1000
+        video_actual = max(1.0, actual - audio_bytes)
+        video_target = max(1.0, target * (1.0 - _CONTAINER_OVERHEAD) - audio_bytes)
+        new_bps = int(old_bps * video_target / video_actual)
+        if new_bps < 1000:
+            return False
+        self._file_bitrates[task.src] = f"{new_bps // 1000}k"
+        self.log_output.emit(f"{label} - re-encoding at video {new_bps // 1000}k\n")
+        return True
+
+    def _passlog_prefix(self, idx: int) -> str:
+        """Unique passlog prefix for job *idx* inside this batch's temp dir.
+
+        The ``_pass`` suffix keeps job1's glob from matching the files
+        of job10 and up.
+        """
+        return os.path.join(self._passlog_dir, f"job{idx}_pass")
+
+    def _remove_passlogs(self, idx: int) -> None:
+        """Delete the passlog files (incl. x264 .mbtree / x265 .cutree) of job *idx*."""
+        if not self._passlog_dir:
+            return
+        for path in glob.glob(self._passlog_prefix(idx) + "*"):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def build_ffmpeg_args(self, job: Job, dst: str, pass_num: int = 0,
+                          passlog: str = "", threads: int = 0) -> list[str]:
+        """Build the ffmpeg argument list for a single job.
+
+        *pass_num* 1 or 2 selects a pass of a two-pass encode using the
+        stats prefix *passlog*.  Pass 1 only analyses video, so audio and
+        subtitles are dropped and the output goes to the null muxer.
+        *threads* > 0 limits decoding, filtering and encoding to about
+        that many threads (see vcc.core.threads).
+        """
         ow_flag = "-y" if self.overwrite else "-n"
-        has_bitrate = bool(self.bitrate and self.bitrate.strip())
-        gpu = self._gpu_enc
+        src = job.source
+        params = self._params_for(job)
+        bitrate = self._bitrate_for(src)
+        has_bitrate = bool(bitrate)
+        codec, gpu = self._encoder_for(job)
+        pix_fmt = cpu_pix_fmt(self.pix_fmt) if job.fallback else self.pix_fmt
 
         # Build the -vf filter chain: crop (if set) then scale
         vf_parts = []
-        crop_val = self.file_crops.get(src, "")
-        if crop_val:
-            vf_parts.append(crop_val)  # e.g. "crop=1920:800:0:140"
+        if job.crop:
+            vf_parts.append(job.crop)  # e.g. "crop=1920:800:0:140"
         vf_parts.append(f"scale={self.width}:{self.height}")
         vf_chain = ",".join(vf_parts)
 
         # Per-file trim times
-        trim_start, trim_end = self.file_trims.get(src, ("", ""))
+        trim_start, trim_end = job.trim_start, job.trim_end
 
         args = [
             self._ffmpeg_path,
             "-hide_banner",
             ow_flag,
         ]
+        if self.stage_timings:
+            args.extend(["-benchmark_all", "-benchmark"])
+        if threads:
+            args.extend(["-filter_threads", str(threads)])
 
         # Trim: start time (before -i for fast seek)
         if trim_start and trim_start.strip():
@@ -213,6 +847,9 @@ class EncoderWorker(QThread):
         if gpu and gpu.hwaccel_flag:
             args.extend(["-hwaccel", gpu.hwaccel_flag])
 
+        if threads:
+            args.extend(["-threads", str(threads)])  # decoder
+
         args.extend([
             "-i", src,
         ])
@@ -228,7 +865,7 @@ class EncoderWorker(QThread):
             "-map", "0:a?",
             "-map", "0:s?",
             "-vf", vf_chain,
-            "-c:v", self.codec,
+            "-c:v", codec,
         ])
 
         # Frame rate
@@ -237,18 +874,19 @@ class EncoderWorker(QThread):
 
         # Total video bitrate
         if has_bitrate:
-            args.extend(["-b:v", self.bitrate.strip()])
+            args.extend(["-b:v", bitrate])
 
         if gpu:
             # ── GPU encoder parameters ──
-            self._apply_gpu_params(args, gpu, has_bitrate)
+            self._apply_gpu_params(args, gpu, params, bitrate)
         else:
             # ── CPU encoder parameters ──
             # Add codec-specific params (skip empty tune etc.)
             # When using target bitrate mode, skip CRF/quality params
             # as they conflict with bitrate-based rate control.
-            quality_keys = {"crf", "qp", "q:v"}
-            for key, value in self.codec_params.items():
+            # ("b:v" is the VP9 CRF-mode "-b:v 0", which would cancel the bitrate.)
+            quality_keys = {"crf", "qp", "q:v", "b:v"}
+            for key, value in params.items():
                 if value is not None and str(value).strip():
                     if key in quality_keys and has_bitrate:
                         continue  # skip quality param in bitrate mode
@@ -256,29 +894,45 @@ class EncoderWorker(QThread):
 
             # When using bitrate with SVT-AV1, set rate control to VBR (rc=1)
             # SVT-AV1 defaults to CQ mode (rc=0) which rejects -b:v
-            if has_bitrate and self.codec == "libsvtav1":
+            if has_bitrate and codec == "libsvtav1":
                 args.extend(["-svtav1-params", "rc=1"])
 
+            if threads:
+                opts = encoder_thread_options(codec, threads, self.width)
+                for i in range(0, len(opts), 2):
+                    if opts[i][1:] not in params:  # per-file/batch params win
+                        args.extend(opts[i:i + 2])
+                item = param_string_item(codec, threads)
+                if item:
+                    _merge_param_string(args, *item)
+
         # SVT-AV1 film-grain & sharpness (passed via -svtav1-params)
-        if self.codec == "libsvtav1":
+        if codec == "libsvtav1":
             svt_extra = []
             if self.film_grain > 0:
                 svt_extra.append(f"film-grain={self.film_grain}")
             if self.sharpness > 0:
                 svt_extra.append(f"sharpness={self.sharpness}")
             if svt_extra:
-                # Check if -svtav1-params already in args (from bitrate VBR)
-                svt_str = ":".join(svt_extra)
-                try:
-                    idx = args.index("-svtav1-params")
-                    args[idx + 1] += ":" + svt_str
-                except ValueError:
-                    args.extend(["-svtav1-params", svt_str])
-        elif self.codec == "libvpx-vp9" and self.sharpness > 0:
+                # -svtav1-params may already be in args (bitrate VBR, lp)
+                _merge_param_string(args, "-svtav1-params", ":".join(svt_extra))
+        elif codec == "libvpx-vp9" and self.sharpness > 0:
             args.extend(["-sharpness", str(self.sharpness)])
 
-        if self.pix_fmt and self.pix_fmt.strip():
-            args.extend(["-pix_fmt", self.pix_fmt])
+        if pix_fmt and pix_fmt.strip():
+            args.extend(["-pix_fmt", pix_fmt])
+
+        if pass_num:
+            if codec == "libx265":
+                # libx265 takes its pass settings through -x265-params
+                _merge_param_string(args, "-x265-params", f"pass={pass_num}:stats={passlog}.log")
+            else:
+                args.extend(["-pass", str(pass_num), "-passlogfile", passlog])
+
+        if pass_num == 1:
+            # Analysis pass: video only, discard the output
+            args.extend(["-an", "-sn", "-f", "null", "-"])
+            return args
 
         args.extend(["-c:a", self.audio_codec])
 
@@ -296,19 +950,56 @@ class EncoderWorker(QThread):
 
         return args
 
+    def build_test_args(self, job: Job, seconds: float, stage: str = "encode",
+                        threads: int = 0, output: str = "", plan_target: bool = False) -> list[str]:
+        """Arguments for a short run of *job* into the null muxer.
+
+        *stage* "decode" only decodes the video stream, "filter" adds the
+        ``-vf`` chain and pixel format conversion, and "encode" runs the
+        full build_ffmpeg_args() command.  Output stops after *seconds*.
+        With *output*, the encode stage writes there through the real
+        muxer instead, so container incompatibilities show up too.
+        With *plan_target* in target-size mode, *job*'s bitrate is planned
+        first as the batch would plan it, so the test runs the ``-b:v``
+        command; raises ValueError if the file cannot be sized.  Two-pass
+        batches are tested with the single-pass command: it has the same
+        encoder, rate control, streams and muxer, while the second pass
+        would need a full first pass for its stats.
+        """
+        if plan_target and self.target_size_mb > 0 and job.source not in self._file_bitrates:
+            self._file_bitrates[job.source] = f"{self._target_bitrate(job)[0] // 1000}k"
+        args = self.build_ffmpeg_args(job, self.make_output_name(job), threads=threads)
+        after_input = args.index("-i") + 2
+        test = args[:after_input] + ["-t", f"{seconds:g}"]
+        if stage == "encode":
+            test.extend(args[after_input:-1])  # everything but the output path
+        else:
+            test.extend(["-map", "0:v:0", "-an", "-sn"])
+            if stage == "filter":
+                test.extend(["-vf", args[args.index("-vf") + 1]])
+                if self.pix_fmt and self.pix_fmt.strip():
+                    test.extend(["-pix_fmt", self.pix_fmt])
+        if output and stage == "encode":
+            test.append(output)
+        else:
+            test.extend(["-f", "null", "-"])
+        return test
+
     def _apply_gpu_params(
-        self, args: list[str], gpu, has_bitrate: bool
+        self, args: list[str], gpu, params: dict[str, str], bitrate: str
     ) -> None:
-        """Append GPU-specific encoding parameters to *args*."""
+        """Append GPU-specific encoding parameters from *params* to *args*.
+
+        *bitrate* is the target video bitrate, or empty for quality mode.
+        """
         # Preset
-        preset_val = self.codec_params.get(gpu.preset_key, "")
+        preset_val = params.get(gpu.preset_key, "")
         if preset_val and str(preset_val).strip():
             args.extend([f"-{gpu.preset_key}", str(preset_val)])
 
-        if has_bitrate:
+        if bitrate:
             # In bitrate mode, add rate control buffers
-            bv = self.bitrate.strip()
-            args.extend(["-maxrate", bv, "-bufsize", bv])
+            args.extend(["-maxrate", bitrate, "-bufsize", bitrate])
             # NVENC: set rc mode to vbr
             if gpu.vendor == "NVIDIA":
                 args.extend(["-rc", "vbr"])
@@ -316,7 +1007,7 @@ class EncoderWorker(QThread):
                 args.extend(["-rc", "vbr_peak"])
         else:
             # Quality mode — apply the quality parameter
-            q_val = self.codec_params.get(gpu.quality_param, "")
+            q_val = params.get(gpu.quality_param, "")
             if q_val and str(q_val).strip():
                 args.extend([f"-{gpu.quality_param}", str(q_val)])
                 # NVENC needs rc=constqp to honour CQ
@@ -324,7 +1015,7 @@ class EncoderWorker(QThread):
                     args.extend(["-rc", "constqp"])
             # AMF: also set qp_p to match qp_i
             if gpu.vendor == "AMD" and gpu.quality_param == "qp_i":
-                qp_val = self.codec_params.get("qp_i", "")
+                qp_val = params.get("qp_i", "")
                 if qp_val and str(qp_val).strip():
                     args.extend(["-qp_p", str(qp_val)])
 
@@ -339,29 +1030,40 @@ class EncoderWorker(QThread):
             return "webm"
         return "mkv"
 
-    def make_output_name(self, src_path: str) -> str:
-        """Generate output filename like: basename.WxH.codec.paramN.mkv"""
-        base = os.path.splitext(os.path.basename(src_path))[0]
+    def make_output_name(self, job: Job) -> str:
+        """Generate output filename like: basename.WxH.codec.paramN.mkv
+
+        A job with an explicit ``output`` path keeps it.
+        """
+        if job.output:
+            return job.output
+        base = os.path.splitext(os.path.basename(job.source))[0]
         label = f"{self.width}x{self.height}"
 
         # Build param suffix
         param_parts = []
-        for key, value in self.codec_params.items():
+        for key, value in self._params_for(job).items():
             if value is not None and str(value).strip():
                 param_parts.append(f"{key}{value}")
 
         if self.fps and self.fps.strip():
             param_parts.append(f"{self.fps.strip()}fps")
-        if self.bitrate and self.bitrate.strip():
+        if self.target_size_mb > 0:
+            param_parts.append(f"size{self.target_size_mb:g}MB")
+        elif self.bitrate and self.bitrate.strip():
             param_parts.append(f"br{self.bitrate.strip()}")
+        if self._uses_two_pass():
+            param_parts.append("2pass")
 
         param_str = ".".join(param_parts) if param_parts else ""
         ext = self._get_output_extension()
 
+        # A job that fell back to a CPU encoder is named after it and its mapped params
+        codec = job.fallback or self.codec
         if param_str:
-            name = f"{base}.{label}.{self.codec}.{param_str}.{ext}"
+            name = f"{base}.{label}.{codec}.{param_str}.{ext}"
         else:
-            name = f"{base}.{label}.{self.codec}.{ext}"
+            name = f"{base}.{label}.{codec}.{ext}"
 
         return os.path.join(self.output_dir, name)
 
@@ -375,27 +1077,28 @@ class EncoderWorker(QThread):
             return
 
         # Create concat list file
+        files = [job.source for job in self.jobs]
         list_fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="vcc_concat_")
         try:
             with os.fdopen(list_fd, "w", encoding="utf-8") as f:
-                for src in self.files:
+                for src in files:
                     escaped = src.replace("'", "'\\''")
                     f.write(f"file '{escaped}'\n")
 
             # Build output name from first file
-            first_base = os.path.splitext(os.path.basename(self.files[0]))[0]
+            first_base = os.path.splitext(os.path.basename(files[0]))[0]
             ext = self._get_output_extension()
             out_name = f"{first_base}.merged.{ext}"
             dst = os.path.join(self.output_dir, out_name)
 
             total_duration = 0.0
-            for src in self.files:
+            for src in files:
                 d = probe_duration(self._ffmpeg_path, src)
                 if d:
                     total_duration += d
 
             self.file_started.emit(1, 1, out_name)
-            self.log_output.emit(f"Concatenating {len(self.files)} files → {out_name}\n")
+            self.log_output.emit(f"Concatenating {len(files)} files → {out_name}\n")
 
             ow_flag = "-y" if self.overwrite else "-n"
             args = [
@@ -409,23 +1112,18 @@ class EncoderWorker(QThread):
             cmd_display = " ".join(f'"{a}"' if " " in a else a for a in args)
             self.log_output.emit(f"> {cmd_display}\n\n")
 
-            self._process = subprocess.Popen(
-                args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            )
-
-            self._read_output_with_progress(total_duration)
-            self._process.wait()
-            success = self._process.returncode == 0
+            process = self._spawn(1, args)
+            try:
+                self._read_output_with_progress(process, total_duration)
+                process.wait()
+            finally:
+                self._forget_process(1)
+            success = process.returncode == 0
 
             if success:
                 self.log_output.emit(f"\nDone -> {out_name}\n")
             else:
-                self.log_output.emit(f"\n[WARNING] FFmpeg exited with code {self._process.returncode}\n")
+                self.log_output.emit(f"\n[WARNING] FFmpeg exited with code {process.returncode}\n")
 
             self.file_finished.emit(1, 1, out_name, success)
         except FileNotFoundError:
@@ -445,21 +1143,313 @@ class EncoderWorker(QThread):
             self.log_output.emit("=== All done. ===\n")
         self.encoding_done.emit()
 
-    def _read_output_with_progress(self, total_duration: float):
-        """Read FFmpeg output line by line, emitting each line to the terminal."""
-        for line in self._process.stdout:
+    def _spawn(self, idx: int, args: list[str], cpus: tuple[int, ...] = ()) -> subprocess.Popen:
+        """Start FFmpeg for job *idx* and register it so cancel() can stop it.
+
+        A non-empty *cpus* pins the child to those CPUs before it execs.
+        """
+        setup = [f for f in (self.priority.preexec(),
+                             affinity_preexec(list(cpus)) if cpus else None) if f]
+        process = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+            preexec_fn=(lambda: [f() for f in setup]) if setup else None,
+            start_new_session=PAUSE_SUPPORTED,  # own process group for SIGSTOP/SIGCONT
+        )
+        with self._proc_lock:
+            self._processes[idx] = process
+        if self._admission is not None:
+            self._admission.attach(idx, process.pid)
+        if self._cancelled:  # cancel() may have run before registration
+            process.terminate()
+        else:
+            self._apply_pause(idx)  # pause() may have run since the task was picked
+        return process
+
+    def set_priority(self, profile: str) -> None:
+        """Switch to priority *profile*, including the FFmpeg processes already running."""
+        with self._proc_lock:
+            pids = [p.pid for p in self._processes.values() if p.poll() is None]
+        for warning in self.priority.switch(profile, pids):
+            self.log_output.emit(f"[WARNING] Priority: {warning}\n")
+        self.log_output.emit(f"Priority: {self.priority.profile.label} "
+                             f"({self.priority.profile.describe()})\n")
+
+    def _forget_process(self, idx: int) -> None:
+        with self._proc_lock:
+            self._processes.pop(idx, None)
+
+    def _read_output_with_progress(self, process: subprocess.Popen, total_duration: float,
+                                   prefix: str = "", stats: EncodeStats | None = None,
+                                   bench: StageTimes | None = None, idx: int = 0,
+                                   tail: deque | None = None):
+        """Read FFmpeg output line by line, emitting each line to the terminal.
+
+        *prefix* tags every line with its job when several jobs run at once.
+        Stats lines are parsed into *stats* if given and reported as
+        file_progress of job *idx*, with speed and ETA measured over the
+        time the process was not paused.  ``bench:`` lines are parsed into
+        *bench* if given and not shown (there is one per frame).  Other
+        lines are also appended to *tail* if given.
+        """
+        start = time.perf_counter()
+        last_progress = 0.0
+        for line in process.stdout:
             if self._cancelled:
-                self._process.terminate()
+                process.terminate()
                 break
-            self.log_output.emit(line)
+            if bench is not None and bench.feed(line):
+                continue
+            if stats is not None and stats.feed(line):
+                now = time.perf_counter()
+                if total_duration > 0 and now - last_progress >= _PROGRESS_INTERVAL:
+                    last_progress = now
+                    active = now - start - self._paused_seconds(idx)
+                    speed = stats.out_time / active if active > 0 else 0.0
+                    eta = _format_eta((total_duration - stats.out_time) / speed) if speed > 0 else ""
+                    self.file_progress.emit(
+                        idx, int(min(100.0, stats.out_time * 100 / total_duration)),
+                        f"{speed:.2f}x", eta,
+                    )
+            elif tail is not None:
+                tail.append(line)
+            self.log_output.emit(prefix + line if prefix else line)
+
+    def _job_duration(self, job: Job) -> float:
+        """Probe *job*'s source and return the duration that will be encoded (after trimming)."""
+        total_duration = probe_duration(self._ffmpeg_path, job.source) or 0.0
+        trim_start, trim_end = job.trim_start, job.trim_end
+        if trim_start and trim_start.strip():
+            try:
+                start_sec = _parse_time_to_seconds(trim_start)
+            except Exception:
+                start_sec = 0.0
+        else:
+            start_sec = 0.0
+        if trim_end and trim_end.strip():
+            try:
+                end_sec = _parse_time_to_seconds(trim_end)
+                total_duration = max(0.0, end_sec - start_sec)
+            except Exception:
+                pass
+        elif start_sec > 0 and total_duration > 0:
+            total_duration = max(0.0, total_duration - start_sec)
+        return total_duration
+
+    def _run_task(self, task: _EncodeTask, total: int) -> int:
+        """Run one FFmpeg pass on a pool thread and return its exit code."""
+        filename = os.path.basename(task.src)
+        with self.trace.span(task.lane, "probe", "probe", file=filename):
+            if (self.target_size_mb > 0 and task.pass_num <= 1 and task.attempt == 1
+                    and not task.retry):
+                self._plan_target_bitrate(task.job, total, task.idx)
+            # Probe duration for progress reporting
+            total_duration = self._job_duration(task.job)
+        passlog = self._passlog_prefix(task.idx) if task.pass_num else ""
+        args = self.build_ffmpeg_args(task.job, task.dst, task.pass_num, passlog, task.threads)
+        cmd_display = " ".join(f'"{a}"' if " " in a else a for a in args)
+        pass_label = f" (pass {task.pass_num}/2)" if task.pass_num else ""
+        self.log_output.emit(f"[{task.idx}/{total}]{pass_label} > {cmd_display}\n\n")
+        if task.cpus:
+            self.log_output.emit(f"[{task.idx}/{total}]{pass_label} CPUs: {format_cpulist(task.cpus)}\n")
+
+        stats = EncodeStats()
+        bench = StageTimes() if self.stage_timings else None
+        tail: deque[str] = deque(maxlen=_LOG_TAIL)
+        # Pass 1 only analyses; its progress is not encoded content
+        counts_content = task.pass_num != 1
+        encoder = task.job.fallback or self.codec
+        with self._live_lock:
+            self._live[task.idx] = (stats, counts_content, encoder)
+        start = time.perf_counter()
+        span_name = f"encode pass {task.pass_num}" if task.pass_num else "encode"
+        t0 = time.time()
+        try:
+            process = self._spawn(task.idx, args, task.cpus)
+            prefix = f"[{task.idx}] " if self.max_jobs > 1 else ""
+            self._read_output_with_progress(process, total_duration, prefix, stats, bench,
+                                            task.idx, tail)
+            # Drain what is left after a cancel so the child can exit and be reaped
+            for _ in process.stdout:
+                pass
+            usage = _wait_process(process)
+        finally:
+            self._forget_process(task.idx)
+            task.log = tuple(tail)
+            paused = self._take_paused_seconds(task.idx)
+            with self._live_lock:
+                del self._live[task.idx]
+                if counts_content:
+                    self._content_done[encoder] = self._content_done.get(encoder, 0.0) + stats.out_time
+            self.trace.add(task.lane, span_name, "encode", t0, time.time(), file=filename,
+                           attempt=task.attempt, retry=task.retry, threads=task.threads,
+                           cpus=format_cpulist(task.cpus), paused_s=round(paused, 3),
+                           frames=stats.frames, fps=stats.fps)
+        self._metrics.setdefault(task.idx, JobMetrics()).add_run(
+            stats, time.perf_counter() - start, process.returncode, usage, bench, paused
+        )
+        if bench:
+            self.log_output.emit(f"[{task.idx}/{total}]{pass_label} Stages: {bench.summary()}\n")
+        return process.returncode
+
+    def _exporter_snapshot(self) -> dict:
+        """Live batch figures for the Prometheus exporter (called from its thread)."""
+        queued = running = 0
+        for job in self.jobs:
+            if job.state == JobState.PENDING:
+                queued += 1
+            elif job.state == JobState.RUNNING:
+                running += 1
+        fps: dict[str, float] = {}
+        with self._live_lock:
+            for stats, _, encoder in self._live.values():
+                fps[encoder] = fps.get(encoder, 0.0) + stats.fps
+        return {
+            "queued": queued,
+            "running": running,
+            "fps": fps,
+            "content_s": self._content_by_encoder(),
+        }
+
+    def _content_by_encoder(self) -> dict[str, float]:
+        """Content encoded so far in this batch per encoder used, including running jobs."""
+        with self._live_lock:
+            content = dict(self._content_done)
+            for stats, counts, encoder in self._live.values():
+                if counts:
+                    content[encoder] = content.get(encoder, 0.0) + stats.out_time
+        return content
+
+    def _content_seconds(self) -> float:
+        """Content encoded so far in this batch, including the progress of running jobs."""
+        return sum(self._content_by_encoder().values())
+
+    def _estimate(self, task: _EncodeTask, estimator: JobEstimator, total: int) -> tuple[int, int]:
+        """(peak memory, output bytes) expected for *task*'s job; estimated once per job."""
+        if task.idx in self._estimates:
+            return self._estimates[task.idx]
+        job = task.job
+        if job.info is None:
+            job.info = probe_media(self._ffmpeg_path, job.source)
+        info = job.info or {}
+        params = self._params_for(job)
+        memory, source = estimator.memory(params)
+        target = self._target_bytes()
+        output = estimator.output(
+            params, self._job_duration(job), info.get("size", 0),
+            info.get("width", 0) * info.get("height", 0),
+            video_bps=_bitrate_to_bps(self._bitrate_for(job.source)),
+            audio_bps=estimate_audio_bitrate(info, self.audio_codec),
+            target_bytes=int(target * (1 + self.size_tolerance)) if target else 0,
+        )
+        self._estimates[task.idx] = (memory, output)
+        self.log_output.emit(
+            f"[{task.idx}/{total}] Estimate: ~{format_bytes(memory)} RAM ({source}), "
+            f"~{format_bytes(output)} output\n"
+        )
+        return memory, output
+
+    def _set_waiting(self, task: _EncodeTask, reason: str, total: int) -> None:
+        """Show why *task*'s job cannot start yet ("" once it can)."""
+        if task.job.waiting == reason:
+            return
+        was_waiting, task.job.waiting = task.job.waiting, reason
+        if reason and not was_waiting:
+            self.log_output.emit(f"[{task.idx}/{total}] WAIT: {reason}\n")
+        self.file_waiting.emit(task.idx, reason)
+
+    def _plan_retry(self, task: _EncodeTask, returncode: int, total: int,
+                    hardware_failures: dict[int, int]) -> tuple[_EncodeTask, float] | None:
+        """Classify *task*'s failed run; return (the run to queue, backoff seconds) or None.
+
+        None means the job fails; its error then says why.
+        """
+        job = task.job
+        policy = self.retry_policy
+        kind, reason = classify_failure(returncode, list(task.log))
+        encoder = job.fallback or self.codec
+        metrics = self._metrics.setdefault(task.idx, JobMetrics())
+        self.log_output.emit(f"\n[{task.idx}/{total}] {kind.capitalize()} failure on {encoder}: "
+                             f"{reason or f'exit code {returncode}'}\n")
+        fallback = ""
+        if kind == FAILURE_HARDWARE and self.cpu_fallback and not job.fallback:
+            hardware_failures[task.idx] = hardware_failures.get(task.idx, 0) + 1
+            if (hardware_failures[task.idx] >= policy.fallback_after
+                    or not policy.should_retry(kind, task.retry)):
+                fallback = cpu_equivalent(self._gpu_enc, self._params_for(job))[0]
+        if fallback:
+            delay = 0.0  # another device: nothing to wait for
+        elif policy.should_retry(kind, task.retry):
+            delay = policy.delay(task.retry + 1)
+        else:
+            metrics.add_failure(encoder, returncode, kind, reason, None)
+            job.error = f"{kind} failure: {reason}" if reason else ""
+            return None
+        metrics.add_failure(encoder, returncode, kind, reason, delay)
+        if fallback:
+            job.fallback = fallback
+            params = " ".join(f"{k}={v}" for k, v in self._params_for(job).items())
+            self.log_output.emit(f"[{task.idx}/{total}] Falling back to {fallback}"
+                                 f"{f' ({params})' if params else ''}\n")
+        if task.pass_num != 1:
+            try:
+                os.unlink(task.dst)  # the failed run's partial output
+            except OSError:
+                pass
+        dst = self.make_output_name(job) if fallback else task.dst
+        if dst != task.dst:
+            if os.path.exists(dst) and not self.overwrite:
+                job.error = f"{fallback} output exists: {os.path.basename(dst)}"
+                self.log_output.emit(f"[{task.idx}/{total}] SKIP fallback ({job.error})\n")
+                return None
+            self.log_output.emit(f"[{task.idx}/{total}] Output renamed -> {os.path.basename(dst)}\n")
+        retry = _EncodeTask(task.idx, job, dst, 0 if fallback else task.pass_num,
+                            task.attempt, retry=task.retry + 1)
+        return retry, delay
+
+    def _record_job(self, idx: int, job: Job, dst: str) -> None:
+        """Report finished job *idx* to the metrics log and the exporter."""
+        done = job.state == JobState.DONE
+        output_bytes = os.path.getsize(dst) if done and os.path.isfile(dst) else 0
+        if job.info is None:
+            job.info = probe_media(self._ffmpeg_path, job.source)
+        if self.exporter is not None:
+            input_bytes = (job.info or {}).get("size", 0) if done else 0
+            self.exporter.job_finished(job.fallback or self.codec, job.state, input_bytes, output_bytes)
+        if self._metrics_log is None:
+            return
+        metrics = self._metrics.pop(idx, None) or JobMetrics()
+        extra = {"fallback_from": self.codec} if job.fallback else {}
+        record = metrics.record(
+            job,
+            output=dst,
+            output_bytes=output_bytes,
+            batch=self._batch_id,
+            codec=job.fallback or self.codec,
+            params=self._params_for(job),
+            bitrate=self._bitrate_for(job.source),
+            size=f"{self.width}x{self.height}",
+            parallel=self.max_jobs,
+            host=self._metrics_log.host,
+            ffmpeg=ffmpeg_version(self._ffmpeg_path),
+            finished_at=job.finished_at,
+            **extra,
+        )
+        try:
+            self._metrics_log.write(record)
+        except OSError as e:
+            self.log_output.emit(f"[WARNING] Could not write metrics: {e}\n")
 
     def run(self):
         # If concatenate mode, use concat method
-        if self.concatenate and len(self.files) > 1:
+        if self.concatenate and len(self.jobs) > 1:
             self._run_concat()
             return
 
-        total = len(self.files)
         try:
             os.makedirs(self.output_dir, exist_ok=True)
         except Exception as e:
@@ -467,82 +1457,294 @@ class EncoderWorker(QThread):
             self.encoding_done.emit()
             return
 
-        for idx, src in enumerate(self.files, 1):
-            if self._cancelled:
-                self.log_output.emit("\n--- Encoding cancelled by user ---\n")
-                break
-
-            filename = os.path.basename(src)
-            dst = self.make_output_name(src)
-
-            if os.path.exists(dst) and not self.overwrite:
-                self.log_output.emit(f"[{idx}/{total}] SKIP (exists): {filename}\n")
-                self.file_finished.emit(idx, total, filename, True)
-                continue
-
-            self.file_started.emit(idx, total, filename)
-            self.log_output.emit(f"[{idx}/{total}] ENCODE: {filename}\n")
-
-            # Probe duration for progress reporting
-            total_duration = probe_duration(self._ffmpeg_path, src) or 0.0
-            # Adjust for per-file trimming
-            trim_start, trim_end = self.file_trims.get(src, ("", ""))
-            if trim_start and trim_start.strip():
-                try:
-                    start_sec = _parse_time_to_seconds(trim_start)
-                except Exception:
-                    start_sec = 0.0
+        if self.auto_parallel:
+            if self.tuning:
+                self.log_output.emit(
+                    f"Parallel jobs: auto -> {self.max_jobs} x {self.tuning['threads']} threads "
+                    f"(tuned {self.tuning.get('measured_at', '')})\n"
+                )
             else:
-                start_sec = 0.0
-            if trim_end and trim_end.strip():
-                try:
-                    end_sec = _parse_time_to_seconds(trim_end)
-                    total_duration = max(0.0, end_sec - start_sec)
-                except Exception:
-                    pass
-            elif start_sec > 0 and total_duration > 0:
-                total_duration = max(0.0, total_duration - start_sec)
-
-            args = self.build_ffmpeg_args(src, dst)
-            cmd_display = " ".join(f'"{a}"' if " " in a else a for a in args)
-            self.log_output.emit(f"> {cmd_display}\n\n")
-
-            try:
-                self._process = subprocess.Popen(
-                    args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+                self.log_output.emit(
+                    f"Parallel jobs: auto -> 1 ({self.codec} at "
+                    f"{resolution_band(self.width, self.height)} is not tuned yet; "
+                    f"run Tools → Auto-Tune Parallel Jobs or python -m vcc.core.autotune)\n"
                 )
 
-                self._read_output_with_progress(total_duration)
+        for warning in self.priority.open():
+            self.log_output.emit(f"[WARNING] Priority: {warning}\n")
+        if self.priority.profile.key != DEFAULT_PROFILE or self.priority.cgroup:
+            self.log_output.emit(f"Priority: {self.priority.profile.label} "
+                                 f"({self.priority.profile.describe()})\n")
 
-                self._process.wait()
-                success = self._process.returncode == 0
+        two_pass = self._uses_two_pass()
+        if two_pass:
+            self._passlog_dir = tempfile.mkdtemp(prefix="vcc_2pass_")
+        if self.metrics_dir:
+            try:
+                self._metrics_log = MetricsLog(self.metrics_dir)
+            except OSError as e:
+                self.log_output.emit(f"[WARNING] Metrics disabled: {e}\n")
+        self._batch_id = time.strftime("%Y%m%dT%H%M%S")
+        self.trace.name = f"VCC batch {self._batch_id}"
+        self.trace.begin(self._lanes())
+        if self.exporter is not None:
+            self.exporter.attach(self._exporter_snapshot)
+        try:
+            completed = self._run_pool(two_pass)
+        finally:
+            if self._passlog_dir:
+                shutil.rmtree(self._passlog_dir, ignore_errors=True)
+                self._passlog_dir = ""
+            self.trace.finish()
+            self.priority.close()
+            self._admission = None
+            self._pending = None
+            self._accepting = False
+            if self.exporter is not None:
+                self.exporter.detach()
+            if self._metrics_log is not None:
+                self._metrics_log.close()
+                self.log_output.emit(f"Metrics: {self._metrics_log.path}\n")
+                self._metrics_log = None
+
+        if completed and not self._cancelled:
+            self.log_output.emit("=== All done. ===\n")
+        self.encoding_done.emit()
 
-                if not success and not self._cancelled:
+    def _run_pool(self, two_pass: bool) -> bool:
+        """Schedule every file on a pool of *max_jobs* slots.
+
+        Returns False if the batch had to be aborted (FFmpeg missing).
+        """
+        total = len(self.jobs)
+        pending = self._pending = TaskQueue()
+        now = time.time()
+        for job in self.jobs:
+            job.reset()
+            job.queued_at = now
+        for idx, job in enumerate(self.jobs, 1):
+            self._queue_job(idx, job, pending, two_pass, total)
+        self._accepting = True
+
+        running = {}
+        retry_at: dict[int, float] = {}         # job index -> monotonic time its retry may start
+        hardware_failures: dict[int, int] = {}  # job index -> GPU failures so far
+        aborted = False
+        free_lanes = list(range(self._lanes()))
+        budget = ThreadBudget(self.thread_budget, self.max_jobs)
+        planner = CorePlanner() if self.pin_cpus else None
+        controller = None
+        if self.adaptive and self.max_jobs > self.min_jobs:
+            controller = ConcurrencyController(self.min_jobs, self.max_jobs)
+            if controller.available:
+                budget.slots = controller.target
+                self.log_output.emit(f"Adaptive parallel jobs: {controller.target} "
+                                     f"({self.min_jobs}-{self.max_jobs})\n")
+            else:
+                self.log_output.emit("[WARNING] Adaptive parallel jobs needs /proc/stat; "
+                                     f"running {self.max_jobs} jobs\n")
+                controller = None
+        admission = estimator = None
+        self._estimates = {}
+        if self.admission:
+            admission = self._admission = AdmissionControl()
+            estimator = JobEstimator(
+                self.codec, self.width, self.height, self.pix_fmt, self._gpu_enc is not None,
+                load_history(self.metrics_dir or default_metrics_dir(), self.codec),
+            )
+        with ThreadPoolExecutor(max_workers=self._lanes()) as pool:
+            while True:
+                while self._inbox:
+                    # Jobs added by add_jobs() while the batch runs
+                    idx = self._inbox.popleft()
+                    job = self.jobs[idx - 1]
+                    total = len(self.jobs)
+                    job.reset()
+                    job.queued_at = time.time()
+                    self._queue_job(idx, job, pending, two_pass, total)
+                if not (pending or running):
+                    with self._accept_lock:
+                        if not self._inbox:
+                            self._accepting = False
+                            break
+                    continue
+                limit = controller.target if controller is not None else self.max_jobs
+                blocked = False
+                while pending and not self._cancelled and not self._paused:
+                    # Jobs paused while queued or backing off keep their place but are passed over
+                    skip = self._paused_jobs
+                    if retry_at:
+                        now = time.monotonic()
+                        skip = skip | {idx for idx, due in retry_at.items() if due > now}
+                    task = pending.first(skip)
+                    if task is None:
+                        break
+                    if retry_at.pop(task.idx, None) is not None:
+                        self._set_waiting(task, "", total)
+                    preempting = False
+                    if len(running) - len(self._preempted) >= limit:
+                        if not self._preempt_for(task, running, total):
+                            break
+                        preempting = True
+                    if admission is not None:
+                        memory, output = self._estimate(task, estimator, total)
+                        resource, reason = admission.check(memory, output, task.dst)
+                        if resource and running:
+                            # Running jobs will free memory or finish writing; wait for them
+                            if preempting:
+                                self._end_preemption(task.idx, total)
+                            self._set_waiting(task, reason, total)
+                            blocked = True
+                            break
+                        if resource == "disk":
+                            # Nothing running will free space: starting would fill the disk
+                            pending.remove(task)
+                            self._remove_passlogs(task.idx)
+                            job = task.job
+                            job.state = JobState.FAILED
+                            job.error = f"Not enough disk space: {reason}"
+                            job.finished_at = time.time()
+                            self._set_waiting(task, "", total)
+                            self.log_output.emit(f"[{task.idx}/{total}] [ERROR] {job.error}\n")
+                            self._record_job(task.idx, job, task.dst)
+                            self.file_finished.emit(task.idx, total, os.path.basename(task.src), False)
+                            continue
+                        if resource:
+                            self.log_output.emit(f"[{task.idx}/{total}] [WARNING] Starting with "
+                                                 f"no other job to wait for: {reason}\n")
+                        self._set_waiting(task, "", total)
+                        admission.admit(task.idx, memory, output, task.dst)
+                    pending.remove(task)
+                    task.lane = heapq.heappop(free_lanes)
+                    task.threads = budget.acquire(task.idx, len(pending))
+                    if planner is not None and (task.threads or budget.cores) < planner.total:
+                        cpus, _ = planner.acquire(task.idx, task.threads or budget.cores)
+                        task.cpus = tuple(cpus)
+                        task.threads = len(cpus)
+                    if task.pass_num <= 1 and task.attempt == 1 and not task.retry:
+                        task.job.state = JobState.RUNNING
+                        task.job.started_at = time.time()
+                        filename = os.path.basename(task.src)
+                        self.trace.queue_wait(task.idx, filename, task.job.queued_at,
+                                              task.job.started_at)
+                        self.file_started.emit(task.idx, total, filename)
+                        self.log_output.emit(f"[{task.idx}/{total}] ENCODE: {filename}\n")
+                    running[pool.submit(self._run_task, task, total)] = task
+
+                if not running:
+                    if pending and not self._cancelled:
+                        # Everything left is paused or backing off: sleep until resume(),
+                        # cancel() or the next retry
+                        self._wake.wait(_CONTROL_TICK)
+                        self._wake.clear()
+                        continue
+                    if not pending:
+                        continue  # the inbox may have filled meanwhile
+                    break
+                # Wake up regularly so jobs added, reprioritized or reordered mid-batch
+                # are picked up while every slot is busy
+                timeout = _CONTROL_TICK
+                if blocked:
+                    timeout = min(timeout, _ADMISSION_TICK)
+                paused = self._paused or bool(self._paused_jobs) or bool(self._preempted)
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if controller is not None and paused:
+                    controller.restart()  # stopped jobs say nothing about the load
+                elif controller is not None and controller.tick(
+                        self._content_seconds(),
+                        bool(pending) and not blocked and len(running) >= controller.target):
+                    budget.slots = controller.target
                     self.log_output.emit(
-                        f"\n[WARNING] FFmpeg exited with code {self._process.returncode} on: {filename}\n"
+                        f"[adaptive] parallel jobs -> {controller.target}: {controller.reason} "
+                        f"(CPU idle {controller.idle:.0%}, I/O wait {controller.iowait:.0%}, "
+                        f"{controller.rate:.2f}x realtime)\n"
                     )
-                elif success:
-                    self.log_output.emit(f"\nDone -> {os.path.basename(dst)}\n")
-
-                self.file_finished.emit(idx, total, filename, success)
-
-            except FileNotFoundError:
-                self.encoding_error.emit(
-                    "ffmpeg not found! Please install FFmpeg and ensure ffmpeg.exe is in your system PATH."
-                )
-                self.encoding_done.emit()
-                return
-            except Exception as e:
-                self.log_output.emit(f"\n[ERROR] {e}\n")
-                self.file_finished.emit(idx, total, filename, False)
-
-            self.log_output.emit("\n")
-
-        if not self._cancelled:
-            self.log_output.emit("=== All done. ===\n")
-        self.encoding_done.emit()
+                for future in done:
+                    task = running.pop(future)
+                    heapq.heappush(free_lanes, task.lane)
+                    budget.release(task.idx)
+                    if planner is not None:
+                        planner.release(task.idx)
+                    if admission is not None:
+                        admission.release(task.idx)
+                    filename = os.path.basename(task.src)
+                    # Post-processing runs here on the scheduler thread
+                    with self.trace.span(task.lane, "post", "post", file=filename):
+                        raised = False
+                        try:
+                            returncode = future.result()
+                        except FileNotFoundError:
+                            self.encoding_error.emit(
+                                "ffmpeg not found! Please install FFmpeg and ensure ffmpeg.exe is in your system PATH."
+                            )
+                            aborted = True
+                            self.cancel()
+                            pending.clear()
+                            continue
+                        except Exception as e:
+                            self.log_output.emit(f"\n[ERROR] {e}\n")
+                            task.job.error = str(e)
+                            returncode = -1
+                            raised = True
+
+                        if returncode != 0 and not raised and not self._cancelled:
+                            planned = self._plan_retry(task, returncode, total, hardware_failures)
+                            if planned is not None:
+                                retry, delay = planned
+                                if delay > 0:
+                                    retry_at[task.idx] = time.monotonic() + delay
+                                    self._set_waiting(retry, f"retry {retry.retry}/"
+                                                      f"{self.retry_policy.retries} in {delay:g} s",
+                                                      total)
+                                pending.push(retry)
+                                continue
+
+                        if task.pass_num == 1 and returncode == 0 and not self._cancelled:
+                            # Second passes go first so passlogs are consumed promptly
+                            pending.push(_EncodeTask(task.idx, task.job, task.dst, 2, task.attempt,
+                                                     retry=task.retry))
+                            continue
+
+                        if (returncode == 0 and self.target_size_mb > 0 and not self._cancelled
+                                and self._correct_target_bitrate(task, total)):
+                            # Re-run only the final pass; pass-1 stats stay valid
+                            try:
+                                os.unlink(task.dst)
+                            except OSError:
+                                pass
+                            pending.push(_EncodeTask(
+                                task.idx, task.job, task.dst, task.pass_num, task.attempt + 1,
+                                retry=task.retry,
+                            ))
+                            continue
+
+                        self._remove_passlogs(task.idx)
+                        success = returncode == 0
+                        job = task.job
+                        job.finished_at = time.time()
+                        job.paused = False
+                        self._end_preemption(task.idx, total)
+                        if success:
+                            job.state = JobState.DONE
+                        elif self._cancelled:
+                            job.state = JobState.CANCELLED
+                        else:
+                            job.state = JobState.FAILED
+                            job.error = job.error or f"FFmpeg exited with code {returncode}"
+                        if not success and not self._cancelled:
+                            self.log_output.emit(
+                                f"\n[WARNING] FFmpeg exited with code {returncode} on: {filename}\n"
+                            )
+                        elif success:
+                            self.log_output.emit(f"\nDone -> {os.path.basename(task.dst)}\n")
+                        self._record_job(task.idx, job, task.dst)
+                        self.file_finished.emit(task.idx, total, filename, success)
+                        self.log_output.emit("\n")
+
+                if self._cancelled and pending:
+                    for task in pending.clear():
+                        self._set_waiting(task, "", total)
+
+        if self._cancelled and not aborted:
+            self.log_output.emit("\n--- Encoding cancelled by user ---\n")
+        return not aborted
@@ -218,6 +218,9 @@ _GPU_ENCODER_MAP: dict[str, GpuEncoder] = {e.name: e for e in ALL_GPU_ENCODERS}
 
 def _find_ffmpeg() -> str | None:
     """Locate ffmpeg executable."""
+    override = os.environ.get("VCC_FFMPEG", "")
+    if override and os.path.isfile(override):
+        return override
     path = shutil.which("ffmpeg")
     if path:
         return path
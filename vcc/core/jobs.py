@@ -0,0 +1,208 @@
+"""
+Job records for VCC.
+
+A Job holds everything VCC knows about one input file: its per-file
+settings (trim, crop, codec parameter overrides, explicit output path),
+probe results and the state/timings of its last encode.  A JobBatch is
+the ordered queue of jobs shared by the GUI and the encoder worker.
+"""
+
+from collections.abc import Iterable, Iterator
+
+
+class JobState:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+
+
+class JobPriority:
+    """Named queue priorities; higher starts first and any int is accepted."""
+
+    LOW = -1
+    NORMAL = 0
+    HIGH = 1
+    URGENT = 2      # and above: may suspend a running job (EncoderWorker preempt)
+    NAMES = {LOW: "Low", NORMAL: "Normal", HIGH: "High", URGENT: "Urgent"}
+
+    @classmethod
+    def label(cls, priority: int) -> str:
+        return cls.NAMES.get(priority, str(priority))
+
+    @classmethod
+    def parse(cls, value) -> int:
+        """An int from a number or a level name such as ``"urgent"``; raises ValueError."""
+        if isinstance(value, int):
+            return value
+        text = str(value).strip()
+        for priority, name in cls.NAMES.items():
+            if text.lower() == name.lower():
+                return priority
+        return int(text)
+
+
+class Job:
+    """One input file and its per-file encoding settings."""
+
+    __slots__ = (
+        "source", "output", "trim_start", "trim_end", "crop", "overrides", "priority",
+        "state", "error", "info", "queued_at", "started_at", "finished_at", "waiting",
+        "paused", "fallback",
+    )
+
+    # Per-file settings written by to_dict(); the rest is runtime state
+    SPEC_FIELDS = ("source", "output", "trim_start", "trim_end", "crop", "overrides", "priority")
+    RUNTIME_FIELDS = ("state", "error", "queued_at", "started_at", "finished_at")
+
+    def __init__(
+        self,
+        source: str,
+        output: str = "",
+        trim_start: str = "",
+        trim_end: str = "",
+        crop: str = "",
+        overrides: dict[str, str] | None = None,
+        priority: int = 0,
+    ):
+        self.source = source
+        self.output = output            # explicit output path, "" = auto-named
+        self.trim_start = trim_start    # e.g. "00:01:30", "" = from the start
+        self.trim_end = trim_end        # e.g. "00:05:00", "" = to the end
+        self.crop = crop                # e.g. "crop=1920:800:0:140", "" = none
+        self.overrides = overrides or {}  # codec params replacing the batch's, e.g. {"crf": "20"}
+        self.priority = priority        # JobPriority level, higher starts first
+        self.state = JobState.PENDING
+        self.error = ""
+        self.info: dict | None = None   # probe_media() result; {} if probing failed
+        self.queued_at = 0.0            # time.time() stamps of the last run
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self.waiting = ""               # why a pending job cannot start yet (memory, disk)
+        self.paused = False             # stopped or held back by pause/resume
+        self.fallback = ""              # CPU encoder replacing a failed GPU encoder, "" = none
+
+    def __repr__(self) -> str:
+        return f"Job({self.source!r}, state={self.state!r})"
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.trim_start.strip() or self.trim_end.strip())
+
+    def reset(self) -> None:
+        """Forget the state of a previous run."""
+        self.state = JobState.PENDING
+        self.error = ""
+        self.waiting = ""
+        self.paused = False
+        self.fallback = ""
+        self.queued_at = self.started_at = self.finished_at = 0.0
+
+    def to_dict(self, runtime: bool = False) -> dict:
+        """Serialise the non-default fields (plus run state if *runtime*)."""
+        d = {"source": self.source}
+        for name in self.SPEC_FIELDS[1:]:
+            value = getattr(self, name)
+            if value:
+                d[name] = dict(value) if name == "overrides" else value
+        if runtime:
+            for name in self.RUNTIME_FIELDS:
+                d[name] = getattr(self, name)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Job":
+        """Build a Job from a to_dict() mapping; unknown keys are ignored."""
+        if not d.get("source"):
+            raise ValueError("job has no source")
+        overrides = d.get("overrides") or {}
+        if not isinstance(overrides, dict):
+            raise ValueError("overrides must be a mapping")
+        job = cls(
+            str(d["source"]),
+            output=str(d.get("output") or ""),
+            trim_start=str(d.get("trim_start") or ""),
+            trim_end=str(d.get("trim_end") or ""),
+            crop=str(d.get("crop") or ""),
+            overrides={str(k): str(v) for k, v in overrides.items()},
+            priority=JobPriority.parse(d.get("priority") or 0),
+        )
+        for name in cls.RUNTIME_FIELDS:
+            if name in d:
+                setattr(job, name, d[name])
+        return job
+
+
+class JobBatch:
+    """Ordered jobs with a source path -> position index for O(1) lookups."""
+
+    __slots__ = ("_jobs", "_index")
+
+    def __init__(self, jobs: Iterable[Job] = ()):
+        self._jobs: list[Job] = []
+        self._index: dict[str, int] = {}
+        self.add(jobs)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __iter__(self) -> Iterator[Job]:
+        return iter(self._jobs)
+
+    def __getitem__(self, row: int) -> Job:
+        return self._jobs[row]
+
+    def __contains__(self, source: str) -> bool:
+        return source in self._index
+
+    def get(self, source: str) -> Job | None:
+        row = self._index.get(source)
+        return None if row is None else self._jobs[row]
+
+    def row_of(self, source: str) -> int | None:
+        return self._index.get(source)
+
+    def sources(self) -> list[str]:
+        return [j.source for j in self._jobs]
+
+    def add(self, jobs: Iterable[Job]) -> list[Job]:
+        """Append jobs whose source is not queued yet; return the ones added."""
+        index = self._index
+        added = []
+        for job in jobs:
+            if job.source in index:
+                continue
+            index[job.source] = len(self._jobs)
+            self._jobs.append(job)
+            added.append(job)
+        return added
+
+    def add_paths(self, paths: Iterable[str]) -> list[Job]:
+        return self.add(Job(p) for p in paths if p not in self._index)
+
+    def delete(self, start: int, end: int) -> list[Job]:
+        """Remove rows *start*..*end* (inclusive) without reindexing; call reindex() after."""
+        removed = self._jobs[start:end + 1]
+        del self._jobs[start:end + 1]
+        return removed
+
+    def move(self, rows: list[int], dest: int) -> None:
+        """Move the jobs at sorted *rows* to before row *dest*, keeping their order."""
+        moving = set(rows)
+        jobs = [self._jobs[r] for r in rows]
+        rest = [j for r, j in enumerate(self._jobs) if r not in moving]
+        pos = dest - sum(1 for r in rows if r < dest)
+        self._jobs[:] = rest[:pos] + jobs + rest[pos:]
+        self.reindex()
+
+    def reindex(self) -> None:
+        self._index = {j.source: row for row, j in enumerate(self._jobs)}
+
+    def clear(self) -> None:
+        self._jobs.clear()
+        self._index.clear()
+
+    def to_dicts(self, runtime: bool = False) -> list[dict]:
+        return [j.to_dict(runtime) for j in self._jobs]
@@ -0,0 +1,195 @@
+"""
+Job manifests for VCC.
+
+A manifest lists jobs with their per-file settings so batches generated
+by scripts can be loaded by the GUI (File → Import Job Manifest) or run
+headless with ``python -m vcc.cli``.  Two formats are supported, chosen
+by file extension:
+
+* JSON Lines (``.jsonl`` / ``.ndjson``): one ``Job.to_dict()`` object per
+  line, e.g. ``{"source": "a.mkv", "trim_start": "00:01:00",
+  "overrides": {"crf": "28"}}``.
+* CSV (``.csv``): a header row naming the columns.  ``source``,
+  ``output``, ``trim_start``, ``trim_end``, ``crop`` and ``priority`` map
+  to the Job fields; every other column is a codec parameter override
+  (e.g. a ``crf`` column).  Empty cells are ignored.
+
+``priority`` is a number or one of ``low``, ``normal``, ``high`` and
+``urgent``; higher priorities start first (see vcc.core.jobs.JobPriority).
+Blank lines and lines starting with ``#`` are skipped in both formats.
+Relative source and output paths are resolved against the manifest's
+directory.  Files are read line by line, so a manifest of any size is
+parsed in constant memory; the GUI parses on a ManifestLoader thread and
+receives the jobs in batches, like directory scans.
+"""
+
+import os
+import csv
+import json
+import time
+from collections.abc import Iterable, Iterator
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from vcc.core.jobs import Job
+
+MANIFEST_FILTER = "Job Manifests (*.jsonl *.ndjson *.csv);;All Files (*.*)"
+
+_JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+_CSV_FIELDS = ("source", "output", "trim_start", "trim_end", "crop", "priority")
+
+
+class ManifestError(ValueError):
+    """A manifest line could not be turned into a Job."""
+
+    def __init__(self, path: str, line: int, message: str):
+        super().__init__(f"{os.path.basename(path)}:{line}: {message}")
+        self.path = path
+        self.line = line
+
+
+def _is_csv(path: str) -> bool:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return True
+    if ext in _JSONL_EXTENSIONS:
+        return False
+    raise ValueError(f"unknown manifest format '{ext}' (expected .jsonl, .ndjson or .csv)")
+
+
+def _resolve(job: Job, base: str) -> Job:
+    job.source = os.path.normpath(os.path.join(base, os.path.expanduser(job.source)))
+    if job.output:
+        job.output = os.path.normpath(os.path.join(base, os.path.expanduser(job.output)))
+    return job
+
+
+def _iter_jsonl(f) -> Iterator[tuple[int, dict]]:
+    for lineno, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            d = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield lineno, ValueError(f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(d, dict):
+            yield lineno, ValueError("expected a JSON object")
+            continue
+        yield lineno, d
+
+
+def _iter_csv(f) -> Iterator[tuple[int, dict]]:
+    lines = (line for line in f if line.strip() and not line.lstrip().startswith("#"))
+    reader = csv.DictReader(lines, skipinitialspace=True)
+    for row in reader:
+        d: dict = {}
+        overrides = {}
+        for key, value in row.items():
+            if key is None or value is None:
+                continue  # extra cells without a header / missing trailing cells
+            key, value = key.strip(), value.strip()
+            if not value:
+                continue
+            if key in _CSV_FIELDS:
+                d[key] = value
+            else:
+                overrides[key] = value
+        if overrides:
+            d["overrides"] = overrides
+        # DictReader's line_num counts physical lines of the filtered stream;
+        # report the record number instead (1 = first row after the header).
+        yield reader.line_num - 1, d
+
+
+def iter_manifest(path: str, errors: list[ManifestError] | None = None) -> Iterator[Job]:
+    """Yield the jobs of the manifest at *path* as they are read.
+
+    Invalid records raise ManifestError, unless an *errors* list is given,
+    in which case they are appended to it and skipped.
+    """
+    use_csv = _is_csv(path)
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        records = _iter_csv(f) if use_csv else _iter_jsonl(f)
+        for lineno, d in records:
+            try:
+                if isinstance(d, Exception):
+                    raise d
+                job = _resolve(Job.from_dict(d), base)
+            except (ValueError, TypeError) as e:
+                err = ManifestError(path, lineno, str(e))
+                if errors is None:
+                    raise err from None
+                errors.append(err)
+                continue
+            yield job
+
+
+class ManifestLoader(QThread):
+    """
+    Parses a manifest in the background.
+    Emits jobs in batches, then the total loaded and any skipped records.
+    """
+
+    jobs_loaded = pyqtSignal(list)          # batch of Job objects
+    load_done = pyqtSignal(int, list, str)  # jobs loaded, ManifestErrors, fatal error ("" if none)
+
+    BATCH_SIZE = 2000
+    BATCH_INTERVAL = 0.1  # seconds
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+
+    def run(self):
+        errors: list[ManifestError] = []
+        batch: list[Job] = []
+        loaded = 0
+        fatal = ""
+        last_flush = time.monotonic()
+        try:
+            for job in iter_manifest(self.path, errors):
+                batch.append(job)
+                loaded += 1
+                if (len(batch) >= self.BATCH_SIZE
+                        or time.monotonic() - last_flush >= self.BATCH_INTERVAL):
+                    self.jobs_loaded.emit(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+        except (OSError, ValueError) as e:
+            fatal = str(e)
+        if batch:
+            self.jobs_loaded.emit(batch)
+        self.load_done.emit(loaded, errors, fatal)
+
+
+def write_manifest(path: str, jobs: Iterable[Job]) -> int:
+    """Write *jobs* to *path* (format from the extension); return the number written.
+
+    The file is written to a temporary name and moved into place, so an
+    existing manifest is never left half-written.
+    """
+    use_csv = _is_csv(path)
+    tmp = path + ".tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        if use_csv:
+            jobs = list(jobs)  # the header needs every override key
+            keys = sorted({k for job in jobs for k in job.overrides} - set(_CSV_FIELDS))
+            writer = csv.writer(f)
+            writer.writerow(list(_CSV_FIELDS) + keys)
+            for job in jobs:
+                d = job.to_dict()
+                overrides = d.get("overrides", {})
+                writer.writerow([d.get(k, "") for k in _CSV_FIELDS]
+                                + [overrides.get(k, "") for k in keys])
+                count += 1
+        else:
+            for job in jobs:
+                f.write(json.dumps(job.to_dict(), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    os.replace(tmp, path)
+    return count
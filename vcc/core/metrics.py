@@ -0,0 +1,314 @@
+"""
+Per-job performance metrics for VCC.
+
+Every finished job appends one JSON record to a size-rotated log
+(``~/.vcc_metrics/jobs.jsonl`` by default): probe time, queue wait, wall
+time, average/peak fps, speed, child CPU time and peak RSS (from
+``os.wait4`` rusage), input/output sizes and the exit code, tagged with
+the batch, codec settings, host and FFmpeg version.  The records are meant
+for capacity planning and for spotting regressions after FFmpeg upgrades,
+e.g. with ``jq`` or pandas.
+
+With stage timings enabled, FFmpeg runs with ``-benchmark_all
+-benchmark`` and the ``bench:`` records it prints are summed into a
+decode/encode/mux breakdown (StageTimes) that is added to the record.
+
+Failed runs that were retried or fell back to a CPU encoder (see
+vcc.core.retry) are listed under ``failures``; ``attempts`` counts the
+tries of the job.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import logging
+import subprocess
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+METRICS_FILE = "jobs.jsonl"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+# ru_maxrss is reported in KiB on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+_FPS_RE = re.compile(r"frame=\s*(\d+)\s+fps=\s*([\d.]+)")
+_TIME_RE = re.compile(r"time=\s*(\d+):(\d+):([\d.]+)")
+_SPEED_RE = re.compile(r"speed=\s*([\d.]+)x")
+
+# -benchmark_all: "bench:     1234 user       56 sys     7890 real decode_video 0.0"
+_BENCH_STAGE_RE = re.compile(r"bench:\s*(\d+) user\s+(\d+) sys\s+(\d+) real (\w+)")
+# -benchmark summary: "bench: utime=1.234s stime=0.056s rtime=2.000s" / "bench: maxrss=123456KiB"
+_BENCH_TOTAL_RE = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s rtime=([\d.]+)s")
+_BENCH_RSS_RE = re.compile(r"bench: maxrss=(\d+)\s*(KiB|kB)")
+
+# Minimum spacing of the samples used for the instantaneous (peak) fps
+_PEAK_WINDOW = 0.5
+
+
+def default_metrics_dir() -> str:
+    return os.path.join(os.path.expanduser("~"), ".vcc_metrics")
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_version(ffmpeg_path: str) -> str:
+    """First line of ``ffmpeg -version``, e.g. ``ffmpeg version 7.1 ...``."""
+    try:
+        out = subprocess.run(
+            [ffmpeg_path, "-version"], capture_output=True, text=True, timeout=10,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        ).stdout
+    except Exception:
+        return ""
+    return out.splitlines()[0].strip() if out else ""
+
+
+class EncodeStats:
+    """Progress figures parsed from FFmpeg's ``frame=... fps=... speed=...`` lines."""
+
+    __slots__ = ("frames", "fps", "peak_fps", "speed", "out_time", "_mark")
+
+    def __init__(self):
+        self.frames = 0
+        self.fps = 0.0        # FFmpeg's running average
+        self.peak_fps = 0.0
+        self.speed = 0.0      # multiple of realtime
+        self.out_time = 0.0   # seconds of output written
+        self._mark: tuple[float, int] | None = None
+
+    def feed(self, line: str) -> bool:
+        """Update from one line of FFmpeg output; return True if it was a stats line."""
+        if not line.startswith("frame="):
+            return False
+        m = _FPS_RE.match(line)
+        if not m:
+            return False
+        self.frames = int(m.group(1))
+        self.fps = float(m.group(2))
+        m = _TIME_RE.search(line)
+        if m:
+            self.out_time = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+        m = _SPEED_RE.search(line)
+        if m:
+            self.speed = float(m.group(1))
+
+        now = time.monotonic()
+        if self._mark is None:
+            self._mark = (now, self.frames)
+        elif now - self._mark[0] >= _PEAK_WINDOW:
+            rate = (self.frames - self._mark[1]) / (now - self._mark[0])
+            self.peak_fps = max(self.peak_fps, rate)
+            self._mark = (now, self.frames)
+        self.peak_fps = max(self.peak_fps, self.fps)
+        return True
+
+
+class StageTimes:
+    """Per-stage CPU and wall time summed from FFmpeg's ``bench:`` lines.
+
+    ``-benchmark_all`` labels each record with the stage that ran
+    (``decode_video``, ``encode_audio``, ``flush_video``, ...).  Decoders
+    count as "decode", encoders and their flushes as "encode", and anything
+    else FFmpeg times (packet writing, depending on the version) as "mux".
+    """
+
+    __slots__ = ("stages", "utime", "stime", "rtime", "maxrss")
+
+    def __init__(self):
+        self.stages: dict[str, list[int]] = {}  # stage -> [user us, sys us, real us, records]
+        self.utime = 0.0    # -benchmark totals, seconds
+        self.stime = 0.0
+        self.rtime = 0.0
+        self.maxrss = 0     # bytes; 0 if not reported
+
+    @staticmethod
+    def _stage(label: str) -> str:
+        if label.startswith("decode"):
+            return "decode"
+        if label.startswith(("encode", "flush")):
+            return "encode"
+        return "mux"
+
+    def feed(self, line: str) -> bool:
+        """Update from one line of FFmpeg output; return True if it was a bench line."""
+        if not line.startswith("bench:"):
+            return False
+        m = _BENCH_STAGE_RE.match(line)
+        if m:
+            stage = self._stage(m.group(4))
+            acc = self.stages.get(stage)
+            if acc is None:
+                acc = self.stages[stage] = [0, 0, 0, 0]
+            acc[0] += int(m.group(1))
+            acc[1] += int(m.group(2))
+            acc[2] += int(m.group(3))
+            acc[3] += 1
+            return True
+        m = _BENCH_TOTAL_RE.match(line)
+        if m:
+            self.utime += float(m.group(1))
+            self.stime += float(m.group(2))
+            self.rtime += float(m.group(3))
+            return True
+        m = _BENCH_RSS_RE.match(line)
+        if m:
+            self.maxrss = max(self.maxrss, int(m.group(1)) * 1024)
+        return True
+
+    def __bool__(self) -> bool:
+        return bool(self.stages or self.rtime)
+
+    def merge(self, other: "StageTimes") -> None:
+        for stage, (user, sys_, real, n) in other.stages.items():
+            acc = self.stages.setdefault(stage, [0, 0, 0, 0])
+            acc[0] += user
+            acc[1] += sys_
+            acc[2] += real
+            acc[3] += n
+        self.utime += other.utime
+        self.stime += other.stime
+        self.rtime += other.rtime
+        self.maxrss = max(self.maxrss, other.maxrss)
+
+    def summary(self) -> str:
+        """One-line breakdown for the log, e.g. ``decode 1.2s  encode 9.8s  mux 0.1s``."""
+        parts = [f"{stage} {self.stages[stage][2] / 1e6:.2f}s"
+                 for stage in ("decode", "encode", "mux") if stage in self.stages]
+        if self.maxrss:
+            parts.append(f"maxrss {self.maxrss / 1048576:.0f} MiB")
+        return "  ".join(parts)
+
+    def to_dict(self) -> dict:
+        d = {
+            stage: {"user_s": round(user / 1e6, 3), "sys_s": round(sys_ / 1e6, 3),
+                    "real_s": round(real / 1e6, 3), "records": n}
+            for stage, (user, sys_, real, n) in sorted(self.stages.items())
+        }
+        d.update(utime_s=round(self.utime, 3), stime_s=round(self.stime, 3),
+                 rtime_s=round(self.rtime, 3), maxrss_bytes=self.maxrss)
+        return d
+
+
+class JobMetrics:
+    """Measurements of one job, summed over its passes and re-encodes."""
+
+    __slots__ = ("runs", "encode_s", "cpu_user_s", "cpu_sys_s", "peak_rss", "stats", "exit_code",
+                 "bench", "paused_s", "failures")
+
+    def __init__(self):
+        self.runs = 0             # FFmpeg invocations (passes x attempts)
+        self.encode_s = 0.0       # wall time spent inside FFmpeg, not counting pauses
+        self.paused_s = 0.0       # time FFmpeg was stopped by pause/resume
+        self.cpu_user_s = 0.0
+        self.cpu_sys_s = 0.0
+        self.peak_rss = 0         # bytes; 0 if unknown
+        self.stats = EncodeStats()  # of the latest run
+        self.exit_code: int | None = None
+        self.bench: StageTimes | None = None  # summed over runs with stage timings on
+        self.failures: list[dict] = []  # failed runs, see add_failure()
+
+    def add_run(self, stats: EncodeStats, wall: float, exit_code: int, usage=None,
+                bench: StageTimes | None = None, paused: float = 0.0) -> None:
+        """Account one finished FFmpeg run.
+
+        *usage* is its ``os.wait4`` rusage and *bench* its stage timings, if
+        any; *paused* is the part of *wall* the process spent stopped.
+        """
+        self.runs += 1
+        self.encode_s += max(0.0, wall - paused)
+        self.paused_s += paused
+        self.stats = stats
+        self.exit_code = exit_code
+        if usage is not None:
+            self.cpu_user_s += usage.ru_utime
+            self.cpu_sys_s += usage.ru_stime
+            self.peak_rss = max(self.peak_rss, usage.ru_maxrss * _RSS_UNIT)
+        if bench:
+            if self.bench is None:
+                self.bench = StageTimes()
+            self.bench.merge(bench)
+
+    def add_failure(self, encoder: str, exit_code: int, kind: str, error: str,
+                    retry_in: float | None) -> None:
+        """Note a failed run, classified by vcc.core.retry; *retry_in* None = not retried."""
+        self.failures.append({
+            "encoder": encoder,
+            "exit_code": exit_code,
+            "failure": kind,
+            "error": error,
+            "retry_in_s": None if retry_in is None else round(retry_in, 1),
+        })
+
+    def record(self, job, **extra) -> dict:
+        """The JSON record for *job* (a finished vcc.core.jobs.Job)."""
+        stats = self.stats
+        wall = max(0.0, job.finished_at - job.started_at - self.paused_s) if job.started_at else 0.0
+        info = job.info or {}
+        avg_fps, speed = stats.fps, stats.speed
+        if self.paused_s and self.encode_s > 0:
+            # FFmpeg's own fps and speed count the time it was stopped
+            avg_fps = stats.frames / self.encode_s
+            speed = round(stats.out_time / self.encode_s, 3)
+        elif not avg_fps and stats.frames and self.encode_s > 0:
+            avg_fps = stats.frames / self.encode_s
+        rec = {
+            "source": job.source,
+            "state": job.state,
+            "exit_code": self.exit_code,
+            "error": job.error,
+            "probe_s": round(info.get("probe_time", 0.0), 4),
+            "queue_wait_s": round(max(0.0, job.started_at - job.queued_at), 3) if job.started_at else 0.0,
+            "wall_s": round(wall, 3),
+            "encode_s": round(self.encode_s, 3),
+            "paused_s": round(self.paused_s, 3),
+            "runs": self.runs,
+            "attempts": 1 + sum(1 for f in self.failures if f["retry_in_s"] is not None),
+            "frames": stats.frames,
+            "avg_fps": round(avg_fps, 2),
+            "peak_fps": round(stats.peak_fps, 2),
+            "speed": speed,
+            "content_s": round(stats.out_time, 3),
+            "cpu_user_s": round(self.cpu_user_s, 3),
+            "cpu_sys_s": round(self.cpu_sys_s, 3),
+            "peak_rss_bytes": self.peak_rss,
+            "input_bytes": _file_size(job.source),
+        }
+        if self.bench is not None:
+            rec["stages"] = self.bench.to_dict()
+        if self.failures:
+            rec["failures"] = self.failures
+        rec.update(extra)
+        return rec
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class MetricsLog:
+    """Appends JSON records to ``<directory>/jobs.jsonl``, rotating it by size.
+
+    Safe to call from several threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = MAX_BYTES, backups: int = BACKUP_COUNT):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, METRICS_FILE)
+        self.host = socket.gethostname()
+        self._handler = RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+        )
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self._handler.handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+
+    def close(self) -> None:
+        self._handler.close()
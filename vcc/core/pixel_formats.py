@@ -154,6 +154,9 @@ actually helps the encoder produce smaller files with fewer artifacts.<br>
 
 def _find_ffmpeg() -> str | None:
     """Locate ffmpeg executable (lightweight duplicate to avoid circular imports)."""
+    override = os.environ.get("VCC_FFMPEG", "")
+    if override and os.path.isfile(override):
+        return override
     path = shutil.which("ffmpeg")
     if path:
         return path
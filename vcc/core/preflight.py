@@ -0,0 +1,188 @@
+"""
+Preflight check for VCC batches.
+
+Hours into a batch, file #173 turns out to have a subtitle stream the
+container cannot hold or a pixel format the encoder rejects.  The
+preflight check finds such files before the batch starts: for every
+queued file it runs the exact command ``build_ffmpeg_args`` builds,
+limited to half a second of output, and reports each failure with
+FFmpeg's error.  Files are checked in parallel, so a whole queue takes
+seconds.
+
+The short output goes through the real muxer into a temporary file
+rather than into the null muxer, which accepts any stream and would let
+container incompatibilities (e.g. image subtitles in MP4) slip through.
+Files whose output exists and would be skipped are not checked.  In
+target-size mode each file's bitrate is planned first, so files that
+cannot be sized fail here too; two-pass batches are tested with the
+single-pass command (see EncoderWorker.build_test_args).  GPU encoders
+allow only a few sessions at once, so GPU batches are checked at most
+the batch's parallel jobs at a time, and files that fail with a hardware
+error are checked again alone before they are reported.
+
+Run from the GUI before every batch (Settings → Preflight Check Before
+Encoding) or with ``--preflight`` in the CLI.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from vcc.core.encoder import EncoderWorker
+from vcc.core.jobs import Job
+from vcc.core.retry import FAILURE_HARDWARE, classify_failure
+
+DEFAULT_SECONDS = 0.5
+DEFAULT_TIMEOUT = 60.0   # seconds per file; slow presets and network shares need a while
+
+# stderr lines searched for the error that explains a failure
+_LOG_TAIL = 30
+
+
+class PreflightChecker(QThread):
+    """
+    Test-encodes a short piece of every job in the background.
+
+    Emits file_checked for each job as it finishes and preflight_done
+    with the result of check() at the end.
+    """
+
+    log_output = pyqtSignal(str)
+    file_checked = pyqtSignal(int, str)   # index into jobs (1-based), FFmpeg error ("" = passed)
+    preflight_done = pyqtSignal(dict)     # see check()
+
+    def __init__(self, worker: EncoderWorker, jobs: list[Job] | None = None,
+                 seconds: float = DEFAULT_SECONDS, parallel: int = 0,
+                 timeout: float = DEFAULT_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.worker = worker      # configured with the batch settings; never started
+        self.jobs = list(worker.jobs if jobs is None else jobs)
+        self.seconds = seconds
+        # Test encodes are short and mostly start-up: run more of them than cores.
+        # GPU encoders allow only a few sessions at once (consumer NVENC: 3-8),
+        # so stay within the batch's own parallel jobs there.
+        if not parallel:
+            parallel = min(16, max(2, os.cpu_count() or 1))
+            if worker.gpu_encoder is not None:
+                parallel = min(parallel, worker.max_jobs)
+        self.parallel = parallel
+        self.timeout = timeout
+        self.result: dict | None = None
+        self._cancelled = False
+        self._processes: set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self._cancelled = True
+        with self._lock:
+            for process in self._processes:
+                if process.poll() is None:
+                    process.kill()
+
+    def run(self):
+        self.preflight_done.emit(self.check())
+
+    def check(self) -> dict:
+        """Check every job and return the result (also kept in ``self.result``).
+
+        ``{"passed": [Job], "failed": [(Job, error)], "checked": int,
+        "wall_s": float, "cancelled": bool}`` - *passed* includes jobs that
+        were not checked because their output exists.
+        """
+        worker = self.worker
+        start = time.perf_counter()
+        errors: dict[int, str] = {}
+        todo = [(idx, job) for idx, job in enumerate(self.jobs, 1)
+                if worker.overwrite or not os.path.exists(worker.make_output_name(job))]
+        self.log_output.emit(f"Preflight: test-encoding {self.seconds:g} s of {len(todo)} file(s), "
+                             f"{min(self.parallel, len(todo) or 1)} at a time\n")
+        tmpdir = tempfile.mkdtemp(prefix="vcc_preflight_")
+        recheck = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+                futures = {pool.submit(self._check_job, idx, job, tmpdir): (idx, job)
+                           for idx, job in todo}
+                for future in as_completed(futures):
+                    idx, job = futures[future]
+                    try:
+                        error, kind, args = future.result()
+                    except FileNotFoundError:
+                        error, kind, args = "ffmpeg not found", "", []
+                        self.cancel()
+                    if self._cancelled and error != "ffmpeg not found":
+                        continue
+                    if kind == FAILURE_HARDWARE and self.parallel > 1:
+                        recheck.append((idx, job))  # maybe only out of GPU sessions
+                        continue
+                    self._report(idx, job, error, args, errors)
+            # Hardware failures in parallel can be the session limit: try them alone
+            for idx, job in sorted(recheck, key=lambda item: item[0]):
+                if self._cancelled:
+                    break
+                error, _, args = self._check_job(idx, job, tmpdir)
+                self._report(idx, job, error, args, errors)
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        wall = time.perf_counter() - start
+        failed = [(job, errors[idx]) for idx, job in enumerate(self.jobs, 1) if idx in errors]
+        passed = [job for idx, job in enumerate(self.jobs, 1) if idx not in errors]
+        if self._cancelled:
+            self.log_output.emit("Preflight cancelled\n")
+        else:
+            self.log_output.emit(f"Preflight: {len(todo) - len(failed)} passed, {len(failed)} failed "
+                                 f"in {wall:.1f} s\n\n")
+        self.result = {"passed": passed, "failed": failed, "checked": len(todo),
+                       "wall_s": wall, "cancelled": self._cancelled}
+        return self.result
+
+    def _report(self, idx: int, job: Job, error: str, args: list[str], errors: dict[int, str]) -> None:
+        if error:
+            total = len(self.jobs)
+            errors[idx] = error
+            self.log_output.emit(f"[{idx}/{total}] FAIL {os.path.basename(job.source)}: {error}\n")
+            if args:
+                cmd_display = " ".join(f'"{a}"' if " " in a else a for a in args)
+                self.log_output.emit(f"[{idx}/{total}] > {cmd_display}\n")
+        self.file_checked.emit(idx, error)
+
+    def _check_job(self, idx: int, job: Job, tmpdir: str) -> tuple[str, str, list[str]]:
+        """Run *job*'s test encode; return (FFmpeg's error, failure kind, command), "" if it passed."""
+        if self._cancelled:
+            return "", "", []
+        ext = os.path.splitext(self.worker.make_output_name(job))[1]
+        output = os.path.join(tmpdir, f"job{idx}{ext}")
+        try:
+            args = self.worker.build_test_args(job, self.seconds, output=output, plan_target=True)
+        except ValueError as e:
+            return str(e), "", []  # target size cannot be planned for this file
+        process = subprocess.Popen(
+            args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            text=True, errors="replace",
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        )
+        with self._lock:
+            self._processes.add(process)
+        try:
+            try:
+                _, stderr = process.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                return f"no output within {self.timeout:g} s", "", args
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+            try:
+                os.unlink(output)
+            except OSError:
+                pass
+        if process.returncode == 0:
+            return "", "", args
+        kind, line = classify_failure(process.returncode, stderr.splitlines()[-_LOG_TAIL:])
+        return line or f"FFmpeg exited with code {process.returncode}", kind, args
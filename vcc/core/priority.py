@@ -0,0 +1,237 @@
+"""
+Background priority profiles for VCC encodes.
+
+A profile starts FFmpeg children with a nice level and an I/O scheduling
+class (``ioprio_set``), and - when VCC is given a delegated cgroup v2
+directory - runs them in a per-batch child cgroup whose ``cpu.weight``
+and ``cpu.max`` are set from the profile.  Profiles can be switched while
+a batch runs: running processes are reniced thread by thread, their I/O
+class is changed and the cgroup limits are rewritten; jobs started later
+use the new profile directly.
+
+Lowering the nice level again (e.g. Idle → Normal) needs CAP_SYS_NICE,
+so without it running jobs keep their nice level; the cgroup weight, when
+available, still takes effect immediately.
+
+The cgroup directory comes from the ``--cgroup`` CLI option, the
+Settings menu or the ``VCC_CGROUP`` environment variable.  It must be
+writable by the user and have the ``cpu`` controller enabled in its
+``cgroup.subtree_control``, e.g. as set up by an administrator::
+
+    mkdir /sys/fs/cgroup/vcc && chown -R alice /sys/fs/cgroup/vcc
+    echo +cpu > /sys/fs/cgroup/cgroup.subtree_control
+    echo +cpu > /sys/fs/cgroup/vcc/cgroup.subtree_control
+"""
+
+import os
+import sys
+import ctypes
+import platform
+import threading
+from dataclasses import dataclass
+
+from vcc.core.threads import default_cores
+
+CGROUP_ENV = "VCC_CGROUP"
+
+# I/O scheduling classes (linux/ioprio.h)
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+_SYS_IOPRIO_SET = {"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289, "armv7l": 314,
+                   "ppc64le": 273, "s390x": 282, "riscv64": 30}
+
+_CPU_MAX_PERIOD = 100_000  # microseconds
+
+
+@dataclass(frozen=True)
+class PriorityProfile:
+    key: str
+    label: str
+    nice: int = 0
+    ionice_class: int = 0       # 0 = leave I/O priority alone
+    ionice_level: int = 4       # 0 (highest) - 7, best-effort class only
+    cpu_weight: int = 100       # cgroup v2 cpu.weight, 1-10000 (100 = default)
+    cpu_max: float = 0.0        # fraction of the usable cores, 0 = unlimited
+
+    def describe(self) -> str:
+        parts = [f"nice {self.nice}"]
+        if self.ionice_class == IOPRIO_CLASS_IDLE:
+            parts.append("idle I/O")
+        elif self.ionice_class == IOPRIO_CLASS_BE:
+            parts.append(f"I/O level {self.ionice_level}")
+        if self.cpu_max:
+            parts.append(f"≤{self.cpu_max:.0%} CPU")
+        return ", ".join(parts)
+
+
+PROFILES = {
+    p.key: p for p in (
+        PriorityProfile("normal", "Normal"),
+        PriorityProfile("background", "Background", nice=10, ionice_class=IOPRIO_CLASS_BE,
+                        ionice_level=7, cpu_weight=20),
+        PriorityProfile("idle", "Idle", nice=19, ionice_class=IOPRIO_CLASS_IDLE, cpu_weight=1),
+        PriorityProfile("half", "Background, half the CPU", nice=10,
+                        ionice_class=IOPRIO_CLASS_BE, ionice_level=7, cpu_weight=20, cpu_max=0.5),
+    )
+}
+DEFAULT_PROFILE = "normal"
+
+
+def _libc_syscall():
+    if not sys.platform.startswith("linux") or platform.machine() not in _SYS_IOPRIO_SET:
+        return None
+    try:
+        return ctypes.CDLL(None, use_errno=True).syscall
+    except OSError:
+        return None
+
+
+_syscall = _libc_syscall()
+
+
+def set_ioprio(tid: int, ioclass: int, level: int) -> None:
+    """``ioprio_set`` for one thread (0 = the calling thread); raises OSError."""
+    if _syscall is None:
+        raise OSError("ioprio_set is not available on this platform")
+    value = (ioclass << _IOPRIO_CLASS_SHIFT) | (level if ioclass == IOPRIO_CLASS_BE else 0)
+    if _syscall(_SYS_IOPRIO_SET[platform.machine()], _IOPRIO_WHO_PROCESS, tid, value) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def _threads_of(pid: int) -> list[int]:
+    try:
+        return [int(t) for t in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        return [pid]
+
+
+def usable_cgroup(path: str) -> str:
+    """Why *path* cannot hold VCC's batch cgroups, or "" if it can."""
+    if not os.path.isdir(path):
+        return f"{path} is not a directory"
+    if not os.access(path, os.W_OK):
+        return f"{path} is not writable"
+    try:
+        with open(os.path.join(path, "cgroup.subtree_control"), encoding="ascii") as f:
+            controllers = f.read().split()
+    except OSError:
+        return f"{path} is not a cgroup v2 directory"
+    if "cpu" not in controllers:
+        return f"the cpu controller is not enabled in {path}/cgroup.subtree_control"
+    return ""
+
+
+class PriorityController:
+    """
+    Applies one batch's priority profile to its FFmpeg children.
+
+    ``preexec()`` runs in every new child before exec; ``switch()``
+    changes the profile of running children; ``close()`` removes the
+    batch cgroup once the children are gone.  Problems are collected as
+    warnings rather than raised: priority must never stop an encode.
+    """
+
+    def __init__(self, profile: str = DEFAULT_PROFILE, cgroup_parent: str = ""):
+        self.profile = PROFILES.get(profile, PROFILES[DEFAULT_PROFILE])
+        self.cgroup_parent = cgroup_parent or os.environ.get(CGROUP_ENV, "")
+        self.cgroup = ""        # this batch's cgroup directory, "" = none
+        self._lock = threading.Lock()
+
+    def open(self) -> list[str]:
+        """Create the batch cgroup (if configured) and apply the profile's limits."""
+        if not self.cgroup_parent:
+            return []
+        problem = usable_cgroup(self.cgroup_parent)
+        if problem:
+            return [f"cgroup limits disabled: {problem}"]
+        path = os.path.join(self.cgroup_parent, f"vcc-{os.getpid()}-{id(self):x}")
+        try:
+            os.mkdir(path)
+        except OSError as e:
+            return [f"cgroup limits disabled: {e}"]
+        self.cgroup = path
+        return self._write_limits()
+
+    def close(self) -> None:
+        if self.cgroup:
+            try:
+                os.rmdir(self.cgroup)
+            except OSError:
+                pass  # a child is still exiting; the empty cgroup is harmless
+            self.cgroup = ""
+
+    def _write_limits(self) -> list[str]:
+        profile = self.profile
+        if not self.cgroup:
+            return [f"'{profile.label}' caps CPU at {profile.cpu_max:.0%} only with a cgroup"] \
+                if profile.cpu_max else []
+        quota = (f"{int(default_cores() * profile.cpu_max * _CPU_MAX_PERIOD)} {_CPU_MAX_PERIOD}"
+                 if profile.cpu_max else f"max {_CPU_MAX_PERIOD}")
+        warnings = []
+        for name, value in (("cpu.weight", str(profile.cpu_weight)), ("cpu.max", quota)):
+            try:
+                with open(os.path.join(self.cgroup, name), "w", encoding="ascii") as f:
+                    f.write(value)
+            except OSError as e:
+                warnings.append(f"could not set {name}: {e}")
+        return warnings
+
+    def preexec(self):
+        """A ``preexec_fn`` applying the current profile to a new child."""
+        profile = self.profile
+        procs = os.path.join(self.cgroup, "cgroup.procs") if self.cgroup else ""
+
+        def setup():
+            # Errors are ignored: the child must still exec FFmpeg
+            if procs:
+                try:
+                    with open(procs, "w", encoding="ascii") as f:
+                        f.write("0")
+                except OSError:
+                    pass
+            if profile.nice:
+                try:
+                    os.setpriority(os.PRIO_PROCESS, 0, profile.nice)
+                except OSError:
+                    pass
+            if profile.ionice_class:
+                try:
+                    set_ioprio(0, profile.ionice_class, profile.ionice_level)
+                except OSError:
+                    pass
+
+        return setup if procs or profile.nice or profile.ionice_class else None
+
+    def switch(self, profile: str, pids: list[int]) -> list[str]:
+        """Make *profile* current and apply it to the running *pids*."""
+        with self._lock:
+            self.profile = PROFILES.get(profile, self.profile)
+            p = self.profile
+            warnings = self._write_limits()
+            if not hasattr(os, "setpriority"):
+                return warnings
+            renice_failed = ionice_failed = False
+            for pid in pids:
+                for tid in _threads_of(pid):
+                    try:
+                        os.setpriority(os.PRIO_PROCESS, tid, p.nice)
+                    except ProcessLookupError:
+                        continue  # thread exited meanwhile
+                    except OSError:
+                        renice_failed = True
+                    try:
+                        # Class 0 ("none") hands I/O priority back to the nice level
+                        set_ioprio(tid, p.ionice_class, p.ionice_level)
+                    except ProcessLookupError:
+                        pass
+                    except OSError:
+                        ionice_failed = True
+            if renice_failed:
+                warnings.append(f"running jobs keep their nice level (nice {p.nice} needs "
+                                "CAP_SYS_NICE); new jobs use it")
+            if ionice_failed and _syscall is not None:
+                warnings.append("could not change the I/O priority of running jobs")
+            return warnings
@@ -0,0 +1,98 @@
+"""
+Background media probing for VCC.
+
+A small pool of threads runs ffprobe (via the cached ``probe_media``) for
+queued files.  Requests carry a priority so rows the user is looking at
+are probed before the rest of the queue.
+"""
+
+import heapq
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from vcc.core.encoder import find_ffmpeg, probe_media
+
+PRIORITY_VISIBLE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class ProbePool(QObject):
+    """
+    Probes files on worker threads, highest priority (lowest number) first.
+    Emits ``probed(path, info)`` for every finished file; *info* is the
+    ``probe_media`` dict or None if probing failed.
+    """
+
+    probed = pyqtSignal(str, object)
+
+    def __init__(self, workers: int = 4, parent=None):
+        super().__init__(parent)
+        self._ffmpeg_path = find_ffmpeg()
+        self._heap: list[tuple[int, int, str]] = []
+        self._wanted: dict[str, int] = {}  # path -> best queued priority
+        self._done: set[str] = set()
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"vcc-probe-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def request(self, paths: list[str], priority: int = PRIORITY_BACKGROUND) -> None:
+        """Queue *paths* for probing, raising the priority of already queued ones."""
+        with self._cond:
+            added = False
+            for path in paths:
+                if path in self._done or self._wanted.get(path, priority + 1) <= priority:
+                    continue
+                # A re-queued path leaves a stale heap entry; _work skips it
+                self._wanted[path] = priority
+                self._seq += 1
+                heapq.heappush(self._heap, (priority, self._seq, path))
+                added = True
+            if added:
+                self._cond.notify_all()
+
+    def forget(self, paths: list[str] | None = None) -> None:
+        """Drop pending requests (all, or just *paths*) and their done markers."""
+        with self._cond:
+            if paths is None:
+                self._heap.clear()
+                self._wanted.clear()
+                self._done.clear()
+                return
+            for path in paths:
+                self._wanted.pop(path, None)
+                self._done.discard(path)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._cond.notify_all()
+
+    def _next(self) -> str | None:
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                while self._heap:
+                    priority, _seq, path = heapq.heappop(self._heap)
+                    if self._wanted.get(path) == priority:
+                        del self._wanted[path]
+                        self._done.add(path)
+                        return path
+                self._cond.wait()
+
+    def _work(self) -> None:
+        while True:
+            path = self._next()
+            if path is None:
+                return
+            info = probe_media(self._ffmpeg_path, path)
+            if not self._stopped:
+                self.probed.emit(path, info)
@@ -0,0 +1,172 @@
+"""
+Prometheus textfile exporter for VCC.
+
+Periodically writes encoding throughput counters and gauges in the text
+exposition format to a ``.prom`` file for node_exporter's textfile
+collector (``--collector.textfile.directory``).  The file is replaced
+atomically, so the collector never reads a half-written file, and VCC
+itself never opens a network port.
+
+Exported series::
+
+    vcc_jobs_queued                       jobs waiting to start
+    vcc_jobs_running                      jobs currently encoding
+    vcc_jobs_total{state}                 finished jobs (done/failed/skipped/cancelled)
+    vcc_content_seconds_total{codec}      seconds of media encoded
+    vcc_input_bytes_total{codec}          source bytes of finished jobs
+    vcc_output_bytes_total{codec}         output bytes of finished jobs
+    vcc_encode_fps                        aggregate fps of the running encodes
+    vcc_encode_fps_by_codec{codec}        the same, per codec
+    vcc_last_update_timestamp_seconds     when this file was written
+"""
+
+import os
+import time
+import threading
+from collections.abc import Callable
+
+DEFAULT_INTERVAL = 10.0  # seconds between writes
+
+# Counter/gauge declarations in output order: name -> (type, help)
+_SERIES = {
+    "vcc_jobs_queued": ("gauge", "Jobs waiting to start."),
+    "vcc_jobs_running": ("gauge", "Jobs currently encoding."),
+    "vcc_jobs_total": ("counter", "Finished jobs by final state."),
+    "vcc_content_seconds_total": ("counter", "Seconds of media content encoded."),
+    "vcc_input_bytes_total": ("counter", "Source bytes of successfully encoded jobs."),
+    "vcc_output_bytes_total": ("counter", "Output bytes of successfully encoded jobs."),
+    "vcc_encode_fps": ("gauge", "Aggregate frames per second of the running encodes."),
+    "vcc_encode_fps_by_codec": ("gauge", "Frames per second of the running encodes by codec."),
+    "vcc_last_update_timestamp_seconds": ("gauge", "Unix time this file was written."),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusExporter:
+    """
+    Accumulates counters across batches and writes them every *interval*
+    seconds on a daemon thread.
+
+    A running EncoderWorker attaches a snapshot callable returning
+    ``{"queued", "running", "fps", "content_s"}``.  ``fps`` and
+    ``content_s`` map each encoder actually used (a CPU fallback counts
+    under its own name) to its live fps and to the content encoded so far
+    in that batch, including the progress of running jobs, so throughput
+    moves while a long encode is running.
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._content: dict[str, float] = {}        # codec -> seconds of detached batches
+        self._bytes_in: dict[str, int] = {}
+        self._bytes_out: dict[str, int] = {}
+        self._jobs: dict[str, int] = {}             # final state -> count
+        self._source: Callable[[], dict] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # -- lifecycle ------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="vcc-prom", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread after one last write."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def _loop(self) -> None:
+        while True:
+            self.write()
+            if self._stop.wait(self.interval):
+                return
+
+    # -- worker hooks ---------------------------------------------------
+    def attach(self, source: Callable[[], dict]) -> None:
+        with self._lock:
+            self._source = source
+
+    def detach(self) -> None:
+        """Fold the attached batch's content total into the counters and detach it."""
+        with self._lock:
+            source, self._source = self._source, None
+            if source is not None:
+                snap = source()
+                for codec, seconds in snap["content_s"].items():
+                    self._content[codec] = self._content.get(codec, 0.0) + seconds
+        self.write()
+
+    def job_finished(self, codec: str, state: str, bytes_in: int = 0, bytes_out: int = 0) -> None:
+        with self._lock:
+            self._jobs[state] = self._jobs.get(state, 0) + 1
+            if bytes_in or bytes_out:
+                self._bytes_in[codec] = self._bytes_in.get(codec, 0) + bytes_in
+                self._bytes_out[codec] = self._bytes_out.get(codec, 0) + bytes_out
+
+    # -- output -----------------------------------------------------------
+    def render(self) -> str:
+        with self._lock:
+            snap = self._source() if self._source is not None else None
+            content = dict(self._content)
+            bytes_in = dict(self._bytes_in)
+            bytes_out = dict(self._bytes_out)
+            jobs = dict(self._jobs)
+        fps_by_codec = {}
+        if snap is not None:
+            for codec, seconds in snap["content_s"].items():
+                content[codec] = content.get(codec, 0.0) + seconds
+            fps_by_codec = dict(snap["fps"])
+
+        samples: dict[str, list[tuple[str, float]]] = {
+            "vcc_jobs_queued": [("", snap["queued"] if snap else 0)],
+            "vcc_jobs_running": [("", snap["running"] if snap else 0)],
+            "vcc_jobs_total": [(f'state="{_escape(s)}"', n) for s, n in sorted(jobs.items())],
+            "vcc_content_seconds_total": [(f'codec="{_escape(c)}"', round(v, 3))
+                                          for c, v in sorted(content.items())],
+            "vcc_input_bytes_total": [(f'codec="{_escape(c)}"', v) for c, v in sorted(bytes_in.items())],
+            "vcc_output_bytes_total": [(f'codec="{_escape(c)}"', v) for c, v in sorted(bytes_out.items())],
+            "vcc_encode_fps": [("", round(sum(fps_by_codec.values()), 2))],
+            "vcc_encode_fps_by_codec": [(f'codec="{_escape(c)}"', round(v, 2))
+                                        for c, v in sorted(fps_by_codec.items())],
+            "vcc_last_update_timestamp_seconds": [("", round(time.time(), 3))],
+        }
+        lines = []
+        for name, (kind, help_text) in _SERIES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples[name]:
+                series = f"{name}{{{labels}}}" if labels else name
+                lines.append(f"{series} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Atomically replace the .prom file with the current values."""
+        text = self.render()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except OSError:
+            # Monitoring must never break an encode; try again next interval
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,154 @@
+"""
+Failure classification, retries and CPU fallback for VCC encodes.
+
+When FFmpeg exits non-zero the encoder worker classifies the failure
+from its exit code and the last lines of its output:
+
+* ``hardware``  - the GPU encoder or its driver failed (NVENC session
+  limit, CUDA errors, a lost device, QSV/AMF initialisation)
+* ``transient`` - I/O hiccups, a network share going away, the process
+  killed by the OOM killer
+* ``crash``     - FFmpeg died from a signal other than SIGKILL
+* ``input``     - the source is missing or unreadable
+* ``config``    - an option, pixel format or stream the encoder rejects
+* ``disk``      - the output filesystem is full or read-only
+* ``unknown``   - anything else
+
+Hardware, transient and crash failures are retried after an exponential
+backoff (RetryPolicy).  A job whose GPU encoder failed with a hardware
+error repeatedly is re-run on the closest CPU encoder from CODECS
+(cpu_equivalent()), with its quality and preset moved to the same place on
+the CPU encoder's scales.  The others fail at once: running the same
+command again would fail the same way.
+"""
+
+import re
+import signal
+from dataclasses import dataclass
+
+from vcc.core.codecs import CODECS
+
+FAILURE_HARDWARE = "hardware"
+FAILURE_TRANSIENT = "transient"
+FAILURE_CRASH = "crash"
+FAILURE_INPUT = "input"
+FAILURE_CONFIG = "config"
+FAILURE_DISK = "disk"
+FAILURE_UNKNOWN = "unknown"
+
+# Tried in this order over the whole log tail: GPU errors often come with a
+# generic "Error while opening encoder" line that would read as a config problem
+_PATTERNS = (
+    (FAILURE_HARDWARE, re.compile(
+        r"OpenEncodeSessionEx failed|No (NVENC )?capable devices found|CUDA_ERROR|"
+        r"Cannot load (libcuda|nvcuda|libnvidia-encode|nvEncodeAPI)|Device creation failed|"
+        r"MFX_ERR_|internal MFX session|Failed to initiali[sz]e (VAAPI|AMF)|AMF failed|"
+        r"AMF_(FAIL|NO_DEVICE)|GPU (hang|lost)|device (lost|removed)", re.IGNORECASE)),
+    (FAILURE_DISK, re.compile(
+        r"No space left on device|Disk quota exceeded|Read-only file system", re.IGNORECASE)),
+    (FAILURE_INPUT, re.compile(
+        r"Invalid data found when processing input|No such file or directory|"
+        r"moov atom not found|Could not find codec parameters|does not contain any stream",
+        re.IGNORECASE)),
+    (FAILURE_TRANSIENT, re.compile(
+        r"Resource temporarily unavailable|Input/output error|Connection (reset|refused|timed out)|"
+        r"Broken pipe|Stale file handle|Cannot allocate memory", re.IGNORECASE)),
+    (FAILURE_CONFIG, re.compile(
+        r"Unrecognized option|Option \S+ not found|Unknown encoder|Error setting option|"
+        r"Error (initializing|while opening) (output stream|encoder)|Incompatible pixel format|"
+        r"not supported|Invalid argument|Subtitle encoding currently only possible|"
+        r"Could not write header", re.IGNORECASE)),
+)
+
+RETRYABLE = frozenset({FAILURE_HARDWARE, FAILURE_TRANSIENT, FAILURE_CRASH})
+
+# Windows reports crashes as NTSTATUS exit codes (0xC0000005 access violation, ...)
+_NTSTATUS_ERROR = 0xC0000000
+
+
+def classify_failure(returncode: int, log: list[str]) -> tuple[str, str]:
+    """(failure kind, the FFmpeg line that explains it) for a non-zero exit."""
+    for kind, pattern in _PATTERNS:
+        for line in reversed(log):
+            if pattern.search(line):
+                return kind, line.strip()
+    if returncode < 0:
+        if returncode == -getattr(signal, "SIGKILL", 9):
+            return FAILURE_TRANSIENT, "killed (out of memory?)"
+        return FAILURE_CRASH, f"terminated by signal {-returncode}"
+    if returncode >= _NTSTATUS_ERROR:
+        return FAILURE_CRASH, f"crashed (0x{returncode:08X})"
+    last = next((line.strip() for line in reversed(log)
+                 if line.strip() and line.strip() != "Conversion failed!"), "")
+    return FAILURE_UNKNOWN, last
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how soon failed encodes are run again."""
+
+    retries: int = 2              # extra runs per job after failures (0 = never retry)
+    backoff: float = 5.0          # seconds before the first retry
+    factor: float = 3.0           # backoff growth per further retry
+    max_backoff: float = 120.0
+    fallback_after: int = 2       # hardware failures before switching to the CPU encoder
+
+    def should_retry(self, kind: str, retries_done: int) -> bool:
+        return kind in RETRYABLE and retries_done < self.retries
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number *retry* (1-based)."""
+        return min(self.max_backoff, self.backoff * self.factor ** (retry - 1))
+
+
+# Closest CPU encoder per GPU codec family
+_CPU_EQUIVALENT = {"H.264": "libx264", "H.265": "libx265", "AV1": "libsvtav1"}
+
+# GPU surface formats and their software counterparts
+_CPU_PIX_FMTS = {"nv12": "yuv420p", "p010le": "yuv420p10le", "p010": "yuv420p10le",
+                 "cuda": "", "qsv": "", "d3d11": ""}
+
+
+def cpu_equivalent(gpu, params: dict[str, str]) -> tuple[str, dict[str, str]]:
+    """("CPU encoder", its params) replacing GPU encoder *gpu* run with *params*.
+
+    Quality and preset keep their relative position: CQ 28 of 0-51 stays
+    CRF 28 on x264/x265 and becomes CRF 35 on SVT-AV1's 0-63 scale, and
+    NVENC's slowest preset p7 becomes x264's ``veryslow``.  ("", {}) if
+    there is no CPU encoder for the codec family.
+    """
+    codec = _CPU_EQUIVALENT.get(gpu.codec_family, "")
+    if codec not in CODECS:
+        return "", {}
+    defs = CODECS[codec]["params"]
+    mapped = {}
+
+    quality = str(params.get(gpu.quality_param, "")).strip()
+    crf = defs.get("crf")
+    if quality and crf is not None:
+        try:
+            pos = (float(quality) - gpu.quality_min) / max(1, gpu.quality_max - gpu.quality_min)
+        except ValueError:
+            pos = None
+        if pos is not None:
+            pos = min(1.0, max(0.0, pos))
+            mapped["crf"] = str(round(crf["min"] + pos * (crf["max"] - crf["min"])))
+
+    preset = defs.get("preset")
+    value = str(params.get(gpu.preset_key, gpu.preset_default))
+    choices = [str(v) for v in gpu.preset_values]
+    if preset is not None and value in choices:
+        slowness = choices.index(value) / max(1, len(choices) - 1)  # GPU lists go fast -> slow
+        if preset["type"] == "choice":
+            options = [c for c in preset["choices"] if c and c != "placebo"]
+            mapped["preset"] = options[round(slowness * (len(options) - 1))]
+        else:
+            # SVT-AV1 style: a lower number is slower
+            lo, hi = preset["min"], preset["max"]
+            mapped["preset"] = str(round(hi - slowness * (hi - lo)))
+    return codec, mapped
+
+
+def cpu_pix_fmt(pix_fmt: str) -> str:
+    """*pix_fmt* as a CPU encoder accepts it (GPU surface formats translated)."""
+    return _CPU_PIX_FMTS.get(pix_fmt.strip(), pix_fmt)
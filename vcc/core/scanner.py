@@ -0,0 +1,154 @@
+"""
+Background directory scanner for VCC.
+
+Walks directory trees with ``os.scandir`` on a worker thread and streams
+matching video files to the UI in batches, so adding a huge tree (e.g. a
+NAS share) never blocks the GUI.
+"""
+
+import os
+import stat
+import time
+import fnmatch
+from collections.abc import Callable, Iterable, Iterator
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+VIDEO_EXTENSIONS = {".mkv", ".mp4", ".avi", ".mov", ".m4v", ".webm",
+                    ".ts", ".flv", ".wmv", ".mpg", ".mpeg"}
+
+# Folders commonly found on NAS shares and system drives that never hold
+# user videos; used as the default exclusion list.
+DEFAULT_EXCLUDES = ["@eaDir", "#recycle", "$RECYCLE.BIN", "System Volume Information"]
+
+
+def _is_hidden(entry: os.DirEntry) -> bool:
+    if entry.name.startswith("."):
+        return True
+    if os.name == "nt":
+        try:
+            attrs = entry.stat(follow_symlinks=False).st_file_attributes
+        except OSError:
+            return False
+        return bool(attrs & stat.FILE_ATTRIBUTE_HIDDEN)
+    return False
+
+
+def iter_video_files(
+    root: str,
+    extensions: Iterable[str] = VIDEO_EXTENSIONS,
+    skip_hidden: bool = False,
+    exclude: Iterable[str] = (),
+    cancelled: Callable[[], bool] = lambda: False,
+    counter: list[int] | None = None,
+    progress: Callable[[], None] | None = None,
+) -> Iterator[str]:
+    """Yield video files under *root* in ``os.walk`` order, sorted per directory.
+
+    *exclude* holds ``fnmatch`` patterns matched against directory names.
+    Unreadable directories are skipped.  *counter*, if given, has its first
+    element incremented for every directory entry examined.  *progress*,
+    if given, is called after every directory read, so callers can report
+    on trees that hold few or no matches.
+    """
+    exts = {e.lower() for e in extensions}
+    patterns = [p.lower() for p in exclude if p]
+    stack = [root]
+    while stack:
+        if cancelled():
+            return
+        top = stack.pop()
+        try:
+            with os.scandir(top) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        if counter is not None:
+            counter[0] += len(entries)
+        if progress is not None:
+            progress()
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if skip_hidden and _is_hidden(entry):
+                    continue
+                name = entry.name.lower()
+                if any(fnmatch.fnmatchcase(name, p) for p in patterns):
+                    continue
+                subdirs.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in exts:
+                if skip_hidden and _is_hidden(entry):
+                    continue
+                yield entry.path
+        # Depth-first, visiting subdirectories in sorted order like os.walk
+        stack.extend(reversed(subdirs))
+
+
+class DirectoryScanner(QThread):
+    """
+    Scans one or more directories in the background.
+    Emits matches in batches plus periodic progress (files found, files/s, entries/s).
+    """
+
+    files_found = pyqtSignal(list)          # batch of file paths
+    scan_progress = pyqtSignal(int, float, float)  # files found so far, files/s, entries scanned/s
+    scan_done = pyqtSignal(int, bool)       # total files found, cancelled
+
+    BATCH_SIZE = 500
+    BATCH_INTERVAL = 0.1  # seconds; flush smaller batches so results appear promptly
+
+    def __init__(
+        self,
+        roots: list[str],
+        extensions: Iterable[str] = VIDEO_EXTENSIONS,
+        skip_hidden: bool = False,
+        exclude: Iterable[str] = (),
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.roots = roots
+        self.extensions = set(extensions)
+        self.skip_hidden = skip_hidden
+        self.exclude = list(exclude)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        found = 0
+        scanned = [0]
+        batch: list[str] = []
+        start = last_flush = time.monotonic()
+
+        def flush():
+            nonlocal batch, last_flush
+            if batch:
+                self.files_found.emit(batch)
+                batch = []
+            last_flush = time.monotonic()
+            elapsed = max(last_flush - start, 1e-6)
+            self.scan_progress.emit(found, found / elapsed, scanned[0] / elapsed)
+
+        def tick():
+            # Keep reporting while walking directories without any matches
+            if time.monotonic() - last_flush >= self.BATCH_INTERVAL:
+                flush()
+
+        for root in self.roots:
+            for path in iter_video_files(root, self.extensions, self.skip_hidden,
+                                         self.exclude, lambda: self._cancelled, scanned, tick):
+                batch.append(path)
+                found += 1
+                if (len(batch) >= self.BATCH_SIZE
+                        or time.monotonic() - last_flush >= self.BATCH_INTERVAL):
+                    flush()
+            if self._cancelled:
+                break
+        flush()
+        self.scan_done.emit(found, self._cancelled)
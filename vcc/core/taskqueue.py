@@ -0,0 +1,102 @@
+"""
+Priority-ordered pending tasks for the VCC encoder worker.
+
+Tasks wait in one FIFO per job priority (see vcc.core.jobs.JobPriority)
+and the scheduler takes the first task of the highest priority whose job
+is not paused.  Within a priority, continuations of started jobs (second
+passes, corrective re-encodes) come first so started work is finished
+and its passlogs are consumed promptly; the other tasks follow the queue
+order, which can be changed with reorder().  Priorities and order change
+from the GUI thread while the scheduler thread takes tasks, so every
+operation holds a lock.
+"""
+
+import threading
+from collections import deque
+
+
+class TaskQueue:
+    """Pending tasks (objects with ``idx``, ``job.priority`` and ``continuation``)."""
+
+    def __init__(self):
+        self._levels: dict[int, deque] = {}   # priority -> tasks in start order
+        self._level_of: dict[int, int] = {}   # job index -> priority it is queued at
+        self._rank: dict[int, int] = {}       # job index -> position in the queue order
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._level_of)
+
+    def __bool__(self) -> bool:
+        return bool(self._level_of)
+
+    def __iter__(self):
+        """A snapshot of the queued tasks in start order."""
+        with self._lock:
+            return iter([t for p in sorted(self._levels, reverse=True) for t in self._levels[p]])
+
+    def _key(self, task) -> tuple[bool, int]:
+        return not task.continuation, self._rank.get(task.idx, task.idx)
+
+    def _insert(self, task, priority: int) -> None:
+        level = self._levels.setdefault(priority, deque())
+        key = self._key(task)
+        self._level_of[task.idx] = priority
+        if not level or self._key(level[-1]) <= key:
+            level.append(task)  # the common case: queued in order
+            return
+        for i, other in enumerate(level):
+            if key < self._key(other):
+                level.insert(i, task)
+                return
+
+    def _take(self, idx: int):
+        priority = self._level_of.pop(idx)
+        level = self._levels[priority]
+        task = next(t for t in level if t.idx == idx)
+        level.remove(task)
+        if not level:
+            del self._levels[priority]
+        return task
+
+    def push(self, task) -> None:
+        with self._lock:
+            self._insert(task, task.job.priority)
+
+    def first(self, skip=()):
+        """The next task to start, passing over job indexes in *skip*; None if none."""
+        with self._lock:
+            for priority in sorted(self._levels, reverse=True):
+                for task in self._levels[priority]:
+                    if task.idx not in skip:
+                        return task
+        return None
+
+    def remove(self, task) -> None:
+        with self._lock:
+            if task.idx in self._level_of:
+                self._take(task.idx)
+
+    def reprioritize(self, idx: int, priority: int) -> bool:
+        """Move job *idx*'s queued task to *priority*; False if it is not queued."""
+        with self._lock:
+            if idx not in self._level_of:
+                return False
+            if self._level_of[idx] != priority:
+                self._insert(self._take(idx), priority)
+            return True
+
+    def reorder(self, order: list[int]) -> None:
+        """Make *order* (job indexes) the queue order; unlisted jobs keep their index."""
+        with self._lock:
+            self._rank = {idx: rank - len(order) for rank, idx in enumerate(order)}
+            for priority, level in self._levels.items():
+                self._levels[priority] = deque(sorted(level, key=self._key))
+
+    def clear(self) -> list:
+        """Remove and return every queued task."""
+        with self._lock:
+            tasks = [t for p in sorted(self._levels, reverse=True) for t in self._levels[p]]
+            self._levels.clear()
+            self._level_of.clear()
+        return tasks
@@ -0,0 +1,110 @@
+"""
+Thread budgeting for concurrent encodes.
+
+Left alone, every libx265, SVT-AV1 or libaom process sizes its thread
+pools for the whole machine, so four parallel encodes on 16 cores run
+~4x oversubscribed and spend their time context switching.  The
+ThreadBudget splits a core budget between the jobs a worker runs at once
+and the helpers here turn a job's share into the controls each encoder
+understands:
+
+* ``-threads`` before ``-i`` (decoder) and after ``-c:v`` (encoder),
+  plus ``-filter_threads`` for the crop/scale chain;
+* libx265: ``pools=N`` in ``-x265-params``;
+* SVT-AV1: ``lp=N`` in ``-svtav1-params``;
+* libaom-av1 / libvpx-vp9: ``-row-mt 1`` and ``-tile-columns`` so the
+  threads have independent work.
+
+FFmpeg cannot change a running encoder's threads, so rebalancing happens
+at job starts: each start is granted a fair share of the cores for the
+jobs that will be running alongside it, or more when cores are left idle
+(e.g. when fewer files than slots remain).  A job that would get every
+core runs with FFmpeg's own defaults.
+"""
+
+import os
+import threading
+
+# Encoders that take a thread count in a colon-separated parameter string
+_PARAM_STRINGS = {
+    "libx265": ("-x265-params", "pools"),
+    "libsvtav1": ("-svtav1-params", "lp"),
+}
+# Encoders that need row multithreading and tiles to use their threads
+_TILED = ("libaom-av1", "libvpx-vp9")
+# Narrowest tile column libvpx allows, in pixels
+_MIN_TILE_WIDTH = 256
+_MAX_LOG2_TILE_COLUMNS = 6
+
+
+def default_cores() -> int:
+    """CPUs this process may run on (respects taskset / cgroup cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def tile_columns_log2(threads: int, width: int) -> int:
+    """log2 of the tile columns worth using for *threads* at frame *width*."""
+    columns = max(1, min(threads, width // _MIN_TILE_WIDTH))
+    return min(columns.bit_length() - 1, _MAX_LOG2_TILE_COLUMNS)
+
+
+def encoder_thread_options(codec: str, threads: int, width: int) -> list[str]:
+    """Output options that limit *codec* to about *threads* threads."""
+    if codec in _PARAM_STRINGS:
+        return []  # see param_string_item()
+    opts = ["-threads", str(threads)]
+    if codec in _TILED:
+        opts += ["-row-mt", "1", "-tile-columns", str(tile_columns_log2(threads, width))]
+    return opts
+
+
+def param_string_item(codec: str, threads: int) -> tuple[str, str] | None:
+    """``(option, "key=value")`` to merge into *codec*'s parameter string, if it has one."""
+    if codec not in _PARAM_STRINGS:
+        return None
+    option, key = _PARAM_STRINGS[codec]
+    return option, f"{key}={threads}"
+
+
+class ThreadBudget:
+    """
+    Hands out shares of *cores* to the jobs of one worker.
+
+    Called from the worker's scheduler thread when a job starts and when
+    it finishes; thread-safe so other threads may read the allocation.
+    """
+
+    def __init__(self, cores: int = 0, slots: int = 1):
+        self.cores = cores if cores > 0 else default_cores()
+        self.slots = max(1, slots)
+        self._machine = default_cores()
+        self._alloc: dict[int, int] = {}  # job index -> threads granted
+        self._lock = threading.Lock()
+
+    def acquire(self, idx: int, waiting: int) -> int:
+        """Grant threads to job *idx*; *waiting* jobs are queued behind it.
+
+        Returns 0 when the grant covers the whole machine, meaning the
+        job should keep FFmpeg's default threading.
+        """
+        with self._lock:
+            running = len(self._alloc)
+            concurrent = min(self.slots, running + 1 + waiting)
+            fair = self.cores // concurrent
+            # Cores that running jobs do not hold, shared with the other jobs
+            # that can start right now
+            free = self.cores - sum(self._alloc.values())
+            starting = min(self.slots - running, 1 + waiting)
+            threads = max(1, fair, free // max(1, starting))
+            self._alloc[idx] = threads
+        return threads if threads < self._machine else 0
+
+    def release(self, idx: int) -> None:
+        with self._lock:
+            self._alloc.pop(idx, None)
+
+    def allocation(self) -> dict[int, int]:
+        with self._lock:
+            return dict(self._alloc)
@@ -0,0 +1,118 @@
+"""
+Batch timeline tracing for VCC.
+
+The encoder worker records a span for every stage of every job on the
+worker slot ("lane") that ran it: probing, each FFmpeg pass and the
+post-processing done after it (target-size check, passlog cleanup,
+metrics), plus the time each job waited in the queue.  The recording is
+exported in the Chrome trace event format, which chrome://tracing and
+https://ui.perfetto.dev open directly; gaps where a slot had nothing to
+do are added as explicit "idle" spans so utilization problems stand out.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Ignore idle gaps shorter than this (scheduling noise), in seconds
+MIN_IDLE = 0.005
+
+TRACE_FILTER = "Chrome Trace (*.json);;All Files (*.*)"
+
+
+class TraceRecorder:
+    """Thread-safe collection of timeline spans for one batch.
+
+    Times are ``time.time()`` stamps, like the Job timestamps.
+    """
+
+    def __init__(self, name: str = "VCC batch"):
+        self.name = name
+        self.start = time.time()
+        self.end = 0.0
+        self.lanes = 0
+        self._spans: list[tuple[int, str, str, float, float, dict]] = []  # lane, name, cat, t0, t1, args
+        self._waits: list[tuple[int, str, float, float]] = []  # job idx, file, queued, started
+        self._lock = threading.Lock()
+
+    def begin(self, lanes: int) -> None:
+        """Start a new recording for a batch using *lanes* worker slots."""
+        with self._lock:
+            self._spans.clear()
+            self._waits.clear()
+        self.lanes = lanes
+        self.start = time.time()
+        self.end = 0.0
+
+    def finish(self) -> None:
+        self.end = time.time()
+
+    def add(self, lane: int, name: str, cat: str, t0: float, t1: float, **args) -> None:
+        with self._lock:
+            self._spans.append((lane, name, cat, t0, t1, args))
+
+    @contextmanager
+    def span(self, lane: int, name: str, cat: str, **args):
+        """Record the duration of the ``with`` block; the block may add to *args*."""
+        t0 = time.time()
+        try:
+            yield args
+        finally:
+            self.add(lane, name, cat, t0, time.time(), **args)
+
+    def queue_wait(self, idx: int, filename: str, queued_at: float, started_at: float) -> None:
+        with self._lock:
+            self._waits.append((idx, filename, queued_at, started_at))
+
+    def __bool__(self) -> bool:
+        return bool(self._spans or self._waits)
+
+    def _us(self, t: float) -> float:
+        return round((t - self.start) * 1e6, 1)
+
+    def to_chrome(self) -> dict:
+        """Return the recording as a Chrome trace event document."""
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: (s[0], s[3]))
+            waits = list(self._waits)
+        end = self.end or time.time()
+        pid = 1
+        events = [
+            {"ph": "M", "pid": pid, "name": "process_name", "args": {"name": self.name}},
+            {"ph": "M", "pid": pid, "tid": 0, "name": "thread_name", "args": {"name": "Queue"}},
+        ]
+        for lane in range(self.lanes):
+            events.append({"ph": "M", "pid": pid, "tid": lane + 1, "name": "thread_name",
+                           "args": {"name": f"Slot {lane + 1}"}})
+            events.append({"ph": "M", "pid": pid, "tid": lane + 1, "name": "thread_sort_index",
+                           "args": {"sort_index": lane + 1}})
+
+        busy_until = {lane: self.start for lane in range(self.lanes)}
+        for lane, name, cat, t0, t1, args in spans:
+            if t0 - busy_until.get(lane, t0) >= MIN_IDLE:
+                events.append(self._complete(lane, "idle", "idle", busy_until[lane], t0, {}))
+            busy_until[lane] = max(busy_until.get(lane, t1), t1)
+            events.append(self._complete(lane, name, cat, t0, t1, args))
+        for lane, last in busy_until.items():
+            if end - last >= MIN_IDLE:
+                events.append(self._complete(lane, "idle", "idle", last, end, {}))
+
+        # Queue waits overlap each other, so they are async spans keyed by job
+        for idx, filename, queued, started in waits:
+            common = {"pid": pid, "tid": 0, "cat": "queue", "name": "queue wait", "id": idx}
+            events.append({**common, "ph": "b", "ts": self._us(queued), "args": {"file": filename}})
+            events.append({**common, "ph": "e", "ts": self._us(started)})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"start": self.start, "lanes": self.lanes}}
+
+    def _complete(self, lane: int, name: str, cat: str, t0: float, t1: float, args: dict) -> dict:
+        return {"ph": "X", "pid": 1, "tid": lane + 1, "name": name, "cat": cat,
+                "ts": self._us(t0), "dur": round(max(0.0, t1 - t0) * 1e6, 1), "args": args}
+
+    def write(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f, separators=(",", ":"))
+        os.replace(tmp, path)
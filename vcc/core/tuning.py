@@ -0,0 +1,105 @@
+"""
+Stored parallelism tuning for VCC.
+
+The auto-tuner (vcc.core.autotune) measures which split between parallel
+jobs and threads per job gives the most content-seconds per wall-second
+for a codec on this machine, and records the winner here per codec and
+output resolution band in ``~/.vcc_tuning.json``::
+
+    {"version": 1,
+     "configs": {"libx265@1080p": {"jobs": 4, "threads": 4, "cores": 16,
+                                   "throughput": 3.2, "preset": "medium", ...}}}
+
+When Parallel jobs is set to Auto (``max_jobs=0`` / ``-j auto``) the
+encoder worker looks the batch's codec and output size up here.  Entries
+measured with a different number of usable cores are ignored.
+"""
+
+import os
+import json
+
+from vcc.core.threads import default_cores
+
+TUNING_VERSION = 1
+
+# (band, largest short side in pixels); anything larger is "8K"
+RESOLUTION_BANDS = (
+    ("sd", 576),
+    ("720p", 720),
+    ("1080p", 1080),
+    ("1440p", 1440),
+    ("4K", 2160),
+)
+
+# Most parallel jobs the calibration tries
+MAX_CALIBRATION_JOBS = 16
+
+
+def default_tuning_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".vcc_tuning.json")
+
+
+def resolution_band(width: int, height: int) -> str:
+    """Band name for an output of *width* x *height* (portrait or landscape)."""
+    short = min(width, height)
+    for band, limit in RESOLUTION_BANDS:
+        if short <= limit:
+            return band
+    return "8K"
+
+
+def tuning_key(codec: str, width: int, height: int) -> str:
+    return f"{codec}@{resolution_band(width, height)}"
+
+
+def candidate_splits(cores: int) -> list[tuple[int, int]]:
+    """(jobs, threads per job) pairs that divide *cores* between parallel jobs.
+
+    Job counts are the powers of two up to *cores*, plus *cores* itself.
+    """
+    counts = {1}
+    n = 2
+    while n <= min(cores, MAX_CALIBRATION_JOBS):
+        counts.add(n)
+        n *= 2
+    if cores <= MAX_CALIBRATION_JOBS:
+        counts.add(cores)
+    return [(jobs, max(1, cores // jobs)) for jobs in sorted(counts)]
+
+
+def load_tuning(path: str = "") -> dict:
+    """The stored configurations, ``{key: entry}``; empty if missing or unreadable."""
+    try:
+        with open(path or default_tuning_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != TUNING_VERSION:
+        return {}
+    configs = data.get("configs")
+    return configs if isinstance(configs, dict) else {}
+
+
+def save_tuning(key: str, entry: dict, path: str = "") -> str:
+    """Store *entry* under *key*, keeping the other entries; return the file path."""
+    path = path or default_tuning_path()
+    configs = load_tuning(path)
+    configs[key] = entry
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": TUNING_VERSION, "configs": configs}, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    return path
+
+
+def lookup_tuning(codec: str, width: int, height: int, path: str = "") -> dict | None:
+    """The stored configuration for *codec* at this output size, if it fits this machine."""
+    entry = load_tuning(path).get(tuning_key(codec, width, height))
+    if not isinstance(entry, dict) or entry.get("cores") != default_cores():
+        return None
+    try:
+        if int(entry["jobs"]) < 1 or int(entry["threads"]) < 1:
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+    return entry
@@ -159,6 +159,15 @@ uses <b>target bitrate mode</b> instead.</p>
 <li><b>Target Bitrate mode</b>: When you select a specific bitrate, the encoder aims for that
     exact data rate. Quality may vary scene-to-scene, but the file size is more predictable.
     This is common for streaming and bandwidth-constrained scenarios.</li>
+<li><b>Two-pass</b>: In target bitrate mode, H.264 (x264), H.265 (x265), VP9 and AV1 (libaom)
+    can encode in two passes. The first pass analyses the whole video; the second pass uses that
+    analysis to spend bits where they matter, hitting the target bitrate far more accurately.
+    First passes are fast, so with <b>Parallel jobs</b> above 1 they run alongside other
+    files&rsquo; second passes.</li>
+<li><b>Target Size</b>: Enter a size budget per file (e.g. an upload cap) instead of a bitrate.
+    VCC computes each file&rsquo;s video bitrate from its duration (after trimming) and the audio
+    bitrate, encodes in two passes where supported, then checks the result. Only an output that
+    misses the target by more than the tolerance is re-encoded, reusing the first-pass analysis.</li>
 </ul>
 
 <h3>Bitrate vs Resolution Guidelines</h3>
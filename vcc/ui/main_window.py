@@ -4,25 +4,45 @@ Main window for Video Codec Converter (VCC).
 
 import os
 import json
+import tempfile
 from configparser import ConfigParser
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QScrollArea,
     QLabel, QPushButton, QComboBox, QSpinBox, QDoubleSpinBox, QLineEdit,
     QGroupBox, QFileDialog, QMessageBox, QMenuBar, QMenu,
-    QProgressBar, QSplitter, QListWidget, QAbstractItemView,
-    QToolButton, QSizePolicy, QCheckBox, QApplication, QListWidgetItem,
+    QProgressBar, QSplitter, QTableView, QHeaderView, QAbstractItemView,
+    QToolButton, QSizePolicy, QCheckBox, QApplication,
     QDialog, QTimeEdit, QDialogButtonBox, QFormLayout, QInputDialog,
 )
-from PyQt6.QtCore import Qt, QSize, QEvent, QSettings, QTime, QMimeData, QUrl
-from PyQt6.QtGui import QAction, QFont, QIcon, QDragEnterEvent, QDropEvent
+from PyQt6.QtCore import Qt, QSize, QEvent, QSettings, QTime, QTimer, QMimeData, QUrl
+from PyQt6.QtGui import QAction, QActionGroup, QFont, QIcon, QDragEnterEvent, QDropEvent
 
 from vcc.core.codecs import CODECS
 from vcc.core.pixel_formats import PIXEL_FORMATS, query_encoder_pix_fmts
-from vcc.core.encoder import EncoderWorker, detect_crop, find_ffmpeg
+from vcc.core.encoder import PAUSE_SUPPORTED, EncoderWorker, detect_crop, find_ffmpeg
+from vcc.core.scanner import DirectoryScanner, VIDEO_EXTENSIONS, DEFAULT_EXCLUDES
+from vcc.core.prober import ProbePool, PRIORITY_VISIBLE
+from vcc.core.jobs import Job, JobPriority, JobState
+from vcc.core.metrics import default_metrics_dir
+from vcc.core.prometheus import PrometheusExporter
+from vcc.core.trace import TRACE_FILTER, TraceRecorder
+from vcc.core.manifest import MANIFEST_FILTER, ManifestLoader, write_manifest
+from vcc.core.analyzer import BottleneckAnalyzer
+from vcc.core.autotune import AutoTuner
+from vcc.core.preflight import PreflightChecker
+from vcc.core.affinity import PINNING_SUPPORTED
+from vcc.core.priority import CGROUP_ENV, DEFAULT_PROFILE, PROFILES, usable_cgroup
+from vcc.core.retry import RetryPolicy
+from vcc.core.benchmark import (
+    BenchmarkWorker, BENCH_SOURCES, BENCH_RESOLUTIONS, default_results_dir,
+)
 from vcc.core.gpu_detect import (
     probe_available_gpu_encoders, get_gpu_encoder, is_gpu_encoder, GpuEncoder,
 )
 from vcc.ui.terminal_widget import TerminalWidget
+from vcc.ui.queue_model import (
+    FileQueueModel, QueueFilterProxy, FILTER_HELP, COL_NUM, COL_FILE, COL_CODEC,
+)
 from vcc.ui.help_dialogs import (
     CodecHelpDialog, PixelFormatHelpDialog, AudioHelpDialog,
     ResolutionHelpDialog, FPSHelpDialog, BitrateHelpDialog, AboutDialog,
@@ -288,6 +308,85 @@ class CropDialog(QDialog):
             self._lbl_status.setStyleSheet("color: #c62828; font-style: italic;")
 
 
+# ---------------------------------------------------------------------------
+# Benchmark Dialog
+# ---------------------------------------------------------------------------
+class BenchmarkDialog(QDialog):
+    """Dialog for choosing the synthetic sources and resolutions to benchmark."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Encoder Benchmark")
+        self.setFixedSize(460, 300)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(12)
+
+        lbl = QLabel(
+            "Times every available encoder across its preset range on\n"
+            "deterministic synthetic sources. Results are saved as JSON and CSV."
+        )
+        lbl.setWordWrap(True)
+        layout.addWidget(lbl)
+
+        form = QFormLayout()
+        form.setSpacing(8)
+
+        src_row = QHBoxLayout()
+        self._chk_sources = {}
+        for name in BENCH_SOURCES:
+            chk = QCheckBox(name)
+            chk.setChecked(name == "testsrc2")
+            self._chk_sources[name] = chk
+            src_row.addWidget(chk)
+        src_row.addStretch()
+        form.addRow("Sources:", src_row)
+
+        res_row = QHBoxLayout()
+        self._chk_resolutions = {}
+        for name in BENCH_RESOLUTIONS:
+            chk = QCheckBox(name)
+            chk.setChecked(name == "1080p")
+            self._chk_resolutions[name] = chk
+            res_row.addWidget(chk)
+        res_row.addStretch()
+        form.addRow("Resolutions:", res_row)
+
+        self._spn_seconds = NoScrollSpinBox()
+        self._spn_seconds.setRange(1, 60)
+        self._spn_seconds.setValue(5)
+        self._spn_seconds.setSuffix(" s")
+        self._spn_seconds.setFixedWidth(80)
+        form.addRow("Sample length:", self._spn_seconds)
+
+        self._chk_quick = QCheckBox("Quick (fastest, middle and slowest preset only)")
+        self._chk_quick.setChecked(True)
+        form.addRow("", self._chk_quick)
+        layout.addLayout(form)
+
+        self._lbl_out = QLabel(f"Results folder: {default_results_dir()}")
+        self._lbl_out.setStyleSheet("color: #888; font-style: italic;")
+        layout.addWidget(self._lbl_out)
+        layout.addStretch()
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Run")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def get_options(self) -> dict:
+        return {
+            "sources": [n for n, c in self._chk_sources.items() if c.isChecked()],
+            "resolutions": [n for n, c in self._chk_resolutions.items() if c.isChecked()],
+            "seconds": self._spn_seconds.value(),
+            "quick": self._chk_quick.isChecked(),
+        }
+
+
 # ---------------------------------------------------------------------------
 # Codec parameter widgets
 # ---------------------------------------------------------------------------
@@ -371,21 +470,28 @@ class MainWindow(QMainWindow):
         self.setAcceptDrops(True)
 
         self._worker: EncoderWorker | None = None
+        self._bench_worker: BenchmarkWorker | None = None
+        self._analyzer: BottleneckAnalyzer | None = None
+        self._tuner: AutoTuner | None = None
+        self._preflight: PreflightChecker | None = None
+        self._preflight_output_dir: str | None = None  # batch waiting for the preflight check
+        self._scanners: list[DirectoryScanner] = []
+        self._manifest_loader: ManifestLoader | None = None
         self._codec_param_widgets: list[CodecParamWidget] = []
-
-        # Per-file trim state: { filepath: (start_str, end_str) }
-        self._file_trims: dict[str, tuple[str, str]] = {}
-
-        # Per-file crop state: { filepath: \"crop=W:H:X:Y\" }
-        self._file_crops: dict[str, str] = {}
+        # Jobs handed to the running worker, indexed by the worker's 1-based file index
+        self._worker_jobs: list[Job] = []
+        self._last_trace: TraceRecorder | None = None  # timeline of the last finished batch
 
         # Load theme preference
         self._settings = QSettings("VCC", "VideoCodecConverter")
         self._dark_mode = self._settings.value("dark_mode", False, type=bool)
+        self._exporter: PrometheusExporter | None = None
+        self._set_prom_textfile(str(self._settings.value("prom_textfile", "")))
 
         self._build_menu_bar()
         self._build_ui()
         self._connect_signals()
+        self._update_priority_label()
 
         # Trigger initial codec param build
         self._on_codec_changed()
@@ -406,6 +512,16 @@ class MainWindow(QMainWindow):
         file_menu.addAction(self._act_open)
         self._act_open_dir = QAction("Open Input Directory...", self)
         file_menu.addAction(self._act_open_dir)
+        self._act_stop_scan = QAction("Stop Directory Scan", self)
+        self._act_stop_scan.setEnabled(False)
+        file_menu.addAction(self._act_stop_scan)
+        file_menu.addSeparator()
+        self._act_import_manifest = QAction("Import Job Manifest...", self)
+        file_menu.addAction(self._act_import_manifest)
+        self._act_export_manifest = QAction("Export Job Manifest...", self)
+        file_menu.addAction(self._act_export_manifest)
+        self._act_export_timeline = QAction("Export Batch Timeline...", self)
+        file_menu.addAction(self._act_export_timeline)
         file_menu.addSeparator()
         act_exit = QAction("Exit", self)
         act_exit.setShortcut("Alt+F4")
@@ -430,12 +546,113 @@ class MainWindow(QMainWindow):
         self._act_delete_preset = QAction("Delete Preset...", self)
         presets_menu.addAction(self._act_delete_preset)
 
+        # Tools
+        tools_menu = menubar.addMenu("Tools")
+        self._act_benchmark = QAction("Encoder Benchmark...", self)
+        tools_menu.addAction(self._act_benchmark)
+        self._act_analyze = QAction("Analyze Bottleneck...", self)
+        self._act_analyze.setToolTip("Time decode, filters and encode of the selected file separately")
+        tools_menu.addAction(self._act_analyze)
+        self._act_autotune = QAction("Auto-Tune Parallel Jobs...", self)
+        self._act_autotune.setToolTip(
+            "Measure the fastest parallel jobs x threads split for the current codec and size"
+        )
+        tools_menu.addAction(self._act_autotune)
+
         # Settings
         settings_menu = menubar.addMenu("Settings")
         self._act_dark_mode = QAction("Dark Mode", self)
         self._act_dark_mode.setCheckable(True)
         self._act_dark_mode.setChecked(self._dark_mode)
         settings_menu.addAction(self._act_dark_mode)
+        self._act_skip_hidden = QAction("Skip Hidden Folders When Scanning", self)
+        self._act_skip_hidden.setCheckable(True)
+        self._act_skip_hidden.setChecked(self._settings.value("scan_skip_hidden", True, type=bool))
+        settings_menu.addAction(self._act_skip_hidden)
+        self._act_scan_excludes = QAction("Excluded Folders...", self)
+        settings_menu.addAction(self._act_scan_excludes)
+        self._act_prom_textfile = QAction("Prometheus Textfile...", self)
+        settings_menu.addAction(self._act_prom_textfile)
+        self._act_stage_timings = QAction("Record FFmpeg Stage Timings", self)
+        self._act_stage_timings.setCheckable(True)
+        self._act_stage_timings.setChecked(self._settings.value("stage_timings", False, type=bool))
+        self._act_stage_timings.setToolTip(
+            "Run FFmpeg with -benchmark_all and add decode/encode/mux times to the job metrics"
+        )
+        settings_menu.addAction(self._act_stage_timings)
+        self._act_pin_cpus = QAction("Pin Jobs to CPU Cores (NUMA-aware)", self)
+        self._act_pin_cpus.setCheckable(True)
+        self._act_pin_cpus.setChecked(
+            PINNING_SUPPORTED and self._settings.value("pin_cpus", False, type=bool)
+        )
+        self._act_pin_cpus.setEnabled(PINNING_SUPPORTED)
+        self._act_pin_cpus.setToolTip(
+            "Run each parallel job on its own cores, spread evenly across NUMA nodes"
+        )
+        settings_menu.addAction(self._act_pin_cpus)
+        self._act_adaptive = QAction("Adaptive Parallel Jobs", self)
+        self._act_adaptive.setCheckable(True)
+        self._act_adaptive.setChecked(self._settings.value("adaptive_jobs", False, type=bool))
+        self._act_adaptive.setToolTip(
+            "Treat Parallel jobs as an upper bound and add or remove jobs\n"
+            "as CPU idle time, I/O wait and throughput change"
+        )
+        settings_menu.addAction(self._act_adaptive)
+        self._act_admission = QAction("Wait for Free Memory && Disk Space", self)
+        self._act_admission.setCheckable(True)
+        self._act_admission.setChecked(self._settings.value("admission", True, type=bool))
+        self._act_admission.setToolTip(
+            "Start a job only when its estimated peak memory and output size\n"
+            "fit into available RAM and free space in the output directory"
+        )
+        settings_menu.addAction(self._act_admission)
+        self._act_preempt = QAction("Urgent Jobs Suspend Running Jobs", self)
+        self._act_preempt.setCheckable(True)
+        self._act_preempt.setChecked(self._settings.value("preempt", False, type=bool))
+        self._act_preempt.setEnabled(PAUSE_SUPPORTED)
+        self._act_preempt.setToolTip(
+            "When every slot is busy, suspend the lowest-priority running job\n"
+            "so an urgent job starts at once; it continues when the urgent job ends"
+        )
+        settings_menu.addAction(self._act_preempt)
+        self._act_retry = QAction("Retry Failed Encodes", self)
+        self._act_retry.setCheckable(True)
+        self._act_retry.setChecked(self._settings.value("retry_failed", True, type=bool))
+        self._act_retry.setToolTip(
+            "Re-run encodes that failed on GPU, I/O or crash errors,\n"
+            "waiting longer before each retry"
+        )
+        settings_menu.addAction(self._act_retry)
+        self._act_cpu_fallback = QAction("Fall Back to CPU When the GPU Fails", self)
+        self._act_cpu_fallback.setCheckable(True)
+        self._act_cpu_fallback.setChecked(self._settings.value("cpu_fallback", True, type=bool))
+        self._act_cpu_fallback.setToolTip(
+            "Re-run a job whose GPU encoder keeps failing on the matching\n"
+            "CPU encoder (x264, x265 or SVT-AV1) at similar quality"
+        )
+        settings_menu.addAction(self._act_cpu_fallback)
+        self._act_preflight = QAction("Preflight Check Before Encoding", self)
+        self._act_preflight.setCheckable(True)
+        self._act_preflight.setChecked(self._settings.value("preflight", True, type=bool))
+        self._act_preflight.setToolTip(
+            "Test-encode half a second of every queued file before the batch\n"
+            "starts and list the files FFmpeg rejects"
+        )
+        settings_menu.addAction(self._act_preflight)
+        priority_menu = settings_menu.addMenu("Encode Priority")
+        self._priority_group = QActionGroup(self)
+        current = str(self._settings.value("priority", DEFAULT_PROFILE))
+        for key, profile in PROFILES.items():
+            act = QAction(profile.label, self)
+            act.setCheckable(True)
+            act.setData(key)
+            act.setToolTip(profile.describe())
+            act.setChecked(key == (current if current in PROFILES else DEFAULT_PROFILE))
+            self._priority_group.addAction(act)
+            priority_menu.addAction(act)
+        priority_menu.addSeparator()
+        self._act_cgroup = QAction("Priority cgroup...", self)
+        priority_menu.addAction(self._act_cgroup)
         settings_menu.addSeparator()
         self._act_reset_defaults = QAction("Reset to Defaults", self)
         settings_menu.addAction(self._act_reset_defaults)
@@ -510,12 +727,54 @@ class MainWindow(QMainWindow):
         file_row.addWidget(self._lbl_file_count)
         ig_layout.addLayout(file_row)
 
-        # File list
-        self._file_list = QListWidget()
+        # File list (sorted / filtered through a proxy; details filled in by probes)
+        self._queue_model = FileQueueModel(self)
+        self._queue_proxy = QueueFilterProxy(self)
+        self._queue_proxy.setSourceModel(self._queue_model)
+        self._probe_pool = ProbePool(workers=min(4, os.cpu_count() or 1), parent=self)
+        self._file_list = QTableView()
+        self._file_list.setModel(self._queue_proxy)
         self._file_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self._file_list.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self._file_list.setShowGrid(False)
+        self._file_list.setWordWrap(False)
+        self._file_list.verticalHeader().setVisible(False)
+        # Fixed row height keeps scrolling cheap with tens of thousands of rows
+        self._file_list.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self._file_list.verticalHeader().setDefaultSectionSize(
+            self._file_list.fontMetrics().height() + 6
+        )
+        header = self._file_list.horizontalHeader()
+        header.setHighlightSections(False)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(COL_FILE, QHeaderView.ResizeMode.Stretch)
+        for col, width in ((COL_NUM, 44), (COL_CODEC, 70)):
+            header.resizeSection(col, width)
+        # No sort column: show queue order until a header is clicked ("#" restores it)
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self._file_list.setSortingEnabled(True)
         self._file_list.setMinimumHeight(80)
         self._file_list.setMaximumHeight(150)
+        self._file_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        # Rows are dragged to reorder the queue; file drops still reach the window
+        self._file_list.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self._file_list.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self._file_list.setDragDropOverwriteMode(False)
+        self._file_list.setDropIndicatorShown(True)
         ig_layout.addWidget(self._file_list)
+
+        # Queue filter row
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(QLabel("Filter:"))
+        self._txt_queue_filter = QLineEdit()
+        self._txt_queue_filter.setPlaceholderText("e.g. codec:h264 height>1080 duration>10:00")
+        self._txt_queue_filter.setClearButtonEnabled(True)
+        filter_row.addWidget(self._txt_queue_filter)
+        filter_row.addWidget(make_help_button(FILTER_HELP))
+        ig_layout.addLayout(filter_row)
+        self._visible_probe_timer = QTimer(self)
+        self._visible_probe_timer.setSingleShot(True)
+        self._visible_probe_timer.setInterval(100)
         top_layout.addWidget(input_group)
 
         # --- Output section ---
@@ -805,6 +1064,16 @@ class MainWindow(QMainWindow):
             self._cmb_bitrate.addItem(name, val)
         self._cmb_bitrate.setCurrentIndex(0)
         row_bitrate.addWidget(self._cmb_bitrate)
+        row_bitrate.addSpacing(12)
+        self._chk_two_pass = QCheckBox("Two-pass")
+        self._chk_two_pass.setEnabled(False)
+        self._chk_two_pass.setToolTip(
+            "Encode in two passes: a fast analysis pass followed by the real encode.\n"
+            "Gives much better rate control in target bitrate mode.\n\n"
+            "Available for H.264 (x264), H.265 (x265), VP9 and AV1 (libaom)\n"
+            "when a bitrate is selected."
+        )
+        row_bitrate.addWidget(self._chk_two_pass)
         row_bitrate.addSpacing(8)
         br_help = make_help_button(
             "Target video bitrate.\n\n"
@@ -818,6 +1087,50 @@ class MainWindow(QMainWindow):
         row_bitrate.addStretch()
         enc_vlayout.addLayout(row_bitrate)
 
+        # Row 5b: Target file size
+        row_size = QHBoxLayout()
+        lbl_size = QLabel("Target Size:")
+        lbl_size.setFixedWidth(100)
+        row_size.addWidget(lbl_size)
+        self._spn_target_size = NoScrollDoubleSpinBox()
+        self._spn_target_size.setRange(0.0, 100000.0)
+        self._spn_target_size.setDecimals(1)
+        self._spn_target_size.setValue(0.0)
+        self._spn_target_size.setSuffix(" MB")
+        self._spn_target_size.setSpecialValueText("Off")
+        self._spn_target_size.setFixedWidth(120)
+        self._spn_target_size.setToolTip(
+            "Size budget per output file (1 MB = 1,000,000 bytes). 0 = off.\n\n"
+            "The video bitrate is computed from each file's duration\n"
+            "(after trimming) and the audio bitrate, then encoded in two\n"
+            "passes where the codec supports it."
+        )
+        row_size.addWidget(self._spn_target_size)
+        row_size.addSpacing(12)
+        row_size.addWidget(QLabel("Tolerance: \u00b1"))
+        self._spn_size_tolerance = NoScrollSpinBox()
+        self._spn_size_tolerance.setRange(1, 25)
+        self._spn_size_tolerance.setValue(5)
+        self._spn_size_tolerance.setSuffix(" %")
+        self._spn_size_tolerance.setFixedWidth(70)
+        self._spn_size_tolerance.setEnabled(False)
+        self._spn_size_tolerance.setToolTip(
+            "If an output misses the target size by more than this,\n"
+            "the final pass is re-run with a corrected bitrate."
+        )
+        row_size.addWidget(self._spn_size_tolerance)
+        row_size.addSpacing(8)
+        size_help = make_help_button(
+            "Fit every output into a file-size budget (e.g. an upload cap).\n\n"
+            "Replaces the Bitrate selection: VCC computes the bitrate per file,\n"
+            "checks the result and re-encodes only if it misses the target\n"
+            "by more than the tolerance.\n\n"
+            "See Help \u2192 Video Bitrate Guide for details."
+        )
+        row_size.addWidget(size_help)
+        row_size.addStretch()
+        enc_vlayout.addLayout(row_size)
+
         # Row 6: Trim
         row_trim = QHBoxLayout()
         lbl_trim = QLabel("Trim:")
@@ -915,6 +1228,32 @@ class MainWindow(QMainWindow):
         self._btn_cancel.setEnabled(False)
         action_row.addWidget(self._btn_cancel)
 
+        self._btn_pause = QPushButton("  Pause  ")
+        self._btn_pause.setEnabled(False)
+        self._btn_pause.setToolTip(
+            "Stop the running FFmpeg processes and start no new jobs until resumed.\n"
+            "Right-click files in the queue to pause or resume single jobs."
+        )
+        self._btn_pause.setVisible(PAUSE_SUPPORTED)
+        action_row.addWidget(self._btn_pause)
+
+        action_row.addSpacing(16)
+        action_row.addWidget(QLabel("Parallel jobs:"))
+        self._spn_parallel_jobs = NoScrollSpinBox()
+        self._spn_parallel_jobs.setRange(0, max(1, os.cpu_count() or 1))
+        self._spn_parallel_jobs.setSpecialValueText("Auto")  # shown for 0
+        self._spn_parallel_jobs.setValue(1)
+        self._spn_parallel_jobs.setFixedWidth(60)
+        self._spn_parallel_jobs.setToolTip(
+            "Number of FFmpeg processes run at the same time.\n\n"
+            "1 = encode files one after another.\n"
+            "Higher values help with fast presets and two-pass encodes,\n"
+            "where one process cannot keep all CPU cores busy.\n"
+            "Auto = the split measured by Tools → Auto-Tune Parallel Jobs\n"
+            "for the current codec and output size (1 until tuned)."
+        )
+        action_row.addWidget(self._spn_parallel_jobs)
+
         action_row.addStretch()
 
         # Batch progress bar
@@ -951,6 +1290,8 @@ class MainWindow(QMainWindow):
 
         # Status bar
         self.statusBar().showMessage("Ready")
+        self._lbl_priority = QLabel()
+        self.statusBar().addPermanentWidget(self._lbl_priority)
 
     # ------------------------------------------------------------------
     # Styling / Theme
@@ -1002,6 +1343,41 @@ class MainWindow(QMainWindow):
         # Menu actions
         self._act_open.triggered.connect(self._add_files)
         self._act_open_dir.triggered.connect(self._add_directory)
+        self._act_stop_scan.triggered.connect(self._stop_scans)
+        self._act_import_manifest.triggered.connect(self._import_manifest)
+        self._act_export_manifest.triggered.connect(self._export_manifest)
+        self._act_export_timeline.triggered.connect(self._export_timeline)
+        self._act_skip_hidden.toggled.connect(
+            lambda checked: self._settings.setValue("scan_skip_hidden", checked)
+        )
+        self._act_scan_excludes.triggered.connect(self._edit_scan_excludes)
+        self._act_prom_textfile.triggered.connect(self._edit_prom_textfile)
+        self._act_stage_timings.toggled.connect(
+            lambda checked: self._settings.setValue("stage_timings", checked)
+        )
+        self._act_pin_cpus.toggled.connect(
+            lambda checked: self._settings.setValue("pin_cpus", checked)
+        )
+        self._act_adaptive.toggled.connect(
+            lambda checked: self._settings.setValue("adaptive_jobs", checked)
+        )
+        self._act_admission.toggled.connect(
+            lambda checked: self._settings.setValue("admission", checked)
+        )
+        self._act_preempt.toggled.connect(
+            lambda checked: self._settings.setValue("preempt", checked)
+        )
+        self._act_retry.toggled.connect(
+            lambda checked: self._settings.setValue("retry_failed", checked)
+        )
+        self._act_cpu_fallback.toggled.connect(
+            lambda checked: self._settings.setValue("cpu_fallback", checked)
+        )
+        self._act_preflight.toggled.connect(
+            lambda checked: self._settings.setValue("preflight", checked)
+        )
+        self._priority_group.triggered.connect(self._on_priority_changed)
+        self._act_cgroup.triggered.connect(self._edit_cgroup)
         self._act_clear_files.triggered.connect(self._clear_files)
         self._act_clear_terminal.triggered.connect(self._terminal.clear_terminal)
         self._act_reset_defaults.triggered.connect(self._reset_defaults)
@@ -1023,14 +1399,33 @@ class MainWindow(QMainWindow):
         self._act_load_preset.triggered.connect(self._load_preset)
         self._act_delete_preset.triggered.connect(self._delete_preset)
 
+        # Tools
+        self._act_benchmark.triggered.connect(self._run_benchmark)
+        self._act_analyze.triggered.connect(self._run_analyzer)
+        self._act_autotune.triggered.connect(self._run_autotune)
+
         # Buttons
         self._btn_add_files.clicked.connect(self._add_files)
         self._btn_add_dir.clicked.connect(self._add_directory)
         self._btn_remove_selected.clicked.connect(self._remove_selected_files)
         self._btn_clear_files.clicked.connect(self._clear_files)
+        self._txt_queue_filter.textChanged.connect(self._on_queue_filter_changed)
+        self._probe_pool.probed.connect(self._queue_model.set_info)
+        self._visible_probe_timer.timeout.connect(self._probe_visible_rows)
+        self._file_list.verticalScrollBar().valueChanged.connect(self._visible_probe_timer.start)
+        self._queue_proxy.rowsInserted.connect(self._visible_probe_timer.start)
+        self._queue_proxy.layoutChanged.connect(self._visible_probe_timer.start)
+        self._queue_proxy.modelReset.connect(self._visible_probe_timer.start)
+        # Probe results can move files in or out of a filtered view
+        self._queue_proxy.rowsInserted.connect(self._update_file_count)
+        self._queue_proxy.rowsRemoved.connect(self._update_file_count)
         self._btn_output_dir.clicked.connect(self._browse_output)
         self._btn_start.clicked.connect(self._start_encoding)
         self._btn_cancel.clicked.connect(self._cancel_encoding)
+        self._btn_pause.clicked.connect(self._toggle_pause)
+        self._file_list.customContextMenuRequested.connect(self._show_queue_menu)
+        self._file_list.horizontalHeader().sortIndicatorChanged.connect(self._update_queue_drag)
+        self._queue_model.rows_moved.connect(self._on_queue_reordered)
         self._btn_trim.clicked.connect(self._open_trim_dialog)
         self._btn_crop.clicked.connect(self._open_crop_dialog)
 
@@ -1040,6 +1435,10 @@ class MainWindow(QMainWindow):
         # FPS preset -> enable/disable custom spinbox
         self._cmb_fps.currentIndexChanged.connect(self._on_fps_preset_changed)
 
+        # Bitrate -> two-pass is only available in target bitrate mode
+        self._cmb_bitrate.currentIndexChanged.connect(self._update_two_pass_state)
+        self._spn_target_size.valueChanged.connect(self._update_two_pass_state)
+
         # Resolution preset -> set width/height
         self._cmb_resolution_preset.currentIndexChanged.connect(self._on_resolution_preset_changed)
         # Width/Height manual change -> switch preset to "Custom"
@@ -1049,8 +1448,7 @@ class MainWindow(QMainWindow):
     # ------------------------------------------------------------------
     # Drag & Drop
     # ------------------------------------------------------------------
-    _DRAG_VIDEO_EXTS = {".mkv", ".mp4", ".avi", ".mov", ".m4v", ".webm",
-                        ".ts", ".flv", ".wmv", ".mpg", ".mpeg"}
+    _DRAG_VIDEO_EXTS = VIDEO_EXTENSIONS
 
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
@@ -1071,6 +1469,7 @@ class MainWindow(QMainWindow):
 
     def dropEvent(self, event: QDropEvent):
         paths = []
+        dirs = []
         for url in event.mimeData().urls():
             p = url.toLocalFile()
             if os.path.isfile(p):
@@ -1078,13 +1477,12 @@ class MainWindow(QMainWindow):
                 if ext in self._DRAG_VIDEO_EXTS:
                     paths.append(p)
             elif os.path.isdir(p):
-                for root, _dirs, fnames in os.walk(p):
-                    for fn in sorted(fnames):
-                        if os.path.splitext(fn)[1].lower() in self._DRAG_VIDEO_EXTS:
-                            paths.append(os.path.join(root, fn))
+                dirs.append(p)
         if paths:
             self._append_files(paths)
             self.statusBar().showMessage(f"Added {len(paths)} file(s) via drag & drop")
+        if dirs:
+            self._start_scan(dirs, extra=len(paths))
         event.acceptProposedAction()
 
     # ------------------------------------------------------------------
@@ -1092,9 +1490,9 @@ class MainWindow(QMainWindow):
     # ------------------------------------------------------------------
     def _open_trim_dialog(self):
         """Open a trim dialog for the selected file(s) in the input list."""
-        selected = self._file_list.selectedItems()
+        selected = self._selected_jobs()
         if not selected:
-            if self._file_list.count() == 0:
+            if self._queue_model.rowCount() == 0:
                 QMessageBox.information(self, "No Files", "Please add video files first.")
                 return
             # If nothing selected, ask user to select
@@ -1104,25 +1502,19 @@ class MainWindow(QMainWindow):
             )
             return
 
-        for item in selected:
-            filepath = item.data(Qt.ItemDataRole.UserRole)
-            filename = os.path.basename(filepath)
-            existing = self._file_trims.get(filepath, ("", ""))
+        for job in selected:
+            filename = os.path.basename(job.source)
             dlg = TrimDialog(self)
             dlg.setWindowTitle(f"Trim — {filename}")
-            dlg.set_times(existing[0], existing[1])
+            dlg.set_times(job.trim_start, job.trim_end)
             if dlg.exec() == QDialog.DialogCode.Accepted:
-                start, end = dlg.get_times()
-                if start or end:
-                    self._file_trims[filepath] = (start, end)
-                else:
-                    self._file_trims.pop(filepath, None)
+                job.trim_start, job.trim_end = dlg.get_times()
             else:
                 break  # user cancelled, stop iterating
         self._update_trim_label()
 
     def _update_trim_label(self):
-        trimmed_count = len(self._file_trims)
+        trimmed_count = sum(1 for job in self._queue_model.batch if job.trimmed)
         if trimmed_count > 0:
             self._lbl_trim_info.setText(f"{trimmed_count} file(s) trimmed")
             self._lbl_trim_info.setStyleSheet("color: #2e7d32; font-weight: bold;")
@@ -1135,9 +1527,9 @@ class MainWindow(QMainWindow):
     # ------------------------------------------------------------------
     def _open_crop_dialog(self):
         """Open a crop dialog for the selected file(s) in the input list."""
-        selected = self._file_list.selectedItems()
+        selected = self._selected_jobs()
         if not selected:
-            if self._file_list.count() == 0:
+            if self._queue_model.rowCount() == 0:
                 QMessageBox.information(self, "No Files", "Please add video files first.")
                 return
             QMessageBox.information(
@@ -1146,26 +1538,20 @@ class MainWindow(QMainWindow):
             )
             return
 
-        for item in selected:
-            filepath = item.data(Qt.ItemDataRole.UserRole)
-            filename = os.path.basename(filepath)
-            existing = self._file_crops.get(filepath, "")
+        for job in selected:
+            filename = os.path.basename(job.source)
             dlg = CropDialog(self)
             dlg.setWindowTitle(f"Auto-Crop — {filename}")
-            dlg.set_filepath(filepath)
-            dlg.set_crop(existing)
+            dlg.set_filepath(job.source)
+            dlg.set_crop(job.crop)
             if dlg.exec() == QDialog.DialogCode.Accepted:
-                crop_val = dlg.get_crop()
-                if crop_val:
-                    self._file_crops[filepath] = crop_val
-                else:
-                    self._file_crops.pop(filepath, None)
+                job.crop = dlg.get_crop()
             else:
                 break  # user cancelled, stop iterating
         self._update_crop_label()
 
     def _update_crop_label(self):
-        cropped_count = len(self._file_crops)
+        cropped_count = sum(1 for job in self._queue_model.batch if job.crop)
         if cropped_count > 0:
             self._lbl_crop_info.setText(f"{cropped_count} file(s) cropped")
             self._lbl_crop_info.setStyleSheet("color: #2e7d32; font-weight: bold;")
@@ -1195,6 +1581,10 @@ class MainWindow(QMainWindow):
             "fps_idx": self._cmb_fps.currentIndex(),
             "custom_fps": self._spn_custom_fps.value(),
             "bitrate_idx": self._cmb_bitrate.currentIndex(),
+            "two_pass": self._chk_two_pass.isChecked(),
+            "target_size_mb": self._spn_target_size.value(),
+            "size_tolerance": self._spn_size_tolerance.value(),
+            "parallel_jobs": self._spn_parallel_jobs.value(),
             "output_format_idx": self._cmb_output_format.currentIndex(),
             "overwrite": self._chk_overwrite.isChecked(),
             "concat": self._chk_concat.isChecked(),
@@ -1223,6 +1613,10 @@ class MainWindow(QMainWindow):
             self._cmb_fps.setCurrentIndex(settings.get("fps_idx", 0))
             self._spn_custom_fps.setValue(settings.get("custom_fps", 30.0))
             self._cmb_bitrate.setCurrentIndex(settings.get("bitrate_idx", 0))
+            self._chk_two_pass.setChecked(settings.get("two_pass", False))
+            self._spn_target_size.setValue(settings.get("target_size_mb", 0.0))
+            self._spn_size_tolerance.setValue(settings.get("size_tolerance", 5))
+            self._spn_parallel_jobs.setValue(settings.get("parallel_jobs", 1))
             ofi = settings.get("output_format_idx", 0)
             if ofi < self._cmb_output_format.count():
                 self._cmb_output_format.setCurrentIndex(ofi)
@@ -1231,8 +1625,7 @@ class MainWindow(QMainWindow):
             self._spn_film_grain.setValue(settings.get("film_grain", 0))
             self._spn_sharpness.setValue(settings.get("sharpness", 0))
             # Presets don't store per-file trims/crops – just clear
-            self._file_trims.clear()
-            self._file_crops.clear()
+            self._clear_trims_and_crops()
             self._update_trim_label()
             self._update_crop_label()
             self._on_fps_preset_changed(self._cmb_fps.currentIndex())
@@ -1305,49 +1698,232 @@ class MainWindow(QMainWindow):
     def _add_directory(self):
         dir_path = QFileDialog.getExistingDirectory(self, "Select Input Directory")
         if dir_path:
-            exts = {".mkv", ".mp4", ".avi", ".mov", ".m4v", ".webm", ".ts", ".flv", ".wmv", ".mpg", ".mpeg"}
-            found = []
-            for root, _dirs, fnames in os.walk(dir_path):
-                for fn in sorted(fnames):
-                    if os.path.splitext(fn)[1].lower() in exts:
-                        found.append(os.path.join(root, fn))
-            if found:
-                self._append_files(found)
-            else:
-                QMessageBox.information(self, "No Videos", "No video files found in the selected directory.")
+            self._start_scan([dir_path], report_empty=True)
+
+    # ------------------------------------------------------------------
+    # Job manifests
+    # ------------------------------------------------------------------
+    def _import_manifest(self):
+        if self._manifest_loader is not None:
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Import Job Manifest", "", MANIFEST_FILTER)
+        if not path:
+            return
+        loader = ManifestLoader(path, parent=self)
+        loader.jobs_loaded.connect(self._append_jobs)
+        loader.load_done.connect(
+            lambda loaded, errors, fatal: self._on_manifest_loaded(path, loaded, errors, fatal)
+        )
+        self._manifest_loader = loader
+        self._act_import_manifest.setEnabled(False)
+        self.statusBar().showMessage(f"Importing {os.path.basename(path)}...")
+        loader.start()
+
+    def _on_manifest_loaded(self, path: str, loaded: int, errors: list, fatal: str):
+        self._manifest_loader.wait()
+        self._manifest_loader.deleteLater()
+        self._manifest_loader = None
+        self._act_import_manifest.setEnabled(True)
+        self._update_trim_label()
+        self._update_crop_label()
+        self.statusBar().showMessage(f"Imported {loaded} job(s) from {os.path.basename(path)}")
+        if fatal:
+            QMessageBox.warning(self, "Import Error", f"Could not read manifest:\n{fatal}")
+        elif errors:
+            shown = "\n".join(str(e) for e in errors[:20])
+            more = f"\n... and {len(errors) - 20} more" if len(errors) > 20 else ""
+            QMessageBox.warning(
+                self, "Import Warnings",
+                f"Imported {loaded} job(s); skipped {len(errors)} invalid record(s):\n\n{shown}{more}",
+            )
+
+    def _export_manifest(self):
+        if self._queue_model.rowCount() == 0:
+            QMessageBox.information(self, "No Files", "The file queue is empty.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Job Manifest", "jobs.jsonl", MANIFEST_FILTER)
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".jsonl"
+        # Export what the queue shows, in the order shown
+        jobs = (self._queue_model.job_at(r) for r in self._queue_proxy.source_rows())
+        try:
+            count = write_manifest(path, jobs)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Export Error", f"Could not write manifest:\n{e}")
+            return
+        self.statusBar().showMessage(f"Exported {count} job(s) to {path}")
+
+    # ------------------------------------------------------------------
+    # Background directory scanning
+    # ------------------------------------------------------------------
+    def _scan_excludes(self) -> list[str]:
+        value = self._settings.value("scan_exclude", ", ".join(DEFAULT_EXCLUDES))
+        return [p.strip() for p in str(value).split(",") if p.strip()]
+
+    def _edit_scan_excludes(self):
+        text, ok = QInputDialog.getText(
+            self, "Excluded Folders",
+            "Folder names to skip when scanning (comma-separated, wildcards allowed):",
+            text=", ".join(self._scan_excludes()),
+        )
+        if ok:
+            self._settings.setValue("scan_exclude", text)
+
+    def _priority_key(self) -> str:
+        act = self._priority_group.checkedAction()
+        return act.data() if act is not None else DEFAULT_PROFILE
+
+    def _update_priority_label(self):
+        profile = PROFILES[self._priority_key()]
+        self._lbl_priority.setText(f"Priority: {profile.label}")
+        self._lbl_priority.setToolTip(profile.describe())
+
+    def _on_priority_changed(self, action: QAction):
+        """Remember the profile and apply it to the running batch, if any."""
+        self._settings.setValue("priority", action.data())
+        self._update_priority_label()
+        if self._worker is not None:
+            self._worker.set_priority(action.data())
+
+    def _edit_cgroup(self):
+        path, ok = QInputDialog.getText(
+            self, "Priority cgroup",
+            "Delegated cgroup v2 directory for CPU weight and cpu.max limits\n"
+            f"(empty = ${CGROUP_ENV} or none; applies to the next batch):",
+            text=str(self._settings.value("cgroup_dir", "")),
+        )
+        if not ok:
+            return
+        path = path.strip()
+        problem = usable_cgroup(path) if path else ""
+        if problem:
+            QMessageBox.warning(self, "Priority cgroup", f"Cannot use this cgroup: {problem}.")
+            return
+        self._settings.setValue("cgroup_dir", path)
+
+    def _start_scan(self, roots: list[str], report_empty: bool = False, extra: int = 0):
+        """Scan *roots* on a background thread, adding matches to the list as they stream in.
+
+        *extra* counts files already added alongside the scan (drag & drop).
+        """
+        scanner = DirectoryScanner(
+            roots,
+            extensions=self._DRAG_VIDEO_EXTS,
+            skip_hidden=self._act_skip_hidden.isChecked(),
+            exclude=self._scan_excludes(),
+            parent=self,
+        )
+        scanner.files_found.connect(self._append_files)
+        scanner.scan_progress.connect(
+            lambda found, file_rate, entry_rate: self.statusBar().showMessage(
+                f"Scanning... {found + extra} video file(s) found "
+                f"({file_rate:,.0f} files/s, {entry_rate:,.0f} entries scanned/s)"
+            )
+        )
+        scanner.scan_done.connect(
+            lambda found, cancelled: self._on_scan_done(scanner, found + extra, cancelled, report_empty)
+        )
+        self._scanners.append(scanner)
+        self._act_stop_scan.setEnabled(True)
+        self.statusBar().showMessage("Scanning...")
+        scanner.start()
+
+    def _on_scan_done(self, scanner: DirectoryScanner, found: int, cancelled: bool,
+                      report_empty: bool):
+        scanner.wait()
+        if scanner in self._scanners:
+            self._scanners.remove(scanner)
+        scanner.deleteLater()
+        self._act_stop_scan.setEnabled(bool(self._scanners))
+        if cancelled:
+            self.statusBar().showMessage(f"Scan stopped: {found} video file(s) added")
+        elif found == 0 and report_empty:
+            QMessageBox.information(self, "No Videos", "No video files found in the selected directory.")
+        else:
+            self.statusBar().showMessage(f"Added {found} video file(s)")
+
+    def _stop_scans(self):
+        for scanner in self._scanners:
+            scanner.cancel()
+
+    def _wait_for_scans(self):
+        self._stop_scans()
+        for scanner in self._scanners:
+            scanner.wait(5000)
 
     def _append_files(self, paths: list[str]):
-        existing = set()
-        for i in range(self._file_list.count()):
-            existing.add(self._file_list.item(i).data(Qt.ItemDataRole.UserRole))
-        for p in paths:
-            if p not in existing:
-                item = QListWidgetItem(p)
-                item.setData(Qt.ItemDataRole.UserRole, p)
-                self._file_list.addItem(item)
+        added = self._queue_model.add_paths(paths)
+        if added:
+            self._probe_pool.request(added)
+        self._update_file_count()
+
+    def _append_jobs(self, jobs: list[Job]):
+        added = self._queue_model.add_jobs(jobs)
+        if added:
+            self._probe_pool.request([job.source for job in added])
         self._update_file_count()
 
+    def _selected_rows(self) -> list[int]:
+        """Source rows of the selected files, in display order."""
+        proxy = self._queue_proxy
+        rows = sorted(i.row() for i in self._file_list.selectionModel().selectedRows())
+        return [proxy.mapToSource(proxy.index(r, 0)).row() for r in rows]
+
+    def _selected_jobs(self) -> list[Job]:
+        return [self._queue_model.job_at(r) for r in self._selected_rows()]
+
+    def _clear_trims_and_crops(self):
+        for job in self._queue_model.batch:
+            job.trim_start = job.trim_end = job.crop = ""
+
     def _remove_selected_files(self):
-        for item in self._file_list.selectedItems():
-            filepath = item.data(Qt.ItemDataRole.UserRole)
-            self._file_trims.pop(filepath, None)
-            self._file_crops.pop(filepath, None)
-            self._file_list.takeItem(self._file_list.row(item))
+        removed = self._queue_model.remove_rows(self._selected_rows())
+        self._probe_pool.forget([job.source for job in removed])
         self._update_file_count()
         self._update_trim_label()
         self._update_crop_label()
 
     def _clear_files(self):
-        self._file_list.clear()
-        self._file_trims.clear()
-        self._file_crops.clear()
+        self._queue_model.clear()
+        self._probe_pool.forget()
         self._update_file_count()
         self._update_trim_label()
         self._update_crop_label()
 
     def _update_file_count(self):
-        count = self._file_list.count()
-        self._lbl_file_count.setText(f"{count} file{'s' if count != 1 else ''}")
+        count = self._queue_model.rowCount()
+        if self._queue_proxy.is_filtered():
+            self._lbl_file_count.setText(f"{self._queue_proxy.rowCount()} of {count} files shown")
+        else:
+            self._lbl_file_count.setText(f"{count} file{'s' if count != 1 else ''}")
+
+    def _on_queue_filter_changed(self, text: str):
+        try:
+            self._queue_proxy.set_filter_text(text)
+        except ValueError as e:
+            self._txt_queue_filter.setStyleSheet("QLineEdit { border: 1px solid #d32f2f; }")
+            self._txt_queue_filter.setToolTip(str(e))
+            return
+        self._txt_queue_filter.setStyleSheet("")
+        self._txt_queue_filter.setToolTip("")
+        self._update_file_count()
+
+    def _probe_visible_rows(self):
+        """Move the rows currently on screen to the front of the probe queue."""
+        proxy = self._queue_proxy
+        if proxy.rowCount() == 0:
+            return
+        first = max(0, self._file_list.rowAt(0))
+        last = self._file_list.rowAt(self._file_list.viewport().height() - 1)
+        if last < 0:
+            last = proxy.rowCount() - 1
+        paths = [
+            self._queue_model.path_at(proxy.mapToSource(proxy.index(r, 0)).row())
+            for r in range(first, min(last, first + 200) + 1)
+        ]
+        self._probe_pool.request(paths, PRIORITY_VISIBLE)
 
     def _browse_output(self):
         dir_path = QFileDialog.getExistingDirectory(self, "Select Output Directory")
@@ -1423,6 +1999,8 @@ class MainWindow(QMainWindow):
         # Filter output format dropdown for the selected codec
         self._update_output_format_combo(codec_key)
 
+        self._update_two_pass_state()
+
         # Add stretch at end
         self._codec_params_layout.addStretch()
 
@@ -1530,6 +2108,20 @@ class MainWindow(QMainWindow):
         data = self._cmb_fps.currentData()
         self._spn_custom_fps.setEnabled(data == "__custom__")
 
+    def _update_two_pass_state(self):
+        """Enable the two-pass checkbox only for a bitrate on a codec that supports it.
+
+        A target size replaces the bitrate ladder and always uses two passes.
+        """
+        codec_key = self._cmb_codec.currentData()
+        supported = CODECS.get(codec_key, {}).get("two_pass", False)
+        target_size = self._spn_target_size.value() > 0
+        self._cmb_bitrate.setEnabled(not target_size)
+        self._spn_size_tolerance.setEnabled(target_size)
+        self._chk_two_pass.setEnabled(
+            bool(supported and self._cmb_bitrate.currentData()) and not target_size
+        )
+
     def _get_selected_fps(self) -> str:
         """Return the FPS value to use: preset value or custom spinbox."""
         data = self._cmb_fps.currentData()
@@ -1581,11 +2173,14 @@ class MainWindow(QMainWindow):
         self._spn_custom_fps.setValue(30.0)
         self._spn_custom_fps.setEnabled(False)
         self._cmb_bitrate.setCurrentIndex(0)
+        self._chk_two_pass.setChecked(False)
+        self._spn_target_size.setValue(0.0)
+        self._spn_size_tolerance.setValue(5)
+        self._spn_parallel_jobs.setValue(1)
         self._cmb_output_format.setCurrentIndex(0)
         self._chk_overwrite.setChecked(False)
         self._chk_concat.setChecked(False)
-        self._file_trims.clear()
-        self._file_crops.clear()
+        self._clear_trims_and_crops()
         self._update_trim_label()
         self._update_crop_label()
         self._spn_film_grain.setValue(0)
@@ -1593,6 +2188,42 @@ class MainWindow(QMainWindow):
         self._on_codec_changed()
         self.statusBar().showMessage("Settings reset to defaults")
 
+    # ------------------------------------------------------------------
+    # Prometheus textfile exporter
+    # ------------------------------------------------------------------
+    def _set_prom_textfile(self, path: str):
+        """(Re)start the exporter writing to *path*; an empty path turns it off."""
+        if self._exporter is not None:
+            if self._exporter.path == path:
+                return
+            self._exporter.stop()
+            self._exporter = None
+        if path:
+            self._exporter = PrometheusExporter(path)
+            self._exporter.start()
+
+    def _edit_prom_textfile(self):
+        if self._worker is not None:
+            QMessageBox.warning(self, "Encoding Running",
+                                "The exporter can be changed once the batch has finished.")
+            return
+        path, ok = QInputDialog.getText(
+            self, "Prometheus Textfile",
+            "Write encoding metrics for node_exporter's textfile collector to\n"
+            "(a .prom file in its --collector.textfile.directory; empty = off):",
+            text=str(self._settings.value("prom_textfile", "")),
+        )
+        if not ok:
+            return
+        path = path.strip()
+        if path and not path.endswith(".prom"):
+            QMessageBox.warning(self, "Prometheus Textfile",
+                                "The textfile collector only reads files ending in .prom.")
+            return
+        self._settings.setValue("prom_textfile", path)
+        self._set_prom_textfile(path)
+        self.statusBar().showMessage(f"Prometheus metrics: {path}" if path else "Prometheus export off")
+
     # ------------------------------------------------------------------
     # Encoding
     # ------------------------------------------------------------------
@@ -1603,22 +2234,8 @@ class MainWindow(QMainWindow):
             return data
         return self._cmb_pixfmt.currentText().strip()
 
-    def _start_encoding(self):
-        # Validate
-        if self._file_list.count() == 0:
-            QMessageBox.warning(self, "No Files", "Please add video files to encode.")
-            return
-
-        output_dir = self._txt_output_dir.text().strip()
-        if not output_dir:
-            QMessageBox.warning(self, "No Output", "Please select an output directory.")
-            return
-
-        # Gather files
-        files = []
-        for i in range(self._file_list.count()):
-            files.append(self._file_list.item(i).data(Qt.ItemDataRole.UserRole))
-
+    def _make_worker(self, jobs: list[Job], output_dir: str) -> EncoderWorker:
+        """An EncoderWorker for *jobs* configured from the current settings."""
         # Gather codec params
         codec_params = {}
         for pw in self._codec_param_widgets:
@@ -1632,9 +2249,8 @@ class MainWindow(QMainWindow):
         if codec_key == "libvpx-vp9" and "crf" in codec_params:
             codec_params["b:v"] = "0"
 
-        # Create worker
-        self._worker = EncoderWorker(
-            files=files,
+        return EncoderWorker(
+            jobs=jobs,
             output_dir=output_dir,
             width=self._spn_width.value(),
             height=self._spn_height.value(),
@@ -1647,45 +2263,276 @@ class MainWindow(QMainWindow):
             bitrate=self._cmb_bitrate.currentData() or "",
             overwrite=self._chk_overwrite.isChecked(),
             output_format=self._cmb_output_format.currentData() or "",
-            file_trims=self._file_trims,
-            file_crops=self._file_crops,
             concatenate=self._chk_concat.isChecked(),
             film_grain=self._spn_film_grain.value(),
             sharpness=self._spn_sharpness.value(),
+            two_pass=self._chk_two_pass.isEnabled() and self._chk_two_pass.isChecked(),
+            max_jobs=self._spn_parallel_jobs.value(),
+            target_size_mb=self._spn_target_size.value(),
+            size_tolerance=self._spn_size_tolerance.value() / 100.0,
+            metrics_dir=default_metrics_dir(),
+            exporter=self._exporter,
+            stage_timings=self._act_stage_timings.isChecked(),
+            pin_cpus=self._act_pin_cpus.isChecked(),
+            priority=self._priority_key(),
+            cgroup=str(self._settings.value("cgroup_dir", "")),
+            adaptive=self._act_adaptive.isChecked(),
+            admission=self._act_admission.isChecked(),
+            preempt=self._act_preempt.isChecked(),
+            retries=RetryPolicy.retries if self._act_retry.isChecked() else 0,
+            cpu_fallback=self._act_cpu_fallback.isChecked(),
         )
 
+    def _start_encoding(self):
+        if self._preflight is not None:
+            return
+        if self._bench_worker is not None or self._analyzer is not None or self._tuner is not None:
+            QMessageBox.warning(self, "Benchmark Running",
+                                "Please wait for the benchmark, analysis or auto-tuning to finish.")
+            return
+        if self._scanners:
+            QMessageBox.warning(self, "Scan Running",
+                                "Please wait for the directory scan to finish or stop it.")
+            return
+        if self._manifest_loader is not None:
+            QMessageBox.warning(self, "Import Running",
+                                "Please wait for the manifest import to finish.")
+            return
+        # Validate
+        if self._queue_model.rowCount() == 0:
+            QMessageBox.warning(self, "No Files", "Please add video files to encode.")
+            return
+        if self._queue_proxy.rowCount() == 0:
+            QMessageBox.warning(self, "No Files", "No queued files match the filter.")
+            return
+
+        output_dir = self._txt_output_dir.text().strip()
+        if not output_dir:
+            QMessageBox.warning(self, "No Output", "Please select an output directory.")
+            return
+
+        # Gather files
+        # Encode what the queue shows, in the order shown
+        jobs = [self._queue_model.job_at(r) for r in self._queue_proxy.source_rows()]
+        if self._act_preflight.isChecked():
+            self._run_preflight(jobs, output_dir)
+        else:
+            self._launch_batch(jobs, output_dir)
+
+    def _launch_batch(self, jobs: list[Job], output_dir: str):
+        self._worker_jobs = jobs
+        self._worker = self._make_worker(jobs, output_dir)
+
         self._worker.log_output.connect(self._terminal.append_text)
         self._worker.file_started.connect(self._on_file_started)
         self._worker.file_finished.connect(self._on_file_finished)
+        self._worker.file_waiting.connect(self._on_file_waiting)
+        self._worker.file_paused.connect(self._on_file_paused)
+        self._worker.file_progress.connect(self._on_file_progress)
         self._worker.encoding_done.connect(self._on_encoding_done)
         self._worker.encoding_error.connect(self._on_encoding_error)
 
-        self._progress.setMaximum(len(files))
+        self._progress.setMaximum(len(jobs))
         self._progress.setValue(0)
         self._btn_start.setEnabled(False)
         self._btn_cancel.setEnabled(True)
+        self._btn_pause.setEnabled(PAUSE_SUPPORTED)
+        self._btn_pause.setText("  Pause  ")
         self.statusBar().showMessage("Encoding...")
 
-        self._terminal.clear_terminal()
-        self._terminal.append_text(f"Starting encoding of {len(files)} file(s)...\n\n")
+        if self._preflight_output_dir is None:
+            self._terminal.clear_terminal()  # keep the preflight report
+        self._preflight_output_dir = None
+        self._terminal.append_text(f"Starting encoding of {len(jobs)} file(s)...\n\n")
 
         self._worker.start()
 
+    def _run_preflight(self, jobs: list[Job], output_dir: str):
+        self._preflight = PreflightChecker(self._make_worker(jobs, output_dir))
+        self._preflight_output_dir = output_dir
+        self._preflight.log_output.connect(self._terminal.append_text)
+        self._preflight.file_checked.connect(
+            lambda idx, error: self._progress.setValue(self._progress.value() + 1)
+        )
+        self._preflight.finished.connect(self._on_preflight_finished)
+        self._progress.setMaximum(len(jobs))
+        self._progress.setValue(0)
+        self._btn_start.setEnabled(False)
+        self._btn_cancel.setEnabled(True)
+        self._terminal.clear_terminal()
+        self.statusBar().showMessage("Preflight check...")
+        self._preflight.start()
+
+    def _on_preflight_finished(self):
+        checker, self._preflight = self._preflight, None
+        if checker is None:
+            return
+        checker.worker.deleteLater()
+        checker.deleteLater()
+        result = checker.result
+        self._btn_start.setEnabled(True)
+        self._btn_cancel.setEnabled(False)
+        if result is None or result["cancelled"]:
+            self._preflight_output_dir = None
+            self.statusBar().showMessage("Preflight cancelled")
+            return
+        failed, passed = result["failed"], result["passed"]
+        for job, error in failed:
+            job.state = JobState.FAILED
+            job.error = f"Preflight: {error}"
+            self._queue_model.refresh_job(job)
+        if failed:
+            self.statusBar().showMessage(
+                f"Preflight: {len(failed)} of {len(failed) + len(passed)} file(s) failed"
+            )
+            shown = 15
+            listing = "\n".join(f"{os.path.basename(job.source)}: {error}" for job, error in failed[:shown])
+            if len(failed) > shown:
+                listing += f"\n... and {len(failed) - shown} more (see the terminal)"
+            if not passed:
+                self._preflight_output_dir = None
+                QMessageBox.warning(self, "Preflight Check",
+                                    f"Every file failed the preflight check:\n\n{listing}")
+                return
+            reply = QMessageBox.question(
+                self, "Preflight Check",
+                f"{len(failed)} file(s) failed the preflight check:\n\n{listing}\n\n"
+                f"Encode the {len(passed)} file(s) that passed?",
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                self._preflight_output_dir = None
+                return
+        self._launch_batch(passed, self._preflight_output_dir)
+
     def _cancel_encoding(self):
+        if self._preflight is not None:
+            self._preflight.cancel()
         if self._worker:
             self._worker.cancel()
         self._btn_cancel.setEnabled(False)
+        self._btn_pause.setEnabled(False)
         self.statusBar().showMessage("Cancelling...")
 
+    def _toggle_pause(self):
+        if self._worker is None:
+            return
+        if self._worker.is_paused():
+            self._worker.resume()
+            self._btn_pause.setText("  Pause  ")
+            self.statusBar().showMessage("Encoding...")
+        else:
+            self._worker.pause()
+            self._btn_pause.setText("  Resume  ")
+            self.statusBar().showMessage("Paused - running encodes are stopped")
+
+    def _show_queue_menu(self, pos):
+        """Priority of the selected jobs; pause/resume or add them to the running batch."""
+        jobs = self._selected_jobs()
+        if not jobs:
+            return
+        worker = self._worker
+        index_of = {id(job): i for i, job in enumerate(self._worker_jobs, 1)}
+        selected = [(index_of[id(job)], job) for job in jobs if id(job) in index_of]
+        active = [(idx, job) for idx, job in selected
+                  if job.state in (JobState.PENDING, JobState.RUNNING)]
+        menu = QMenu(self)
+        priority_menu = menu.addMenu("Priority")
+        priority_actions = {}
+        for priority in sorted(JobPriority.NAMES, reverse=True):
+            act = priority_menu.addAction(JobPriority.label(priority))
+            act.setCheckable(True)
+            act.setChecked(all(job.priority == priority for job in jobs))
+            priority_actions[act] = priority
+        act_pause = act_resume = act_add = None
+        if worker is not None:
+            menu.addSeparator()
+            if PAUSE_SUPPORTED:
+                act_pause = menu.addAction("Pause Job")
+                act_pause.setEnabled(any(not job.paused for _, job in active))
+                act_resume = menu.addAction("Resume Job")
+                act_resume.setEnabled(any(job.paused for _, job in active))
+            act_add = menu.addAction("Add to Running Batch")
+            act_add.setEnabled(any(id(job) not in index_of and job.state != JobState.RUNNING
+                                   for job in jobs))
+        chosen = menu.exec(self._file_list.viewport().mapToGlobal(pos))
+        if chosen is None:
+            return
+        if chosen in priority_actions:
+            priority = priority_actions[chosen]
+            for job in jobs:
+                job.priority = priority
+                self._queue_model.refresh_job(job)
+            if worker is not None:
+                for idx, _ in active:
+                    worker.set_job_priority(idx, priority)
+        elif chosen is act_add:
+            self._add_to_running_batch([job for job in jobs if id(job) not in index_of
+                                        and job.state != JobState.RUNNING])
+        for idx, job in active:
+            if chosen is act_pause:
+                worker.pause_job(idx)
+            elif chosen is act_resume:
+                worker.resume_job(idx)
+
+    def _add_to_running_batch(self, jobs: list[Job]):
+        if self._worker is None or not jobs:
+            return
+        added = self._worker.add_jobs(jobs)
+        if not added:
+            QMessageBox.information(self, "Batch Finishing",
+                                    "The batch is finishing; start a new one for these files.")
+            return
+        self._progress.setMaximum(len(self._worker_jobs))
+        self._terminal.append_text(f"Added {len(added)} file(s) to the running batch\n")
+
+    def _update_queue_drag(self, column: int, order: Qt.SortOrder):
+        # Dragging reorders the queue itself, which only makes sense in queue order
+        self._file_list.setDragEnabled(
+            column < 0 or (column == COL_NUM and order == Qt.SortOrder.AscendingOrder)
+        )
+
+    def _on_queue_reordered(self):
+        if self._worker is None:
+            return
+        index_of = {id(job): i for i, job in enumerate(self._worker_jobs, 1)}
+        self._worker.reorder([index_of[id(job)] for job in self._queue_model.batch
+                              if id(job) in index_of])
+
     def _on_file_started(self, idx, total, name):
         self.statusBar().showMessage(f"[{idx}/{total}] Encoding: {name}")
+        self._refresh_worker_job(idx)
 
     def _on_file_finished(self, idx, total, name, success):
-        self._progress.setValue(idx)
+        # Jobs can finish out of order when several run in parallel
+        self._progress.setValue(self._progress.value() + 1)
+        self._refresh_worker_job(idx)
+
+    def _on_file_paused(self, idx, paused):
+        self._refresh_worker_job(idx)
+
+    def _on_file_progress(self, idx, percent, speed, eta):
+        if self._worker is None or self._worker.is_paused() or not 0 < idx <= len(self._worker_jobs):
+            return
+        name = os.path.basename(self._worker_jobs[idx - 1].source)
+        eta_text = f", ETA {eta}" if eta else ""
+        self.statusBar().showMessage(
+            f"[{idx}/{len(self._worker_jobs)}] Encoding: {name} - {percent}% at {speed}{eta_text}"
+        )
+
+    def _on_file_waiting(self, idx, reason):
+        self._refresh_worker_job(idx)
+        if reason:
+            self.statusBar().showMessage(f"[{idx}] Waiting: {reason}")
+
+    def _refresh_worker_job(self, idx: int):
+        if 0 < idx <= len(self._worker_jobs):
+            self._queue_model.refresh_job(self._worker_jobs[idx - 1])
 
     def _on_encoding_done(self):
         self._btn_start.setEnabled(True)
         self._btn_cancel.setEnabled(False)
+        self._btn_pause.setEnabled(False)
+        self._btn_pause.setText("  Pause  ")
         self._cleanup_worker()
         self.statusBar().showMessage("Encoding complete")
 
@@ -1693,6 +2540,8 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "FFmpeg Error", msg)
         self._btn_start.setEnabled(True)
         self._btn_cancel.setEnabled(False)
+        self._btn_pause.setEnabled(False)
+        self._btn_pause.setText("  Pause  ")
         self._cleanup_worker()
         self.statusBar().showMessage("Error occurred")
 
@@ -1700,8 +2549,179 @@ class MainWindow(QMainWindow):
         """Safely clean up the encoder worker thread."""
         if self._worker is not None:
             self._worker.wait(5000)  # wait for thread to fully finish
+            if self._worker.trace:
+                self._last_trace = self._worker.trace
             self._worker.deleteLater()  # schedule safe Qt deletion
             self._worker = None
+        self._worker_jobs = []
+
+    def _export_timeline(self):
+        """Save the running or last batch's timeline as a Chrome trace."""
+        trace = self._worker.trace if self._worker is not None else self._last_trace
+        if not trace:
+            QMessageBox.information(self, "No Timeline", "Run a batch first; its timeline can then be exported.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Batch Timeline", "vcc_trace.json", TRACE_FILTER
+        )
+        if not path:
+            return
+        try:
+            trace.write(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Error", f"Could not write timeline:\n{e}")
+            return
+        self.statusBar().showMessage(f"Timeline saved: {path} (open in chrome://tracing or ui.perfetto.dev)")
+
+    # ------------------------------------------------------------------
+    # Encoder benchmark
+    # ------------------------------------------------------------------
+    def _run_benchmark(self):
+        if (self._worker is not None or self._bench_worker is not None
+                or self._analyzer is not None or self._tuner is not None
+                or self._preflight is not None):
+            QMessageBox.warning(self, "Busy",
+                                "Encoding or a benchmark is already running.")
+            return
+        dlg = BenchmarkDialog(self)
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return
+        opts = dlg.get_options()
+        if not opts["sources"] or not opts["resolutions"]:
+            QMessageBox.warning(self, "Nothing Selected",
+                                "Select at least one source and one resolution.")
+            return
+
+        self._bench_worker = BenchmarkWorker(**opts)
+        self._bench_worker.log_output.connect(self._terminal.append_text)
+        self._bench_worker.benchmark_done.connect(
+            lambda path: self.statusBar().showMessage(f"Benchmark results saved: {path}")
+        )
+        self._bench_worker.benchmark_error.connect(
+            lambda msg: QMessageBox.warning(self, "Benchmark", msg)
+        )
+        self._bench_worker.finished.connect(self._on_benchmark_finished)
+
+        self._btn_start.setEnabled(False)
+        self._act_benchmark.setEnabled(False)
+        self._terminal.clear_terminal()
+        self.statusBar().showMessage("Running encoder benchmark...")
+        self._bench_worker.start()
+
+    def _on_benchmark_finished(self):
+        self._btn_start.setEnabled(True)
+        self._act_benchmark.setEnabled(True)
+        if self._bench_worker is not None:
+            self._bench_worker.deleteLater()
+            self._bench_worker = None
+
+    # ------------------------------------------------------------------
+    # Bottleneck analyzer
+    # ------------------------------------------------------------------
+    def _run_analyzer(self):
+        if (self._worker is not None or self._bench_worker is not None
+                or self._analyzer is not None or self._tuner is not None
+                or self._preflight is not None):
+            QMessageBox.warning(self, "Busy",
+                                "Encoding, a benchmark or an analysis is already running.")
+            return
+        jobs = self._selected_jobs()
+        if not jobs:
+            rows = self._queue_proxy.source_rows()
+            if not rows:
+                QMessageBox.warning(self, "No Files", "Add a video file to analyze.")
+                return
+            jobs = [self._queue_model.job_at(rows[0])]
+        seconds, ok = QInputDialog.getInt(
+            self, "Analyze Bottleneck",
+            f"Seconds of {os.path.basename(jobs[0].source)} to run\n"
+            "(decode only, decode + filters, full encode):",
+            10, 2, 120,
+        )
+        if not ok:
+            return
+        output_dir = self._txt_output_dir.text().strip() or os.path.dirname(jobs[0].source)
+        self._analyzer = BottleneckAnalyzer(self._make_worker(jobs[:1], output_dir), jobs[0], seconds)
+        self._analyzer.log_output.connect(self._terminal.append_text)
+        self._analyzer.analysis_done.connect(
+            lambda result: self.statusBar().showMessage(f"Bottleneck: {result['bottleneck']}")
+        )
+        self._analyzer.analysis_error.connect(
+            lambda msg: QMessageBox.warning(self, "Analyze Bottleneck", msg)
+        )
+        self._analyzer.finished.connect(self._on_analyzer_finished)
+        self._btn_start.setEnabled(False)
+        self._act_analyze.setEnabled(False)
+        self._terminal.clear_terminal()
+        self.statusBar().showMessage("Analyzing...")
+        self._analyzer.start()
+
+    def _on_analyzer_finished(self):
+        self._btn_start.setEnabled(True)
+        self._act_analyze.setEnabled(True)
+        if self._analyzer is not None:
+            self._analyzer.worker.deleteLater()
+            self._analyzer.deleteLater()
+            self._analyzer = None
+
+    # ------------------------------------------------------------------
+    # Parallelism auto-tuner
+    # ------------------------------------------------------------------
+    def _run_autotune(self):
+        if (self._worker is not None or self._bench_worker is not None
+                or self._analyzer is not None or self._tuner is not None
+                or self._preflight is not None):
+            QMessageBox.warning(self, "Busy",
+                                "Encoding, a benchmark or an analysis is already running.")
+            return
+        jobs = self._selected_jobs()
+        if not jobs:
+            rows = self._queue_proxy.source_rows()
+            jobs = [self._queue_model.job_at(rows[0])] if rows else []
+        sample = jobs[0].source if jobs else ""
+        seconds, ok = QInputDialog.getInt(
+            self, "Auto-Tune Parallel Jobs",
+            f"Seconds of {os.path.basename(sample) if sample else 'a synthetic clip'} to encode\n"
+            "at each parallel jobs x threads split:",
+            10, 2, 120,
+        )
+        if not ok:
+            return
+        output_dir = self._txt_output_dir.text().strip() or tempfile.gettempdir()
+        self._tuner = AutoTuner(self._make_worker(jobs[:1], output_dir), sample, seconds)
+        self._tuner.log_output.connect(self._terminal.append_text)
+        self._tuner.tuning_done.connect(self._on_tuning_done)
+        self._tuner.tuning_error.connect(
+            lambda msg: QMessageBox.warning(self, "Auto-Tune Parallel Jobs", msg)
+        )
+        self._tuner.finished.connect(self._on_autotune_finished)
+        self._btn_start.setEnabled(False)
+        self._act_autotune.setEnabled(False)
+        self._terminal.clear_terminal()
+        self.statusBar().showMessage("Auto-tuning parallel jobs...")
+        self._tuner.start()
+
+    def _on_tuning_done(self, entry: dict):
+        self.statusBar().showMessage(
+            f"Auto-tune: {entry['jobs']} jobs x {entry['threads']} threads for "
+            f"{entry['codec']} at {entry['band']}"
+        )
+        if self._spn_parallel_jobs.value() != 0:
+            reply = QMessageBox.question(
+                self, "Auto-Tune Parallel Jobs",
+                f"Best split: {entry['jobs']} jobs x {entry['threads']} threads "
+                f"({entry['throughput']:.2f}x realtime).\n\nSet Parallel jobs to Auto?",
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                self._spn_parallel_jobs.setValue(0)
+
+    def _on_autotune_finished(self):
+        self._btn_start.setEnabled(True)
+        self._act_autotune.setEnabled(True)
+        if self._tuner is not None:
+            self._tuner.worker.deleteLater()
+            self._tuner.deleteLater()
+            self._tuner = None
 
     # ------------------------------------------------------------------
     # Close event
@@ -1718,8 +2738,30 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 self._worker.cancel()
                 self._worker.wait(5000)
+                self._probe_pool.shutdown()
+                self._set_prom_textfile("")
+                self._wait_for_scans()
+                if self._manifest_loader is not None:
+                    self._manifest_loader.wait(5000)
                 event.accept()
             else:
                 event.ignore()
         else:
+            if self._bench_worker is not None:
+                self._bench_worker.cancel()
+                self._bench_worker.wait(5000)
+            if self._analyzer is not None:
+                self._analyzer.cancel()
+                self._analyzer.wait(5000)
+            if self._tuner is not None:
+                self._tuner.cancel()
+                self._tuner.wait(5000)
+            if self._preflight is not None:
+                self._preflight.cancel()
+                self._preflight.wait(5000)
+            self._probe_pool.shutdown()
+            self._set_prom_textfile("")
+            self._wait_for_scans()
+            if self._manifest_loader is not None:
+                self._manifest_loader.wait(5000)
             event.accept()
@@ -0,0 +1,431 @@
+"""
+File queue model - the list of input files shown in the main window.
+
+Backed by a JobBatch (compact Job records with a path -> row index), so
+duplicate checks are O(1) and large batches are inserted with a single
+model update.  Media details (duration, resolution, codec, size) are
+filled in lazily as background probes finish; QueueFilterProxy sorts and
+filters on them.  Rows can be dragged to a new place in the queue while it
+is shown in queue order.
+"""
+
+import os
+import re
+
+from PyQt6.QtCore import (
+    Qt, QAbstractTableModel, QMimeData, QModelIndex, QSortFilterProxyModel, QTimer, pyqtSignal,
+)
+
+from vcc.core.jobs import Job, JobBatch, JobPriority, JobState
+
+# Role returning raw values (seconds, pixels, bytes) for sorting
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+COL_NUM, COL_FILE, COL_DURATION, COL_RESOLUTION, COL_CODEC, COL_SIZE, COL_PRIORITY, COL_STATUS = range(8)
+
+# Drag payload for reordering rows inside the queue: comma-separated source rows
+_ROWS_MIME = "application/x-vcc-queue-rows"
+
+_STATUS_TEXT = {
+    JobState.PENDING: "",
+    JobState.RUNNING: "Encoding",
+    JobState.DONE: "Done",
+    JobState.FAILED: "Failed",
+    JobState.SKIPPED: "Skipped",
+    JobState.CANCELLED: "Cancelled",
+}
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_size(size: int) -> str:
+    for unit, scale in (("GB", 1_000_000_000), ("MB", 1_000_000), ("KB", 1_000)):
+        if size >= scale:
+            return f"{size / scale:.2f} {unit}" if unit == "GB" else f"{size / scale:.0f} {unit}"
+    return f"{size} B"
+
+
+class FileQueueModel(QAbstractTableModel):
+    """Table model holding the encoding queue in display order."""
+
+    COLUMNS = ["#", "File", "Duration", "Resolution", "Codec", "Size", "Priority", "Status"]
+
+    rows_moved = pyqtSignal()  # the queue order changed by drag and drop
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._batch = JobBatch()
+        # Probe results arrive one by one; repaint them in coalesced batches
+        self._dirty: set[str] = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(100)
+        self._flush_timer.timeout.connect(self._flush_dirty)
+
+    # -- Qt model interface --------------------------------------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._batch)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        job = self._batch[row]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display(row, col, job)
+        if role == SORT_ROLE:
+            return self._sort_value(row, col, job)
+        if role == Qt.ItemDataRole.ToolTipRole and col == COL_STATUS and (job.error or job.waiting):
+            return job.error or job.waiting
+        if role in (Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.UserRole):
+            return job.source
+        if (role == Qt.ItemDataRole.TextAlignmentRole
+                and col not in (COL_FILE, COL_CODEC, COL_PRIORITY, COL_STATUS)):
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        flags = super().flags(index)
+        # Rows drag; drops land between rows, never onto one
+        if index.isValid():
+            return flags | Qt.ItemFlag.ItemIsDragEnabled
+        return flags | Qt.ItemFlag.ItemIsDropEnabled
+
+    def supportedDropActions(self) -> Qt.DropAction:
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self) -> list[str]:
+        return [_ROWS_MIME]
+
+    def mimeData(self, indexes) -> QMimeData:
+        data = QMimeData()
+        rows = sorted({i.row() for i in indexes if i.isValid()})
+        data.setData(_ROWS_MIME, ",".join(map(str, rows)).encode("ascii"))
+        return data
+
+    def dropMimeData(self, data: QMimeData, action: Qt.DropAction, row: int, column: int,
+                     parent: QModelIndex) -> bool:
+        if action != Qt.DropAction.MoveAction or not data.hasFormat(_ROWS_MIME):
+            return False
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._batch)
+        text = bytes(data.data(_ROWS_MIME)).decode("ascii")
+        rows = [int(r) for r in text.split(",") if r]
+        if not rows:
+            return False
+        self.move_rows(rows, row)
+        return True
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    @staticmethod
+    def _display(row: int, col: int, job: Job) -> str:
+        if col == COL_NUM:
+            return str(row + 1)
+        if col == COL_FILE:
+            return job.source
+        if col == COL_PRIORITY:
+            return JobPriority.label(job.priority) if job.priority != JobPriority.NORMAL else ""
+        if col == COL_STATUS:
+            if job.paused and job.state in (JobState.PENDING, JobState.RUNNING):
+                return "Paused"
+            if job.waiting and job.state in (JobState.PENDING, JobState.RUNNING):
+                return "Waiting"
+            return _STATUS_TEXT.get(job.state, job.state)
+        info = job.info
+        if not info:
+            return "?" if info is not None else ""
+        if col == COL_DURATION:
+            return format_duration(info["duration"]) if info["duration"] else ""
+        if col == COL_RESOLUTION:
+            return f"{info['width']}x{info['height']}" if info["width"] else ""
+        if col == COL_CODEC:
+            return info["vcodec"]
+        if col == COL_SIZE:
+            return format_size(info["size"])
+        return ""
+
+    @staticmethod
+    def _sort_value(row: int, col: int, job: Job):
+        if col == COL_NUM:
+            return row
+        if col == COL_FILE:
+            return job.source.lower()
+        if col == COL_PRIORITY:
+            return job.priority
+        if col == COL_STATUS:
+            return job.state
+        info = job.info
+        if col == COL_CODEC:
+            return info["vcodec"] if info else ""
+        if not info:
+            return -1
+        if col == COL_DURATION:
+            return info["duration"]
+        if col == COL_RESOLUTION:
+            return info["width"] * info["height"]
+        return info["size"]
+
+    # -- Queue operations ------------------------------------------------
+    def __contains__(self, path: str) -> bool:
+        return path in self._batch
+
+    @property
+    def batch(self) -> JobBatch:
+        return self._batch
+
+    def job_at(self, row: int) -> Job:
+        return self._batch[row]
+
+    def path_at(self, row: int) -> str:
+        return self._batch[row].source
+
+    def paths(self) -> list[str]:
+        return self._batch.sources()
+
+    def add_paths(self, paths: list[str]) -> list[str]:
+        """Queue paths not already queued; return the ones added."""
+        return [j.source for j in self.add_jobs(Job(p) for p in paths)]
+
+    def add_jobs(self, jobs) -> list[Job]:
+        """Append jobs whose source is not queued yet; return the ones added."""
+        batch = self._batch
+        new = []
+        seen = set()
+        for job in jobs:
+            if job.source not in batch and job.source not in seen:
+                seen.add(job.source)
+                new.append(job)
+        if not new:
+            return []
+        first = len(batch)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        batch.add(new)
+        self.endInsertRows()
+        return new
+
+    def remove_rows(self, rows: list[int]) -> list[Job]:
+        """Remove the given rows; return the removed jobs."""
+        removed = []
+        # Remove contiguous runs from the bottom up so earlier rows stay valid
+        for start, end in reversed(_runs(sorted(set(rows)))):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            removed.extend(self._batch.delete(start, end))
+            self.endRemoveRows()
+        if removed:
+            self._batch.reindex()
+        if removed and len(self._batch):
+            # Row numbers below the removed rows changed
+            self.dataChanged.emit(self.index(0, COL_NUM), self.index(len(self._batch) - 1, COL_NUM))
+        return removed
+
+    def move_rows(self, rows: list[int], dest: int) -> None:
+        """Move *rows* to before row *dest*, keeping their order and the selection."""
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        batch = self._batch
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        old_jobs = [batch[i.row()] for i in old]
+        batch.move(rows, dest)
+        self.changePersistentIndexList(
+            old, [self.index(batch.row_of(job.source), i.column()) for job, i in zip(old_jobs, old)]
+        )
+        self.layoutChanged.emit()
+        self.rows_moved.emit()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._batch.clear()
+        self._dirty.clear()
+        self.endResetModel()
+
+    def set_info(self, path: str, info: dict | None) -> None:
+        """Store the probe result for *path* (no-op if it left the queue)."""
+        job = self._batch.get(path)
+        if job is None:
+            return
+        job.info = info if info is not None else {}
+        self._mark_dirty(path)
+
+    def refresh_job(self, job: Job) -> None:
+        """Repaint *job*'s row after its state changed."""
+        self._mark_dirty(job.source)
+
+    def _mark_dirty(self, path: str) -> None:
+        self._dirty.add(path)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_dirty(self) -> None:
+        batch = self._batch
+        rows = sorted(r for r in map(batch.row_of, self._dirty) if r is not None)
+        self._dirty.clear()
+        for start, end in _runs(rows):
+            self.dataChanged.emit(self.index(start, COL_DURATION), self.index(end, COL_STATUS))
+
+
+def _runs(rows: list[int]) -> list[tuple[int, int]]:
+    """Group sorted row numbers into inclusive (start, end) runs."""
+    runs = []
+    for row in rows:
+        if runs and row == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+# ----------------------------------------------------------------------
+# Filtering
+# ----------------------------------------------------------------------
+FILTER_HELP = (
+    "Show only matching files; Start encodes the files shown, in the order shown.\n\n"
+    "Terms (all must match):\n"
+    "  codec:h264        codec is h264 (also = and !=)\n"
+    "  height>=1080      also width, res (e.g. res>1080p)\n"
+    "  duration>10:00    seconds, mm:ss, hh:mm:ss or 90m\n"
+    "  size<2G           bytes with K/M/G suffix\n"
+    "  name~holiday      file name contains text\n"
+    "  status:failed     status of the last run (done, failed, ...)\n"
+    "  priority:urgent   low, normal, high or urgent\n"
+    "  holiday           full path contains text\n\n"
+    "Files not probed yet only match name terms."
+)
+
+_TERM_RE = re.compile(r'(\w+)\s*(>=|<=|!=|[=:<>~])\s*("[^"]*"|[^\s"]+)|("[^"]*"|[^\s"]+)')
+_NUMERIC_FIELDS = {"width", "height", "res", "duration", "size"}
+_TEXT_FIELDS = {"codec", "name", "path", "status", "priority"}
+
+
+def _parse_duration(text: str) -> float:
+    unit = {"s": 1, "m": 60, "h": 3600}.get(text[-1:].lower())
+    if unit:
+        return float(text[:-1]) * unit
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _parse_size(text: str) -> float:
+    text = text.upper().removesuffix("B")
+    scale = {"K": 1_000, "M": 1_000_000, "G": 1_000_000_000, "T": 1_000_000_000_000}.get(text[-1:])
+    return float(text[:-1]) * scale if scale else float(text)
+
+
+def _numeric_value(field: str, info: dict) -> float:
+    if field == "duration":
+        return info["duration"]
+    if field == "size":
+        return info["size"]
+    if field == "width":
+        return info["width"]
+    return info["height"]  # height / res
+
+
+_COMPARE = {
+    "=": lambda a, b: a == b, ":": lambda a, b: a == b, "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+}
+
+
+def parse_queue_filter(text: str) -> list:
+    """Compile a filter expression into predicates over Job.
+
+    Raises ValueError for unknown fields or malformed values.
+    """
+    predicates = []
+    for m in _TERM_RE.finditer(text):
+        field, op, value, bare = m.groups()
+        if bare is not None:
+            needle = bare.strip('"').lower()
+            predicates.append(lambda j, n=needle: n in j.source.lower())
+            continue
+        field = field.lower()
+        value = value.strip('"')
+        if field in _TEXT_FIELDS:
+            if op not in ("=", ":", "!=", "~"):
+                raise ValueError(f"'{op}' cannot be used with {field}")
+            predicates.append(_text_predicate(field, op, value.lower()))
+        elif field in _NUMERIC_FIELDS:
+            if op == "~":
+                raise ValueError(f"'~' cannot be used with {field}")
+            try:
+                if field == "duration":
+                    target = _parse_duration(value)
+                elif field == "size":
+                    target = _parse_size(value)
+                else:
+                    target = float(value.lower().removesuffix("p"))
+            except ValueError:
+                raise ValueError(f"invalid {field} value '{value}'") from None
+            compare = _COMPARE[op]
+            predicates.append(
+                lambda j, f=field, c=compare, t=target:
+                    bool(j.info) and c(_numeric_value(f, j.info), t)
+            )
+        else:
+            raise ValueError(f"unknown field '{field}'")
+    return predicates
+
+
+def _text_predicate(field: str, op: str, value: str):
+    if field == "codec":
+        def get(j):
+            return j.info["vcodec"].lower() if j.info else None
+    elif field == "status":
+        def get(j):
+            return j.state
+    elif field == "priority":
+        def get(j):
+            return JobPriority.label(j.priority).lower()
+    else:
+        def get(j):
+            return j.source.lower() if field == "path" else os.path.basename(j.source).lower()
+    if op == "~" or (field in ("name", "path") and op == ":"):
+        return lambda j: (v := get(j)) is not None and value in v
+    if op == "!=":
+        return lambda j: (v := get(j)) is not None and v != value
+    return lambda j: get(j) == value
+
+
+class QueueFilterProxy(QSortFilterProxyModel):
+    """Sorts the queue on raw values and applies a parse_queue_filter() expression."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+        self._predicates: list = []
+
+    def set_filter_text(self, text: str) -> None:
+        """Apply *text* as the filter; raises ValueError if it does not parse."""
+        self._predicates = parse_queue_filter(text)
+        self.invalidateFilter()
+
+    def is_filtered(self) -> bool:
+        return bool(self._predicates)
+
+    def source_rows(self) -> list[int]:
+        """Source rows of the visible files, in display order."""
+        src = self.mapToSource
+        return [src(self.index(r, 0)).row() for r in range(self.rowCount())]
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._predicates:
+            return True
+        job = self.sourceModel().job_at(source_row)
+        return all(p(job) for p in self._predicates)
@@ -125,15 +125,22 @@ LIGHT_THEME = """
     QGroupBox {
         color: #333;
     }
-    QListWidget {
+    QListWidget, QTableView {
         background: #fff;
         color: #222;
         border: 1px solid #c0c0c0;
     }
-    QListWidget::item:selected {
+    QListWidget::item:selected, QTableView::item:selected {
         background: #cde4ff;
         color: #222;
     }
+    QHeaderView::section {
+        background: #f0f0f0;
+        color: #333;
+        border: none;
+        border-bottom: 1px solid #c0c0c0;
+        padding: 2px 4px;
+    }
     QScrollArea {
         background: transparent;
     }
@@ -268,20 +275,27 @@ DARK_THEME = """
         padding: 0 6px;
         color: #ccc;
     }
-    QListWidget {
+    QListWidget, QTableView {
         background: #333;
         color: #e0e0e0;
         border: 1px solid #555;
         border-radius: 4px;
         font-size: 11px;
     }
-    QListWidget::item {
+    QListWidget::item, QTableView::item {
         padding: 2px 4px;
     }
-    QListWidget::item:selected {
+    QListWidget::item:selected, QTableView::item:selected {
         background: #3a5a8a;
         color: #fff;
     }
+    QHeaderView::section {
+        background: #3c3c3c;
+        color: #ccc;
+        border: none;
+        border-bottom: 1px solid #555;
+        padding: 2px 4px;
+    }
     QScrollArea {
         background: transparent;
         border: none;
@@ -665,32 +679,33 @@ DARK_PROGRESS_STYLE = """
 """
 
 LIGHT_FILELIST_STYLE = """
-    QListWidget {
+    QTableView {
         border: 1px solid #c0c0c0;
         border-radius: 4px;
         background: #fff;
         font-size: 11px;
     }
-    QListWidget::item {
+    QTableView::item {
         padding: 2px 4px;
     }
-    QListWidget::item:selected {
+    QTableView::item:selected {
         background: #cde4ff;
+        color: #222;
     }
 """
 
 DARK_FILELIST_STYLE = """
-    QListWidget {
+    QTableView {
         border: 1px solid #555;
         border-radius: 4px;
         background: #333;
         color: #e0e0e0;
         font-size: 11px;
     }
-    QListWidget::item {
+    QTableView::item {
         padding: 2px 4px;
     }
-    QListWidget::item:selected {
+    QTableView::item:selected {
         background: #3a5a8a;
         color: #fff;
     }